@@ -63,17 +63,14 @@ class CarrierData(object):
         assert (range[1] - range[0]) == (range[3] - range[2])
     if self._uni_to_shift_jis_ranges:
       for range in self._uni_to_shift_jis_ranges:
-        # Shift the Shift-JIS codes down to JIS X 0208 and compute the
-        # linear differences.
-        shift_jis_start = row_cell.FromShiftJis((range[2] >> 8) - 0x10,
-                                                range[2] & 0xff)
-        shift_jis_end = row_cell.FromShiftJis((range[3] >> 8) - 0x10,
-                                              range[3] & 0xff)
+        # Compare with the linear difference of the Shift-JIS codes.
+        shift_jis_start = row_cell.IndexFromShiftJis(range[2])
+        shift_jis_end = row_cell.IndexFromShiftJis(range[3])
         assert (range[1] - range[0]) == (shift_jis_end - shift_jis_start)
     if self._uni_to_jis_ranges:
       for range in self._uni_to_jis_ranges:
-        jis_start = row_cell.From2022((range[2] >> 8), range[2] & 0xff)
-        jis_end = row_cell.From2022((range[3] >> 8), range[3] & 0xff)
+        jis_start = row_cell.IndexFromJis(range[2])
+        jis_end = row_cell.IndexFromJis(range[3])
         assert (range[1] - range[0]) == (jis_end - jis_start)
 
   def _ReadXML(self, filename):
@@ -151,13 +148,13 @@ class CarrierData(object):
     lead_bytes = set()
     if self._uni_to_jis_ranges:
       for jis_range in self._uni_to_jis_ranges:
-        sjis_start = row_cell.From2022Integer(jis_range[2]).ToShiftJis()
-        sjis_end = row_cell.From2022Integer(jis_range[3]).ToShiftJis()
-        lead_bytes |= set(range(sjis_start[0], sjis_end[0] + 1))
+        sjis_start = row_cell.ShiftJisFromJis(jis_range[2])
+        sjis_end = row_cell.ShiftJisFromJis(jis_range[3])
+        lead_bytes |= set(range(sjis_start >> 8, (sjis_end >> 8) + 1))
     else:
       for element in self._uni_to_elements.itervalues():
         jis = element.getAttribute("jis")
-        if jis: lead_bytes.add(row_cell.From2022String(jis).ToShiftJis()[0])
+        if jis: lead_bytes.add(row_cell.ShiftJisFromJis(int(jis, 16)) >> 8)
     return frozenset(lead_bytes)
 
 def _RangeFromUnicode(ranges, uni):
@@ -216,11 +213,8 @@ def _ShiftJisFromUnicode(ranges, uni):
   uni = int(uni, 16)
   range = _RangeFromUnicode(ranges, uni)
   offset = uni - range[0]
-  # Shift the Shift-JIS codes down to JIS X 0208 and back up
-  # so that we get standard row-cell byte values (1..94) and can use RowCell.
-  rc = row_cell.FromShiftJis((range[2] >> 8) - 0x10, range[2] & 0xff) + offset
-  (b1, b2) = rc.ToShiftJis()
-  return ((b1 + 0x10) << 8) | b2
+  return row_cell.ShiftJisFromIndex(row_cell.IndexFromShiftJis(range[2]) +
+                                    offset)
 
 
 def _JisFromUnicode(ranges, uni):
@@ -241,9 +235,7 @@ def _JisFromUnicode(ranges, uni):
   uni = int(uni, 16)
   range = _RangeFromUnicode(ranges, uni)
   offset = uni - range[0]
-  rc = row_cell.From2022(range[2] >> 8, range[2] & 0xff) + offset
-  (b1, b2) = rc.To2022()
-  return (b1 << 8) | b2
+  return row_cell.JisFromIndex(row_cell.IndexFromJis(range[2]) + offset)
 
 
 class Symbol(object):
@@ -0,0 +1,194 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Build the compact JSON chart dataset for the client-side chart viewer.
+
+One dataset holds what the HTML chart variants show, and the viewer
+(see gen_html.py --json) renders, filters and paginates it in the browser.
+
+Records are JSON arrays rather than objects, with trailing empty fields
+omitted. Text is stored once in a shared string table and referenced by
+index, where index 0 is the empty string. Image URLs are split into a
+shared prefix (by index) and a filename.
+
+Dataset object:
+  version: FORMAT_VERSION.
+  carriers: The carrier names, in the order of the symbol mappings.
+  strings: The string table.
+  urlPrefixes: The image URL prefixes.
+  categories: [name, in_proposal (0/1)] records.
+  subcategories: [name, category index] records.
+  symbols: Symbol records, in emoji4unicode.xml order:
+      0 id; 1 flags (see FLAG_ constants); 2 subcategory index; 3 name;
+      4 list of the carrier mapping strings like "E63E", ">E63E+E6A0" or "";
+      5 Unicode; 6 proposed Unicode; 7 font Unicode;
+      8 Unicode age of the representative code points; 9 text fallback;
+      10 image; 11 text representation; 12 list of annotations; 13 ARIB code;
+      14 proposed properties; 15 old name; 16 description; 17 design notes.
+  unicodeOrder: Symbol indexes sorted by Unicode.
+  carrierSymbols: For each carrier, the records of the mapped symbols:
+      0 Unicode PUA code point; 1 number; 2 old number; 3 new number;
+      4 English name; 5 Japanese name; 6 transliteration of the Japanese name
+      if different; 7 Shift-JIS code; 8 JIS code; 9 image.
+Names, annotations etc. are string table indexes, code points and codes are
+hex strings, and an image is a [URL prefix index, filename] pair or 0.
+"""
+
+__author__ = "Markus Scherer"
+
+import json
+import re
+import emoji4unicode
+import translit
+import unicode_age
+
+FORMAT_VERSION = 1
+
+# Symbol record flags.
+FLAG_IN_PROPOSAL = 1
+FLAG_UPCOMING = 2  # Unified with an upcoming Unicode 5.2 character.
+
+_img_src_re = re.compile(r"""<img src=['"]?([^'" >]+)""")
+
+class _Tables(object):
+  """The shared string and URL prefix tables of a dataset."""
+  def __init__(self):
+    self.strings = [u""]
+    self.url_prefixes = []
+    self.__string_indexes = {u"": 0}
+    self.__url_prefix_indexes = {}
+
+  def String(self, s):
+    """Returns the string table index for s; 0 for None or empty."""
+    if not s: return 0
+    index = self.__string_indexes.get(s)
+    if index is None:
+      index = self.__string_indexes[s] = len(self.strings)
+      self.strings.append(s)
+    return index
+
+  def Image(self, html):
+    """Returns the [URL prefix index, filename] pair for the image HTML,
+    or 0 if there is no image."""
+    match = _img_src_re.match(html or "")
+    if not match: return 0
+    url = match.group(1)
+    split = url.rfind("/") + 1
+    prefix = url[:split]
+    index = self.__url_prefix_indexes.get(prefix)
+    if index is None:
+      index = self.__url_prefix_indexes[prefix] = len(self.url_prefixes)
+      self.url_prefixes.append(prefix)
+    return [index, url[split:]]
+
+
+def _Trim(record):
+  """Removes trailing empty fields."""
+  while record and not record[-1]: record.pop()
+  return record
+
+
+def _SymbolRecord(symbol, subcategory_index, tables):
+  flags = 0
+  if symbol.in_proposal: flags |= FLAG_IN_PROPOSAL
+  if symbol.IsUnifiedWithUpcomingCharacter(): flags |= FLAG_UPCOMING
+  uni = symbol.GetUnicode()
+  proposed_uni = symbol.GetProposedUnicode()
+  # Same as in gen_html._RepresentationHTML(): Symbols in the proposal
+  # were accepted into Unicode 6.0.
+  representative_uni = uni or (symbol.in_proposal and proposed_uni)
+  return _Trim([
+      symbol.id, flags, subcategory_index, tables.String(symbol.GetName()),
+      [symbol.GetCarrierUnicode(carrier) or ""
+       for carrier in emoji4unicode.carriers],
+      uni or "", proposed_uni or "", symbol.GetFontUnicode() or "",
+      representative_uni and unicode_age.GetAge(representative_uni) or "",
+      tables.String(symbol.GetTextFallback()),
+      tables.Image(symbol.ImageHTML()),
+      tables.String(symbol.GetTextRepresentation()),
+      [tables.String(line) for line in symbol.GetAnnotations()],
+      symbol.GetARIB() or "",
+      tables.String(symbol.GetProposedProperties()),
+      tables.String(symbol.GetOldName()),
+      tables.String(symbol.GetDescription()),
+      tables.String(symbol.GetDesign())])
+
+
+def _CarrierSymbolRecord(carrier, symbol, tables):
+  name_ja = symbol.GetJapaneseName()
+  xlit = u""
+  if name_ja:
+    # Same as in gen_html._CarrierSymbolHTML().
+    name_ja = name_ja.replace(u"\uFF08", u"(").replace(u"\uFF09", u")")
+    xlit = translit.Transliterate(name_ja)
+    if xlit == name_ja: xlit = u""
+  return _Trim([
+      symbol.uni, symbol.number or 0, symbol.old_number or 0,
+      symbol.new_number or 0,
+      tables.String(symbol.GetEnglishName()), tables.String(name_ja),
+      tables.String(xlit), symbol.shift_jis or "", symbol.jis or "",
+      tables.Image(emoji4unicode.CarrierImageHTML(carrier, symbol))])
+
+
+def Build():
+  """Returns the chart dataset as a JSON-serializable dict.
+
+  emoji4unicode.Load() and unicode_age.Load() must have been called.
+  """
+  tables = _Tables()
+  categories = []
+  subcategories = []
+  symbols = []
+  symbol_indexes = {}
+  # Carrier code point strings used in the mappings.
+  carrier_codes = dict([(carrier, set()) for carrier in emoji4unicode.carriers])
+  for category in emoji4unicode.GetCategories():
+    categories.append([tables.String(category.name),
+                       int(category.in_proposal)])
+    for subcategory in category.GetSubcategories():
+      subcategories.append([tables.String(subcategory.name),
+                            len(categories) - 1])
+      for symbol in subcategory.GetSymbols():
+        symbol_indexes[symbol.id] = len(symbols)
+        symbols.append(_SymbolRecord(symbol, len(subcategories) - 1, tables))
+        for carrier in emoji4unicode.carriers:
+          mapping = symbol.GetCarrierUnicode(carrier)
+          if mapping:
+            carrier_codes[carrier].update(mapping.lstrip(">").split("+"))
+  carrier_symbols = []
+  for carrier in emoji4unicode.carriers:
+    carrier_data = emoji4unicode.all_carrier_data[carrier]
+    carrier_symbols.append(
+        [_CarrierSymbolRecord(carrier, carrier_data.SymbolFromUnicode(code),
+                              tables)
+         for code in sorted(carrier_codes[carrier])])
+  return {
+      "version": FORMAT_VERSION,
+      "carriers": list(emoji4unicode.carriers),
+      "strings": tables.strings,
+      "urlPrefixes": tables.url_prefixes,
+      "categories": categories,
+      "subcategories": subcategories,
+      "symbols": symbols,
+      "unicodeOrder": [symbol_indexes[symbol.id] for (code_points, symbol)
+                       in emoji4unicode.GetSymbolsSortedByUnicode()],
+      "carrierSymbols": carrier_symbols}
+
+
+def ToJSON(dataset):
+  """Returns the dataset as compact JSON text (a unicode string)."""
+  return json.dumps(dataset, ensure_ascii=False, separators=(",", ":"),
+                    sort_keys=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for chart_data.py."""
+
+__author__ = "Markus Scherer"
+
+import json
+import unittest
+import chart_data
+import emoji4unicode
+import unicode_age
+
+class ChartDataTest(unittest.TestCase):
+  def setUp(self):
+    emoji4unicode.Load()
+    unicode_age.Load()
+    self.dataset = chart_data.Build()
+
+  def testSymbols(self):
+    symbols = list(emoji4unicode.GetSymbols())
+    records = self.dataset["symbols"]
+    self.assertEqual(len(symbols), len(records))
+    for (symbol, record) in zip(symbols, records):
+      self.assertEqual(symbol.id, record[0])
+      self.assertEqual(symbol.GetName(), self.dataset["strings"][record[3]])
+      self.assertEqual(bool(symbol.in_proposal),
+                       bool(record[1] & chart_data.FLAG_IN_PROPOSAL))
+      self.assertNotEqual("", record[-1])  # Trailing empty fields are trimmed.
+      subcategory = self.dataset["subcategories"][record[2]]
+      self.assertEqual(symbol.subcategory.name,
+                       self.dataset["strings"][subcategory[0]])
+
+  def testCarrierSymbols(self):
+    # Every code in a mapping has a carrier symbol record.
+    for (c, carrier) in enumerate(self.dataset["carriers"]):
+      codes = set([record[0] for record in self.dataset["carrierSymbols"][c]])
+      for record in self.dataset["symbols"]:
+        mapping = record[4][c]
+        if mapping:
+          for code in mapping.lstrip(">").split("+"):
+            self.assertTrue(code in codes, "%s %s" % (carrier, code))
+
+  def testUnicodeOrder(self):
+    order = self.dataset["unicodeOrder"]
+    self.assertEqual(range(len(self.dataset["symbols"])), sorted(order))
+    ids = [symbol.id for (code_points, symbol)
+           in emoji4unicode.GetSymbolsSortedByUnicode()]
+    self.assertEqual(ids, [self.dataset["symbols"][i][0] for i in order])
+
+  def testStringTable(self):
+    strings = self.dataset["strings"]
+    self.assertEqual(u"", strings[0])
+    self.assertEqual(len(strings), len(set(strings)))
+
+  def testImages(self):
+    tables = chart_data._Tables()
+    self.assertEqual(0, tables.Image(""))
+    self.assertEqual([0, "38.gif"],
+                     tables.Image("<img src=http://x.jp/images/38.gif "
+                                  "width=16 height=16>"))
+    self.assertEqual([0, "2.gif"],
+                     tables.Image("<img src='http://x.jp/images/2.gif'>"))
+    self.assertEqual([1, "4B0"],
+                     tables.Image("<img src=http://y.com/e/4B0>"))
+    self.assertEqual(["http://x.jp/images/", "http://y.com/e/"],
+                     tables.url_prefixes)
+
+  def testJSON(self):
+    text = chart_data.ToJSON(self.dataset)
+    self.assertEqual(self.dataset, json.loads(text))
+    self.assertFalse("\n" in text)
+    self.assertFalse(", " in text[:200])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,413 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Build compact two-level lookup tables for code point -> value maps.
+
+The code points from start to limit are split into data blocks of
+2^shift code points. The index has one entry per block; the entry times
+2^granularity_shift is the offset of the block's values in the data array.
+Identical blocks are stored once, and a new block may overlap the end of
+the data array by any multiple of 2^granularity_shift values.
+This generalizes the hand-rolled folded array in transform_gpua.txt
+(blocks of 64 code points, 16-value granularity).
+
+Build() tries several block and granularity sizes and returns the smallest
+CodePointTrie, which looks up values with Get() and can be written as
+C, Java or Python source code, or as a binary blob for FromBlob().
+A BlobTrie looks up values directly in a blob, for example in an mmap,
+without reading the arrays into lists.
+"""
+
+__author__ = "Markus Scherer"
+
+import struct
+
+# Binary blob format, all little-endian:
+# Header: "CPT1", start, limit, default (uint32 each),
+# shift, granularity_shift, index width, data width (uint8 each),
+# index length, data length (uint32 each);
+# then the index array, padded to a multiple of 4 bytes, and the data array.
+_BLOB_MAGIC = "CPT1"
+_BLOB_HEADER = struct.Struct("<4s3I4B2I")
+
+_WIDTH_TO_STRUCT = {1: "B", 2: "H", 4: "I"}
+_WIDTH_TO_C_TYPE = {1: "uint8_t", 2: "uint16_t", 4: "uint32_t"}
+
+def _Width(max_value):
+  """Returns the number of bytes (1, 2 or 4) for unsigned values <= max_value."""
+  if max_value <= 0xff: return 1
+  if max_value <= 0xffff: return 2
+  if max_value <= 0xffffffff: return 4
+  raise ValueError("value 0x%x does not fit into 32 bits" % max_value)
+
+
+class CodePointTrie(object):
+  """Immutable code point -> unsigned integer lookup table.
+
+  Do not instantiate directly: Use Build() or FromBlob().
+
+  Attributes:
+    start: First code point with data.
+    limit: Code point after the last one with data.
+    default: Value for code points without data, including those
+        outside start..limit-1.
+    shift: Each index entry covers 2^shift code points.
+    granularity_shift: Index entries are data offsets >> granularity_shift.
+    index: List of index entries.
+    data: List of values.
+  """
+  def __init__(self, start, limit, default, shift, granularity_shift,
+               index, data):
+    self.start = start
+    self.limit = limit
+    self.default = default
+    self.shift = shift
+    self.granularity_shift = granularity_shift
+    self.index = index
+    self.data = data
+    self.__mask = (1 << shift) - 1
+    self.__index_width = self.__data_width = None
+
+  def Get(self, code_point):
+    """Returns the value for the code point."""
+    if not self.start <= code_point < self.limit: return self.default
+    offset = code_point - self.start
+    return self.data[(self.index[offset >> self.shift] <<
+                      self.granularity_shift) + (offset & self.__mask)]
+
+  def IndexWidth(self):
+    """Returns the number of bytes per index entry."""
+    if self.__index_width is None:
+      self.__index_width = _Width(max(self.index or [0]))
+    return self.__index_width
+
+  def DataWidth(self):
+    """Returns the number of bytes per data value."""
+    if self.__data_width is None:
+      self.__data_width = _Width(max(self.data))
+    return self.__data_width
+
+  def Size(self):
+    """Returns the number of bytes of the index and data arrays."""
+    return (len(self.index) * self.IndexWidth() +
+            len(self.data) * self.DataWidth())
+
+  def ToBlob(self):
+    """Returns the trie as a binary str, see the module docstring."""
+    index_width = self.IndexWidth()
+    data_width = self.DataWidth()
+    pieces = [_BLOB_HEADER.pack(_BLOB_MAGIC, self.start, self.limit,
+                                self.default, self.shift,
+                                self.granularity_shift, index_width,
+                                data_width, len(self.index), len(self.data))]
+    for (values, width) in ((self.index, index_width), (self.data, data_width)):
+      pieces.append(struct.pack("<%d%s" % (len(values),
+                                           _WIDTH_TO_STRUCT[width]), *values))
+      if values is self.index:
+        pieces.append("\0" * _IndexPadding(len(values), width))
+    return "".join(pieces)
+
+  def ToC(self, name):
+    """Returns C source code with the arrays and a lookup function.
+
+    Args:
+      name: Prefix for the C identifiers, like "gpua".
+    """
+    upper = name.upper()
+    lines = ["// Code point trie: U+%04X..U+%04X, default 0x%x." %
+             (self.start, self.limit - 1, self.default),
+             "// Index entries cover %d code points each; multiply them by "
+             "%d for data offsets." % (1 << self.shift,
+                                       1 << self.granularity_shift),
+             "#define %s_START 0x%x" % (upper, self.start),
+             "#define %s_LIMIT 0x%x" % (upper, self.limit),
+             ""]
+    for (suffix, values, width) in (
+        ("index", self.index, self.IndexWidth()),
+        ("data", self.data, self.DataWidth())):
+      lines.append("static const %s %s_%s[%d] = {" %
+                   (_WIDTH_TO_C_TYPE[width], name, suffix, len(values)))
+      lines.extend(_FormatValues(values))
+      lines.append("};")
+      lines.append("")
+    lines.extend([
+        "static uint32_t %s_get(int32_t c) {" % name,
+        "  if (c < %s_START || c >= %s_LIMIT) { return 0x%x; }" %
+        (upper, upper, self.default),
+        "  c -= %s_START;" % upper,
+        "  return %s_data[(%s_index[c >> %d] << %d) + (c & 0x%x)];" %
+        (name, name, self.shift, self.granularity_shift, self.__mask),
+        "}"])
+    return "\n".join(lines) + "\n"
+
+  def ToJava(self, name):
+    """Returns Java class member source code with the arrays and a lookup
+    method.
+
+    Args:
+      name: Prefix for the Java identifiers, like "gpua".
+    """
+    upper = name.upper()
+    lines = ["// Code point trie: U+%04X..U+%04X, default 0x%x." %
+             (self.start, self.limit - 1, self.default)]
+    for (suffix, values, width) in (
+        ("INDEX", self.index, self.IndexWidth()),
+        ("DATA", self.data, self.DataWidth())):
+      # Java has no unsigned types: char for up to 16 bits, else int.
+      # (Hex int literals up to 0xffffffff are fine in Java.)
+      if width <= 2:
+        java_type = "char"
+        formatted = _FormatValues(values, "(char)0x%x")
+      else:
+        java_type = "int"
+        formatted = _FormatValues(values)
+      lines.append("private static final %s[] %s_%s = {" %
+                   (java_type, upper, suffix))
+      lines.extend(formatted)
+      lines.append("};")
+    lines.extend([
+        "",
+        "public static int %sGet(int c) {" % name,
+        "  if (c < 0x%x || c >= 0x%x) { return 0x%x; }" %
+        (self.start, self.limit, self.default),
+        "  c -= 0x%x;" % self.start,
+        "  return %s_DATA[(%s_INDEX[c >> %d] << %d) + (c & 0x%x)];" %
+        (upper, upper, self.shift, self.granularity_shift, self.__mask),
+        "}"])
+    return "\n".join(lines) + "\n"
+
+  def ToPython(self, name):
+    """Returns standalone Python source code with the arrays and
+    a lookup function.
+
+    Args:
+      name: Prefix for the Python identifiers, like "gpua".
+    """
+    upper = name.upper()
+    lines = ["# Code point trie: U+%04X..U+%04X, default 0x%x." %
+             (self.start, self.limit - 1, self.default)]
+    for (suffix, values) in (("INDEX", self.index), ("DATA", self.data)):
+      lines.append("_%s_%s = (" % (upper, suffix))
+      lines.extend(_FormatValues(values))
+      lines.append(")")
+    lines.extend([
+        "",
+        "def %sGet(c):" % name,
+        "  if not 0x%x <= c < 0x%x: return 0x%x" %
+        (self.start, self.limit, self.default),
+        "  c -= 0x%x" % self.start,
+        "  return _%s_DATA[(_%s_INDEX[c >> %d] << %d) + (c & 0x%x)]" %
+        (upper, upper, self.shift, self.granularity_shift, self.__mask)])
+    return "\n".join(lines) + "\n"
+
+
+def _FormatValues(values, format="0x%x"):
+  """Returns source lines with 8 comma-separated values each."""
+  strings = [format % v for v in values]
+  return ["  " + ", ".join(strings[i:i + 8]) + ","
+          for i in xrange(0, len(strings), 8)]
+
+
+def _IndexPadding(index_length, index_width):
+  """Returns the number of padding bytes after the index in a blob."""
+  return -(index_length * index_width) & 3
+
+
+def _ReadBlobHeader(blob, offset):
+  header = _BLOB_HEADER.unpack_from(blob, offset)
+  if header[0] != _BLOB_MAGIC:
+    raise ValueError("not a code point trie blob: %r" % header[0])
+  return header[1:]
+
+
+def BlobSize(blob, offset=0):
+  """Returns the number of bytes of the trie blob at the offset."""
+  (start, limit, default, shift, granularity_shift, index_width,
+   data_width, index_length, data_length) = _ReadBlobHeader(blob, offset)
+  return (_BLOB_HEADER.size + index_length * index_width +
+          _IndexPadding(index_length, index_width) + data_length * data_width)
+
+
+class BlobTrie(object):
+  """Looks up values in a trie blob written by CodePointTrie.ToBlob().
+
+  Reads only the header; each Get() reads one index entry and one value
+  from the blob, which can be an mmap shared among processes.
+
+  Attributes:
+    start, limit, default, shift, granularity_shift: As in CodePointTrie.
+  """
+  def __init__(self, blob, offset=0):
+    """Wraps the blob.
+
+    Args:
+      blob: A str or buffer, for example an mmap.
+      offset: Offset of the trie in blob.
+    """
+    (self.start, self.limit, self.default, self.shift, self.granularity_shift,
+     index_width, data_width, index_length,
+     data_length) = _ReadBlobHeader(blob, offset)
+    self.__blob = blob
+    self.__mask = (1 << self.shift) - 1
+    self.__index_offset = offset + _BLOB_HEADER.size
+    self.__index_format = struct.Struct("<" + _WIDTH_TO_STRUCT[index_width])
+    self.__data_offset = (self.__index_offset + index_length * index_width +
+                          _IndexPadding(index_length, index_width))
+    self.__data_format = struct.Struct("<" + _WIDTH_TO_STRUCT[data_width])
+
+  def Get(self, code_point):
+    """Returns the value for the code point."""
+    if not self.start <= code_point < self.limit: return self.default
+    offset = code_point - self.start
+    (index,) = self.__index_format.unpack_from(
+        self.__blob, self.__index_offset +
+        (offset >> self.shift) * self.__index_format.size)
+    (value,) = self.__data_format.unpack_from(
+        self.__blob, self.__data_offset +
+        ((index << self.granularity_shift) + (offset & self.__mask)) *
+        self.__data_format.size)
+    return value
+
+
+def FromBlob(blob, offset=0):
+  """Reads a CodePointTrie from a binary str written by ToBlob().
+
+  Args:
+    blob: A str or buffer, for example an mmap.
+    offset: Offset of the trie in blob.
+
+  Returns:
+    A CodePointTrie.
+  """
+  (start, limit, default, shift, granularity_shift, index_width,
+   data_width, index_length, data_length) = _ReadBlobHeader(blob, offset)
+  offset += _BLOB_HEADER.size
+  index = list(struct.unpack_from(
+      "<%d%s" % (index_length, _WIDTH_TO_STRUCT[index_width]), blob, offset))
+  offset += (index_length * index_width +
+             _IndexPadding(index_length, index_width))
+  data = list(struct.unpack_from(
+      "<%d%s" % (data_length, _WIDTH_TO_STRUCT[data_width]), blob, offset))
+  return CodePointTrie(start, limit, default, shift, granularity_shift,
+                       index, data)
+
+
+def _GetBlocks(values, start, limit, default, shift):
+  """Splits the values into blocks of 2^shift values.
+
+  Returns:
+    A (distinct_blocks, block_numbers) pair: The list of distinct value
+    tuples in the order of their first occurrence, and the list of
+    indexes into distinct_blocks for all blocks from start to limit.
+  """
+  block_length = 1 << shift
+  mask = block_length - 1
+  empty_block = (default,) * block_length
+  num_blocks = (limit - start + mask) >> shift
+  block_lists = {}
+  for (code_point, value) in values.iteritems():
+    offset = code_point - start
+    block_list = block_lists.get(offset >> shift)
+    if block_list is None:
+      block_list = block_lists[offset >> shift] = list(empty_block)
+    block_list[offset & mask] = value
+  positions = sorted(block_lists)
+  # The first block without values, if any.
+  first_empty = 0
+  while first_empty in block_lists: first_empty += 1
+  if first_empty < num_blocks:
+    positions.append(first_empty)
+    positions.sort()
+  distinct_blocks = []
+  block_to_number = {}
+  for position in positions:
+    if position in block_lists:
+      block = tuple(block_lists[position])
+    else:
+      block = empty_block
+    number = block_to_number.get(block)
+    if number is None:
+      number = block_to_number[block] = len(distinct_blocks)
+      distinct_blocks.append(block)
+    block_lists[position] = number
+  empty_number = block_to_number.get(empty_block)
+  block_numbers = [empty_number] * num_blocks
+  for (position, number) in block_lists.iteritems():
+    block_numbers[position] = number
+  return (distinct_blocks, block_numbers)
+
+
+def _BuildWithShifts(blocks, start, limit, default, shift, granularity_shift):
+  """Builds a trie with fixed block and granularity sizes.
+
+  Args:
+    blocks: The (distinct_blocks, block_numbers) pair from _GetBlocks().
+  """
+  (distinct_blocks, block_numbers) = blocks
+  block_length = 1 << shift
+  granularity = 1 << granularity_shift
+  data = []
+  block_indexes = []
+  for block in distinct_blocks:
+    # Overlap the end of the data as much as possible.
+    data_length = len(data)
+    overlap_start = max(0, data_length - block_length + granularity)
+    first = block[0]
+    for offset in xrange(overlap_start, data_length, granularity):
+      if (data[offset] == first and
+          data[offset:] == list(block[:data_length - offset])): break
+    else:
+      offset = data_length
+    data.extend(block[data_length - offset:])
+    block_indexes.append(offset >> granularity_shift)
+  index = [block_indexes[number] for number in block_numbers]
+  if not data: data.append(default)  # Empty map.
+  return CodePointTrie(start, limit, default, shift, granularity_shift,
+                       index, data)
+
+
+def Build(values, default=0, shifts=range(2, 10)):
+  """Builds the smallest trie for the map.
+
+  Args:
+    values: Dictionary from code points to unsigned integer values.
+    default: The value for all other code points.
+    shifts: The block size shifts to try. For each one,
+        all granularity shifts from 0 to the block size shift are tried.
+
+  Returns:
+    The CodePointTrie with the smallest Size().
+  """
+  for value in values.itervalues():
+    if not 0 <= value <= 0xffffffff:
+      raise ValueError("value %r is not an unsigned 32-bit integer" % value)
+  if values:
+    start = min(values)
+    limit = max(values) + 1
+  else:
+    start = limit = 0
+  best = None
+  # Large blocks first: With a small trie found early, the long indexes of
+  # small blocks need not be built.
+  for shift in sorted(shifts, reverse=True):
+    blocks = _GetBlocks(values, start, limit, default, shift)
+    # Each index entry takes at least one byte.
+    if best is not None and len(blocks[1]) >= best.Size(): continue
+    for granularity_shift in xrange(shift + 1):
+      trie = _BuildWithShifts(blocks, start, limit, default,
+                              shift, granularity_shift)
+      if best is None or trie.Size() < best.Size(): best = trie
+  return best
@@ -0,0 +1,109 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import unittest
+import code_point_trie
+import emoji4unicode
+import gen_conversion_files
+
+class CodePointTrieTest(unittest.TestCase):
+  def setUp(self):
+    # Two identical runs of values, some gaps and a large value.
+    self.__values = {}
+    for start in (0x1f300, 0x1f700):
+      for i in xrange(40):
+        self.__values[start + i] = i + 1
+    self.__values[0x1f500] = 0xffffffff
+
+  def __CheckLookup(self, trie, values, default=0):
+    for c in xrange(trie.start - 100, trie.limit + 100):
+      self.assertEqual(trie.Get(c), values.get(c, default), "U+%04X" % c)
+
+  def testBuild(self):
+    trie = code_point_trie.Build(self.__values)
+    self.assertEqual(trie.start, 0x1f300)
+    self.assertEqual(trie.limit, 0x1f728)
+    self.__CheckLookup(trie, self.__values)
+    self.assertEqual(trie.DataWidth(), 4)
+    # Much smaller than a dense array.
+    self.assert_(trie.Size() < (trie.limit - trie.start))
+
+  def testFixedShifts(self):
+    for shift in (2, 5, 8):
+      trie = code_point_trie.Build(self.__values, shifts=(shift,))
+      self.assertEqual(trie.shift, shift)
+      self.__CheckLookup(trie, self.__values)
+
+  def testDeduplication(self):
+    # The second run of 40 values reuses the first one's data blocks.
+    trie = code_point_trie.Build(self.__values, shifts=(3,))
+    self.assert_(len(trie.data) < 80)
+
+  def testDefault(self):
+    trie = code_point_trie.Build({0x41: 5, 0x50: 6}, default=9)
+    self.__CheckLookup(trie, {0x41: 5, 0x50: 6}, 9)
+    empty = code_point_trie.Build({}, default=7)
+    self.assertEqual(empty.Get(0x41), 7)
+
+  def testInvalidValues(self):
+    self.assertRaises(ValueError, code_point_trie.Build, {0x41: -1})
+    self.assertRaises(ValueError, code_point_trie.Build, {0x41: 1 << 32})
+
+  def testBlob(self):
+    trie = code_point_trie.Build(self.__values)
+    blob = "xyz" + trie.ToBlob()
+    self.assertRaises(ValueError, code_point_trie.FromBlob, blob)
+    trie2 = code_point_trie.FromBlob(buffer(blob), 3)
+    self.assertEqual(trie2.index, trie.index)
+    self.assertEqual(trie2.data, trie.data)
+    self.__CheckLookup(trie2, self.__values)
+    self.assertEqual(code_point_trie.BlobSize(blob, 3), len(blob) - 3)
+    self.__CheckLookup(code_point_trie.BlobTrie(blob, 3), self.__values)
+    # The data array is 4-aligned.
+    self.assertEqual(len(trie.ToBlob()) % 4, 0)
+
+  def testPython(self):
+    trie = code_point_trie.Build(self.__values)
+    namespace = {}
+    exec trie.ToPython("emoji") in namespace
+    get = namespace["emojiGet"]
+    for c in xrange(trie.start - 100, trie.limit + 100):
+      self.assertEqual(get(c), self.__values.get(c, 0))
+
+  def testCAndJava(self):
+    trie = code_point_trie.Build(self.__values)
+    c_source = trie.ToC("emoji")
+    self.assert_("static const uint32_t emoji_data[%d] = {" % len(trie.data)
+                 in c_source)
+    self.assert_("static uint32_t emoji_get(int32_t c) {" in c_source)
+    java_source = trie.ToJava("emoji")
+    self.assert_("private static final int[] EMOJI_DATA = {" in java_source)
+    self.assert_("0xffffffff" in java_source)
+    self.assert_("public static int emojiGet(int c) {" in java_source)
+
+  def testGooglePUA(self):
+    emoji4unicode.Load()
+    gpua_map = gen_conversion_files._GetGooglePUAMap()
+    trie = code_point_trie.Build(gpua_map)
+    self.__CheckLookup(trie, gpua_map)
+    # Smaller than 4-byte values for all of U+FE000..U+FEFFF.
+    self.assert_(trie.Size() < 0x1000 * 4)
+
+
+if __name__ == "__main__":
+  unittest.main()
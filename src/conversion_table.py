@@ -0,0 +1,291 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write and read binary, memory-mappable Emoji conversion tables.
+
+gen_conversion_files.py writes one binary table next to each .ucm file,
+with the same mappings. A reader maps the file into memory and
+looks up values in place, so that several processes share one page-cache
+copy of the table rather than each building dictionaries.
+
+Format version 1.0; all integers are little-endian, and every section
+starts at a multiple of 4 bytes.
+
+Header (64 bytes):
+  "E4UC", major version (uint16), minor version (uint16),
+  then (offset, length in bytes) uint32 pairs for the seven sections below.
+
+Decoding, for round-trip (|0) and reverse fallback (|3) mappings:
+  single_bytes: 256 uint32 values as in trail_blocks, indexed by the byte,
+      for single-byte codes.
+  lead_index: 256 uint16 trail block numbers, indexed by lead byte.
+      Block 0 has no mappings.
+  trail_blocks: Blocks of 256 uint32 values, indexed by trail byte.
+      0 = no mapping; a value with bit 31 set is the index of a
+      to_unicode_sequences record; 0x110000 stands for U+0000;
+      other values are single code points.
+  to_unicode_sequences: Records of 4 uint32 code points, padded with zeros.
+
+Encoding, for round-trip (|0), fallback (|1) and good one-way (|4) mappings:
+  from_unicode_trie: A code_point_trie blob with uint32 values:
+      0 = no mapping;
+      bits 19..0: offset of the bytes in the bytes section;
+      bits 23..20: number of bytes;
+      bits 26..24: precision (0, 1 or 4, as in the .ucm file);
+      bit 31: set if the code point starts a mapped sequence.
+      Bits 26..0 are 0 if the code point alone does not have a mapping.
+  from_unicode_sequences: Records of 5 uint32: 4 code points padded with
+      zeros, and a value as in the trie but without bit 31.
+      Sorted by code points.
+  bytes: The charset bytes of all encoding mappings.
+"""
+
+__author__ = "Markus Scherer"
+
+import mmap
+import struct
+import code_point_trie
+import ucm
+
+MAJOR_VERSION = 1
+MINOR_VERSION = 0
+
+_MAGIC = "E4UC"
+_SECTIONS = ("single_bytes", "lead_index", "trail_blocks",
+             "to_unicode_sequences", "from_unicode_trie",
+             "from_unicode_sequences", "bytes")
+_HEADER = struct.Struct("<4sHH%dI" % (2 * len(_SECTIONS)))
+
+_SEQUENCE_BIT = 0x80000000
+_NUL_VALUE = 0x110000  # Decodes to U+0000, because 0 means no mapping.
+_MAX_SEQUENCE_LENGTH = 4
+_TO_UNICODE_RECORD = struct.Struct("<4I")
+_FROM_UNICODE_RECORD = struct.Struct("<5I")
+_UINT16 = struct.Struct("<H")
+_UINT32 = struct.Struct("<I")
+
+def _CodePoints(uni):
+  """Turns a .ucm Unicode string like "0023+20E3" into a tuple of integers."""
+  return tuple([int(cp, 16) for cp in uni.split("+")])
+
+
+def _Pad(code_points):
+  if len(code_points) > _MAX_SEQUENCE_LENGTH:
+    raise ValueError("sequence %r is too long" % (code_points,))
+  return code_points + (0,) * (_MAX_SEQUENCE_LENGTH - len(code_points))
+
+
+def Build(mappings):
+  """Returns the binary table for the mappings.
+
+  Args:
+    mappings: List of (unicode, bytes, precision) mappings
+        as in ucm.UCMFile.mappings.
+
+  Returns:
+    The table as a str.
+  """
+  # Decoding.
+  single_bytes = [0] * 256
+  lead_index = [0] * 256
+  trail_blocks = [[0] * 256]
+  to_unicode_sequences = []
+  reverse_fallbacks = set()  # bytes decoded via reverse fallbacks
+  # Encoding.
+  single_values = {}
+  sequence_values = {}
+  byte_pool = []
+  byte_offsets = {}
+  pool_length = 0
+  for (uni, bytes, precision) in mappings:
+    code_points = _CodePoints(uni)
+    if precision in (ucm.ROUND_TRIP, ucm.REVERSE_FALLBACK):
+      if len(bytes) == 1:
+        (values, index) = (single_bytes, ord(bytes))
+      elif len(bytes) == 2:
+        (lead, index) = (ord(bytes[0]), ord(bytes[1]))
+        if not lead_index[lead]:
+          lead_index[lead] = len(trail_blocks)
+          trail_blocks.append([0] * 256)
+        values = trail_blocks[lead_index[lead]]
+      else:
+        raise ValueError("cannot decode %r: only single- and double-byte codes"
+                         % bytes)
+      # The first mapping for the bytes wins, as for encoding,
+      # except that a round-trip mapping replaces a reverse fallback.
+      if not values[index] or (precision == ucm.ROUND_TRIP and
+                               bytes in reverse_fallbacks):
+        if precision == ucm.REVERSE_FALLBACK:
+          reverse_fallbacks.add(bytes)
+        else:
+          reverse_fallbacks.discard(bytes)
+        if len(code_points) == 1:
+          values[index] = code_points[0] or _NUL_VALUE
+        else:
+          values[index] = _SEQUENCE_BIT | len(to_unicode_sequences)
+          to_unicode_sequences.append(_Pad(code_points))
+    if precision in (ucm.ROUND_TRIP, ucm.FALLBACK, ucm.GOOD_ONE_WAY):
+      offset = byte_offsets.get(bytes)
+      if offset is None:
+        offset = byte_offsets[bytes] = pool_length
+        byte_pool.append(bytes)
+        pool_length += len(bytes)
+      if offset > 0xfffff or len(bytes) > 15:
+        raise ValueError("too many or too long byte sequences")
+      value = offset | (len(bytes) << 20) | (precision << 24)
+      if len(code_points) == 1:
+        (values, key) = (single_values, code_points[0])
+      else:
+        (values, key) = (sequence_values, _Pad(code_points))
+      # The first mapping for the code points wins,
+      # except that a round-trip mapping replaces a one-way mapping.
+      if key not in values or (precision == ucm.ROUND_TRIP and
+                               (values[key] >> 24) & 7 != ucm.ROUND_TRIP):
+        values[key] = value
+  for code_points in sequence_values:
+    first = code_points[0]
+    single_values[first] = single_values.get(first, 0) | _SEQUENCE_BIT
+  sections = [
+      struct.pack("<256I", *single_bytes),
+      struct.pack("<256H", *lead_index),
+      "".join([struct.pack("<256I", *block) for block in trail_blocks]),
+      "".join([_TO_UNICODE_RECORD.pack(*record)
+               for record in to_unicode_sequences]),
+      code_point_trie.Build(single_values).ToBlob(),
+      "".join([_FROM_UNICODE_RECORD.pack(*(code_points + (value,)))
+               for (code_points, value) in sorted(sequence_values.items())]),
+      "".join(byte_pool)]
+  offsets_and_lengths = []
+  offset = _HEADER.size
+  for (i, section) in enumerate(sections):
+    offsets_and_lengths.extend([offset, len(section)])
+    padding = -len(section) & 3
+    sections[i] += "\0" * padding
+    offset += len(section) + padding
+  return (_HEADER.pack(_MAGIC, MAJOR_VERSION, MINOR_VERSION,
+                       *offsets_and_lengths) +
+          "".join(sections))
+
+
+class ConversionTable(object):
+  """Looks up mappings in a binary table written by Build().
+
+  Reads only the header and section offsets; lookups read the values
+  from the table buffer, which can be a read-only mmap.
+
+  Attributes:
+    major_version, minor_version: The table's format version.
+  """
+  def __init__(self, table):
+    """Wraps the table.
+
+    Args:
+      table: A str or buffer with the table, for example an mmap.
+    """
+    header = _HEADER.unpack_from(table)
+    (magic, self.major_version, self.minor_version) = header[:3]
+    if magic != _MAGIC:
+      raise ValueError("not an Emoji conversion table: %r" % magic)
+    if self.major_version != MAJOR_VERSION:
+      raise ValueError("unsupported conversion table version %d.%d" %
+                       (self.major_version, self.minor_version))
+    self.__table = table
+    self.__offsets = {}
+    self.__lengths = {}
+    for (i, name) in enumerate(_SECTIONS):
+      self.__offsets[name] = header[3 + 2 * i]
+      self.__lengths[name] = header[4 + 2 * i]
+    self.__trie = code_point_trie.BlobTrie(table,
+                                           self.__offsets["from_unicode_trie"])
+    self.__num_sequences = (self.__lengths["from_unicode_sequences"] /
+                            _FROM_UNICODE_RECORD.size)
+
+  def ToUnicode(self, bytes):
+    """Decodes one character code.
+
+    Args:
+      bytes: A str with a single-byte or double-byte character code.
+
+    Returns:
+      A tuple of code points, or None if there is no mapping.
+    """
+    table = self.__table
+    if len(bytes) == 1:
+      (value,) = _UINT32.unpack_from(
+          table, self.__offsets["single_bytes"] + 4 * ord(bytes))
+    elif len(bytes) == 2:
+      (block,) = _UINT16.unpack_from(
+          table, self.__offsets["lead_index"] + 2 * ord(bytes[0]))
+      if not block: return None
+      (value,) = _UINT32.unpack_from(
+          table, self.__offsets["trail_blocks"] +
+          4 * (256 * block + ord(bytes[1])))
+    else:
+      return None
+    if not value: return None
+    if value == _NUL_VALUE: return (0,)
+    if not value & _SEQUENCE_BIT: return (value,)
+    record = _TO_UNICODE_RECORD.unpack_from(
+        table, self.__offsets["to_unicode_sequences"] +
+        _TO_UNICODE_RECORD.size * (value & ~_SEQUENCE_BIT))
+    return tuple([cp for cp in record if cp])
+
+  def FromUnicode(self, code_points):
+    """Encodes one code point or sequence.
+
+    Args:
+      code_points: A sequence of integer code points.
+
+    Returns:
+      A (bytes, precision) pair, or None if there is no mapping.
+    """
+    code_points = tuple(code_points)
+    value = self.__trie.Get(code_points[0])
+    if len(code_points) > 1:
+      if not value & _SEQUENCE_BIT or len(code_points) > _MAX_SEQUENCE_LENGTH:
+        return None
+      value = self.__FindSequence(_Pad(code_points))
+    value &= ~_SEQUENCE_BIT
+    if not value: return None
+    offset = self.__offsets["bytes"] + (value & 0xfffff)
+    return (self.__table[offset:offset + ((value >> 20) & 0xf)],
+            (value >> 24) & 7)
+
+  def __FindSequence(self, code_points):
+    """Binary search in the from_unicode_sequences records."""
+    (start, limit) = (0, self.__num_sequences)
+    while start < limit:
+      middle = (start + limit) / 2
+      record = _FROM_UNICODE_RECORD.unpack_from(
+          self.__table, self.__offsets["from_unicode_sequences"] +
+          _FROM_UNICODE_RECORD.size * middle)
+      if record[:4] == code_points: return record[4]
+      if record[:4] < code_points:
+        start = middle + 1
+      else:
+        limit = middle
+    return 0
+
+
+def Open(filename):
+  """Maps the binary table file into memory, read-only.
+
+  Returns:
+    A ConversionTable.
+  """
+  with open(filename, "rb") as file:
+    return ConversionTable(mmap.mmap(file.fileno(), 0,
+                                     access=mmap.ACCESS_READ))
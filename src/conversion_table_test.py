@@ -0,0 +1,107 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import os
+import tempfile
+import unittest
+import conversion_table
+import ucm
+
+_MAPPINGS = r"""
+<U0000> \x00 |0
+<U0041> \x41 |0
+<U00A9> \x63 |1
+<U00A9> \x8C\x74 |0
+<U00A5> \x5C |1
+<U005C> \x5C |0
+<U2600> \xF8\x9F |0
+<UFE000> \xF8\x9F |1
+<U0023>+<U20E3> \xF9\x85 |4
+<U0023>+<UFE0E>+<U20E3> \xF9\x85 |4
+<U0023>+<UFE0F>+<U20E3> \xF9\x85 |0
+<U26C5> \xF8\x9F+\xF8\xA0 |1
+<U1F4A9> \xF8\xA0 |3
+<U2601> \xF8\xA0 |0
+<U1F4A8> \xF8\xA0 |3
+"""
+
+class ConversionTableTest(unittest.TestCase):
+  def setUp(self):
+    self.__blob = conversion_table.Build(ucm.ParseMappings(_MAPPINGS))
+    self.__table = conversion_table.ConversionTable(self.__blob)
+
+  def testToUnicode(self):
+    table = self.__table
+    self.assertEqual(table.ToUnicode("\xf8\x9f"), (0x2600,))
+    self.assertEqual(table.ToUnicode("\xf9\x85"), (0x23, 0xfe0f, 0x20e3))
+    # Round-trip mapping, not the reverse fallback.
+    self.assertEqual(table.ToUnicode("\xf8\xa0"), (0x2601,))
+    self.assertEqual(table.ToUnicode("\xf8\xa1"), None)
+    self.assertEqual(table.ToUnicode("\x81\x40"), None)
+    self.assertEqual(table.ToUnicode("A"), (0x41,))
+    self.assertEqual(table.ToUnicode("\x00"), (0,))
+    self.assertEqual(table.ToUnicode("\\"), (0x5c,))
+    self.assertEqual(table.ToUnicode("B"), None)
+    self.assertEqual(table.ToUnicode("\xf8\x9f\xf8\xa0"), None)
+
+  def testFromUnicode(self):
+    table = self.__table
+    self.assertEqual(table.FromUnicode([0x2600]), ("\xf8\x9f", ucm.ROUND_TRIP))
+    self.assertEqual(table.FromUnicode([0x41]), ("A", ucm.ROUND_TRIP))
+    self.assertEqual(table.FromUnicode([0]), ("\x00", ucm.ROUND_TRIP))
+    self.assertEqual(table.FromUnicode([0xa9]), ("\x8C\x74", ucm.ROUND_TRIP))
+    self.assertEqual(table.FromUnicode([0xa5]), ("\\", ucm.FALLBACK))
+    self.assertEqual(table.FromUnicode([0xfe000]), ("\xf8\x9f", ucm.FALLBACK))
+    self.assertEqual(table.FromUnicode([0x26c5]),
+                     ("\xf8\x9f\xf8\xa0", ucm.FALLBACK))
+    self.assertEqual(table.FromUnicode([0x23, 0x20e3]),
+                     ("\xf9\x85", ucm.GOOD_ONE_WAY))
+    self.assertEqual(table.FromUnicode([0x23, 0xfe0f, 0x20e3]),
+                     ("\xf9\x85", ucm.ROUND_TRIP))
+    self.assertEqual(table.FromUnicode([0x1f4a9]), None)
+    self.assertEqual(table.FromUnicode([0x1f4a8]), None)
+    self.assertEqual(table.FromUnicode([0x23]), None)
+    self.assertEqual(table.FromUnicode([0x23, 0x20e2]), None)
+    self.assertEqual(table.FromUnicode([0x2600, 0x20e3]), None)
+
+  def testFormat(self):
+    self.assertEqual(self.__blob[:4], "E4UC")
+    self.assertEqual(self.__table.major_version, conversion_table.MAJOR_VERSION)
+    self.assertEqual(len(self.__blob) % 4, 0)
+    self.assertRaises(ValueError, conversion_table.ConversionTable,
+                      "XXXX" + self.__blob[4:])
+    self.assertRaises(ValueError, conversion_table.ConversionTable,
+                      self.__blob[:4] + "\x63\x00" + self.__blob[6:])
+    self.assertRaises(ValueError, conversion_table.Build,
+                      ucm.ParseMappings(r"<U2600> \xF8\x9F\xA0 |0"))
+
+  def testOpen(self):
+    (fd, filename) = tempfile.mkstemp(".bin")
+    try:
+      os.write(fd, self.__blob)
+      os.close(fd)
+      table = conversion_table.Open(filename)
+      self.assertEqual(table.ToUnicode("\xf8\x9f"), (0x2600,))
+      self.assertEqual(table.FromUnicode([0x2601]),
+                       ("\xf8\xa0", ucm.ROUND_TRIP))
+    finally:
+      os.remove(filename)
+
+
+if __name__ == "__main__":
+  unittest.main()
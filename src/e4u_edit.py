@@ -0,0 +1,117 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Edit <e> symbol elements of emoji4unicode.xml in place.
+
+Loading the whole file into a DOM and writing all of it again is slow
+for edits of a few symbols. An Editor instead indexes the byte ranges of
+the <e id="..."> elements in the file, parses only the elements which
+are edited, and writes the file with just their byte ranges replaced.
+The edited elements are serialized like in emoji4unicode.Write(),
+so the output is the same as for a full DOM round trip.
+
+For example:
+  editor = e4u_edit.Editor(e4u_filename)
+  symbol = editor.GetElement("1CB")
+  symbol.setAttribute("name", "TURTLE")
+  editor.Write(out_filename)
+"""
+
+__author__ = "Markus Scherer"
+
+import re
+import xml.dom.minidom
+import emoji4unicode
+
+# The start tag of an <e> element, at the beginning of a line.
+# (Attribute values escape ">" as &gt;.)
+_e_start_re = re.compile(r"^<e [^>]*>", re.MULTILINE)
+_id_re = re.compile(r' id="([^"]*)"')
+_E_END = "\n</e>\n"
+
+class Editor(object):
+  """Edits <e> elements of an emoji4unicode.xml file.
+
+  Attributes:
+    ids: The symbol IDs in file order.
+  """
+  def __init__(self, filename):
+    """Reads the file and indexes its <e> elements."""
+    with open(filename, "rb") as file:
+      self.__contents = file.read()
+    self.ids = []
+    self.__spans = {}  # Map from ID to (start, limit) byte offsets.
+    self.__elements = {}  # Map from ID to the parsed element, if any.
+    contents = self.__contents
+    for match in _e_start_re.finditer(contents):
+      id_match = _id_re.search(match.group())
+      if not id_match:
+        raise ValueError("<e> element without id at byte offset %d" %
+                         match.start())
+      id = id_match.group(1)
+      if id in self.__spans:
+        raise ValueError("duplicate <e> element id %s" % id)
+      if match.group().endswith("/>"):
+        limit = match.end() + 1  # Include the line ending.
+      else:
+        limit = contents.index(_E_END, match.end()) + len(_E_END)
+      self.ids.append(id)
+      self.__spans[id] = (match.start(), limit)
+
+  def GetSpan(self, id):
+    """Returns the (start, limit) byte offsets of the symbol's element
+    in the file, including its line ending."""
+    return self.__spans[id]
+
+  def GetXML(self, id):
+    """Returns the symbol's element as it is in the file, as a byte str."""
+    (start, limit) = self.__spans[id]
+    return self.__contents[start:limit]
+
+  def GetElement(self, id):
+    """Returns the symbol's element for editing.
+
+    The element is parsed on first use. Its changes are written by Write().
+    It belongs to a document of its own: Create new child nodes
+    via element.ownerDocument.
+
+    Raises:
+      KeyError if there is no symbol with this ID.
+    """
+    element = self.__elements.get(id)
+    if element is None:
+      element = xml.dom.minidom.parseString(self.GetXML(id)).documentElement
+      self.__elements[id] = element
+    return element
+
+  def Write(self, filename):
+    """Writes the file with the edited elements.
+
+    The file contents between the edited elements are copied unchanged.
+    """
+    pieces = []
+    offset = 0
+    edits = sorted([(self.__spans[id], element)
+                    for (id, element) in self.__elements.iteritems()])
+    for ((start, limit), element) in edits:
+      xml_lines = emoji4unicode.ToXMLLines(element)
+      xml_lines.append(u"")
+      pieces.append(self.__contents[offset:start])
+      pieces.append(u"\n".join(xml_lines).encode("UTF-8"))
+      offset = limit
+    pieces.append(self.__contents[offset:])
+    with open(filename, "wb") as file:
+      file.write("".join(pieces))
@@ -0,0 +1,93 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for e4u_edit.py."""
+
+__author__ = "Markus Scherer"
+
+import os.path
+import shutil
+import tempfile
+import unittest
+import xml.dom.minidom
+import e4u_edit
+import emoji4unicode
+
+_E4U_FILENAME = os.path.join(os.path.dirname(__file__),
+                             "..", "data", "emoji4unicode.xml")
+
+def _Edit(symbol):
+  """Makes edits like the update_e4u_... scripts."""
+  if symbol.getAttribute("oldname"): symbol.removeAttribute("oldname")
+  symbol.setAttribute("name", symbol.getAttribute("name") + u" \u2603")
+  doc = symbol.ownerDocument
+  ann = doc.createElement("ann")
+  ann.appendChild(doc.createTextNode(u"= new <alias>"))
+  symbol.appendChild(ann)
+
+
+class EditorTest(unittest.TestCase):
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.editor = e4u_edit.Editor(_E4U_FILENAME)
+
+  def tearDown(self):
+    shutil.rmtree(self.folder)
+
+  def _Write(self, name, write):
+    filename = os.path.join(self.folder, name)
+    write(filename)
+    with open(filename, "rb") as file:
+      return file.read()
+
+  def testIndex(self):
+    with open(_E4U_FILENAME, "rb") as file:
+      contents = file.read()
+    self.assertEqual(contents.count("<e "), len(self.editor.ids))
+    self.assertEqual("000", self.editor.ids[0])
+    (start, limit) = self.editor.GetSpan("001")
+    self.assertEqual('<e docomo="E63F" google="FE001" id="001" kddi="E48D" '
+                     'name="CLOUD" softbank="E049" unicode="2601"/>\n',
+                     contents[start:limit])
+    self.assertTrue(self.editor.GetXML("000").endswith("\n</e>\n"))
+    self.assertRaises(KeyError, self.editor.GetElement, "XYZ")
+
+  def testUnchanged(self):
+    for id in self.editor.ids[:20]: self.editor.GetElement(id)
+    with open(_E4U_FILENAME, "rb") as file:
+      self.assertEqual(file.read(), self._Write("e4u.xml", self.editor.Write))
+
+  def testSameAsFullWrite(self):
+    ids = ["1CB", "000", "001", self.editor.ids[-1]]
+    for id in ids: _Edit(self.editor.GetElement(id))
+    doc = xml.dom.minidom.parse(_E4U_FILENAME)
+    for symbol in doc.getElementsByTagName("e"):
+      if symbol.getAttribute("id") in ids: _Edit(symbol)
+    self.assertEqual(
+        self._Write("full.xml", lambda filename: emoji4unicode.Write(doc,
+                                                                     filename)),
+        self._Write("edited.xml", self.editor.Write))
+
+  def testDuplicateID(self):
+    filename = os.path.join(self.folder, "dup.xml")
+    with open(filename, "wb") as file:
+      file.write('<emoji4unicode>\n<e id="001"/>\n<e id="001"/>\n'
+                 '</emoji4unicode>\n')
+    self.assertRaises(ValueError, e4u_edit.Editor, filename)
+
+
+if __name__ == "__main__":
+  unittest.main()
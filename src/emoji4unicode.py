@@ -19,19 +19,22 @@
 Reads emoji4unicode.xml, the carrier data files and other files
 and makes the data available.
 
-Also provides a Write() function for writing an XML document in
-the style of emoji4unicode.xml (to minimize diffs).
+Also provides Write() and ToXMLLines() functions for writing an XML document
+in the style of emoji4unicode.xml (to minimize diffs).
 
 Attributes:
   carriers: List of lowercase names of carriers for which we have CarrierData.
   all_carrier_data: Map from lowercase carrier name to CarrierData object.
   arib_ucm: UCMFile with ARIB-Unicode mappings.
   id_to_symbol: Map from symbol ID to Symbol object.
+  symbol_ids: List of all symbol IDs in document order.
+  id_to_index: Map from symbol ID to its index in symbol_ids,
+    for compact per-symbol arrays.
 """
 
 __author__ = "Markus Scherer"
 
-import codecs
+import hashlib
 import os.path
 import re
 import sys
@@ -50,6 +53,7 @@ def Load():
   """Parse emoji4unicode.xml and load related data."""
   # TODO(mscherer): Add argument for root data folder path.
   global carriers, all_carrier_data, arib_ucm, id_to_symbol
+  global symbol_ids, id_to_index
   global _kddi_to_google, _doc, _root, _id_to_proposed_uni
   if all_carrier_data: return  # Already loaded.
   carriers = ["docomo", "kddi", "softbank", "google"]
@@ -67,12 +71,16 @@ def Load():
   _root = _doc.documentElement
   # Preprocess the full set of symbols.
   id_to_symbol = {}
+  symbol_ids = []
+  id_to_index = {}
   high_uni = "%04X" % (_HIGH_UNI - 1)
   proposed_uni = high_uni
   _id_to_proposed_uni = {}
   _kddi_to_google = {}
   for symbol in GetSymbols():
     id_to_symbol[symbol.id] = symbol
+    id_to_index[symbol.id] = len(symbol_ids)
+    symbol_ids.append(symbol.id)
     # Read or enumerate proposed Unicode code points.
     if symbol.in_proposal:
       (proposed_uni, high_uni) = symbol._SetProposedUnicode(proposed_uni,
@@ -352,6 +360,19 @@ class Symbol(object):
     if uni: return uni
     return u""
 
+  def GetContentHash(self):
+    """Get a hash of this symbol's own data, for caching derived output.
+
+    Covers the symbol's XML element, its in_proposal status and its
+    proposed code point, but not the carrier data files.
+
+    Returns:
+      A hex SHA-1 digest string.
+    """
+    digest = hashlib.sha1(self.__element.toxml("UTF-8"))
+    digest.update("\n%s\n%s" % (self.in_proposal, self.GetProposedUnicode()))
+    return digest.hexdigest()
+
   def GetProposedProperties(self):
     """Get the proposed Unicode character properties for this new symbol.
 
@@ -396,7 +417,8 @@ class Symbol(object):
       global arib_ucm
       arib = arib_ucm.from_unicode.get(uni)
       if arib:
-        return row_cell.FromShiftJisString(arib).ToDecimalString()
+        return row_cell.FromShiftJis(ord(arib[0]),
+                                     ord(arib[1])).ToDecimalString()
       else:
         return None
 
@@ -478,14 +500,17 @@ def CarrierImageHTML(carrier, symbol):
 
 
 
-# The Writer class escapes characters that are neither Latin-1 nor Japanese.
+# Serializing an XML document in the style of emoji4unicode.xml:
+# One line per tag, no indentation, attributes sorted by name,
+# and an element with only text contents on one line
+# unless the text has line breaks.
+
+# Characters that are neither Latin-1 nor Japanese are escaped,
+# except in <e> start tags. (In particular, keep unescaped text
+# in <e text_fallback="...">.)
 _escape_re = re.compile(u"[^\0-\u007E\u00A1-\u00FF" +
                         u"\u3040-\u30FF\u4E00-\u9FFF\uFF01-\uFFEE]+")
 
-# The head of an element with text contents but no attributes,
-# like <ann>, <desc> or <design>.
-_simple_element_head_re = re.compile(u"<([a-zA-Z0-9_]+)>")
-
 def _EscapeChars(match):
   s = match.group(0)
   result = []
@@ -496,74 +521,93 @@ def _EscapeChars(match):
   return "".join(result)
 
 
-class _Writer(object):
-  """Minimizes emoji4unicode.xml changes when used in writexml()."""
-  def __init__(self, filename):
-    self.__out_file = codecs.open(filename, "w", "UTF-8")
-    self.__line = u""
-
-  def close(self):
-    self._WriteLine(self.__line)
-    self.__out_file.close()
-
-  def write(self, s):
-    # Append the new piece to the current line.
-    if self.__line: s = self.__line + s
-    # Keep a simple element with single-line text contents on one line.
-    if s.endswith(u"\n"):
-      head_match = _simple_element_head_re.match(s)
-      if head_match:
-        if len(s) == head_match.end() + 1:
-          # s == head + "\n"
-          s = head_match.group()  # Remove the trailing \n.
-        elif s[head_match.end()] == u"<":
-          # The element contains another element: Split the lines.
-          self._WriteLine(head_match.group())
-          s = s[head_match.end():]
-        else:
-          tail = u"</" + head_match.group(1) + u">\n"
-          if s.endswith(tail):
-            text = s[head_match.end():-len(tail)].strip()
-            if u"\n" in text:
-              # The element has multi-line contents: Split the lines.
-              self._WriteLine(head_match.group())
-              self._WriteLine(text)
-              self._WriteLine(tail[:-1])  # Remove the trailing \n.
-              s = u""
-          else:
-            text = s[head_match.end():].strip()
-            if u"\n" in text:
-              # The element has multi-line contents: Split the lines.
-              self._WriteLine(head_match.group())
-              self._WriteLine(text)
-              s = u""
-            else:
-              s = head_match.group() + text  # Strip the contents.
-    # Look for line ending.
-    # Look for only one, to not remove empty lines inside a multi-line value.
-    eol_index = s.rfind("\n")
-    if eol_index >= 0:
-      self.__line = s[eol_index + 1:]
-      self._WriteLine(s[:eol_index].strip())
+def _EscapeMarkup(s):
+  """Escapes s as in xml.dom.minidom for text and attribute values."""
+  return (s.replace(u"&", u"&amp;").replace(u"<", u"&lt;").
+          replace(u"\"", u"&quot;").replace(u">", u"&gt;"))
+
+
+def _AddTextElementLines(head, text, tail, has_attributes, lines):
+  """Adds the lines for an element whose only child is a text node."""
+  if not has_attributes and text.endswith(u"\n"):
+    text = text.strip()
+    if u"\n" in text:
+      # Multi-line contents: Tags on separate lines.
+      lines.extend((head, text, tail))
+    elif text:
+      lines.append(head + text + tail)
     else:
-      self.__line = s
-
-  def _WriteLine(self, line):
-    # Skip empty lines.
-    if line:
-      # Change escaping in elements other than <e>.
-      # (In particular, keep unescaped text in <e text_fallback="...">.)
-      if not line.startswith(u"<e "):
-        # Turn &quot; into real " for better readability.
-        line = line.replace(u"&quot;", u'"')
-        # Escape non-Latin-1, non-Japanese characters.
-        line = _escape_re.sub(_EscapeChars, line)
-      self.__out_file.write(line)
-      self.__out_file.write(u"\n")
+      lines.extend((head, tail))
+  elif u"\n" in text:
+    split = text.rfind(u"\n")
+    lines.append((head + text[:split]).rstrip())
+    lines.append((text[split + 1:] + tail).lstrip())
+  elif not has_attributes and not text:
+    lines.extend((head, tail))
+  else:
+    lines.append(head + text + tail)
+
+
+def _AddLines(node, lines):
+  """Adds the lines for a DOM node and its descendants."""
+  if node.nodeType == node.ELEMENT_NODE:
+    head = [u"<", node.tagName]
+    attributes = node.attributes
+    for name in sorted(attributes.keys()):
+      head.append(u' %s="%s"' % (name, _EscapeMarkup(attributes[name].value)))
+    children = node.childNodes
+    if not children:
+      head.append(u"/>")
+      lines.append(u"".join(head))
+      return
+    head.append(u">")
+    head = u"".join(head)
+    tail = u"</%s>" % node.tagName
+    if len(children) == 1 and children[0].nodeType == node.TEXT_NODE:
+      _AddTextElementLines(head, _EscapeMarkup(children[0].data), tail,
+                           bool(attributes.length), lines)
+      return
+    lines.append(head)
+    for child in children: _AddLines(child, lines)
+    lines.append(tail)
+  elif node.nodeType == node.TEXT_NODE:
+    # Skip the whitespace between elements.
+    text = _EscapeMarkup(node.data).strip()
+    if text: lines.append(text)
+  elif node.nodeType == node.COMMENT_NODE:
+    lines.append(u"<!--%s-->" % node.data)
+  elif node.nodeType == node.DOCUMENT_NODE:
+    lines.append(u'<?xml version="1.0" encoding="UTF-8"?>')
+    for child in node.childNodes: _AddLines(child, lines)
+  else:
+    raise ValueError("unsupported XML node type %d" % node.nodeType)
+
+
+def ToXMLLines(node):
+  """Returns the lines of a DOM node in the style of emoji4unicode.xml.
+
+  Args:
+    node: An xml.dom.minidom Document or Element.
+
+  Returns:
+    List of unicode strings without line endings.
+  """
+  lines = []
+  _AddLines(node, lines)
+  for (i, line) in enumerate(lines):
+    if not line.startswith(u"<e "):
+      # Turn &quot; into real " for better readability.
+      lines[i] = _escape_re.sub(_EscapeChars, line.replace(u"&quot;", u'"'))
+  return lines
 
 
 def Write(doc, filename):
-  """Writes an XML document in the style of emoji4unicode.xml."""
-  writer = _Writer(filename)
-  doc.writexml(writer, encoding="UTF-8", newl="\n")
-  writer.close()
+  """Writes an XML document in the style of emoji4unicode.xml.
+
+  Equivalent to doc.writexml() with minimal whitespace, but the layout
+  minimizes diffs: See ToXMLLines().
+  """
+  lines = ToXMLLines(doc)
+  lines.append(u"")
+  with open(filename, "wb") as file:
+    file.write(u"\n".join(lines).encode("UTF-8"))
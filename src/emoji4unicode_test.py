@@ -16,9 +16,13 @@
 
 __author__ = "Markus Scherer"
 
+import binascii
 import os.path
 import re
+import shutil
+import tempfile
 import unittest
+import xml.dom.minidom
 import emoji4unicode
 import ucm
 
@@ -45,9 +49,9 @@ class Emoji4UnicodeTest(unittest.TestCase):
       uni = symbol.GetUnicode()
       if uni and uni in self.__shift_jis_ucm.round_trip_code_points:
         shift_jis = self.__shift_jis_ucm.from_unicode.get(uni)
-        if shift_jis and shift_jis < "F":
+        if shift_jis and shift_jis[0] < "\xF0":
           msg = ("source separation error: e-%s = U+%s = Shift-JIS-%s" %
-                 (symbol.id, uni, shift_jis))
+                 (symbol.id, uni, binascii.hexlify(shift_jis).upper()))
           print msg
           errors.append(msg)
     self.failIf(errors, errors)
@@ -91,6 +95,20 @@ class Emoji4UnicodeTest(unittest.TestCase):
       self.failIf(symbol.id in symbol_ids, "Duplicate symbol ID %s" % symbol.id)
       symbol_ids.add(symbol.id)
 
+  def testSymbolIndexes(self):
+    """Verify that symbol indexes are dense and in document order."""
+    self.assertEqual(emoji4unicode.symbol_ids,
+                     [symbol.id for symbol in emoji4unicode.GetSymbols()])
+    for (index, symbol_id) in enumerate(emoji4unicode.symbol_ids):
+      self.assertEqual(emoji4unicode.id_to_index[symbol_id], index)
+
+  def testContentHashes(self):
+    """Verify that content hashes are stable and differ among symbols."""
+    symbols = list(emoji4unicode.GetSymbols())
+    hashes = [symbol.GetContentHash() for symbol in symbols]
+    self.assertEqual(len(set(hashes)), len(symbols))
+    self.assertEqual(symbols[0].GetContentHash(), hashes[0])
+
   def testGlyphIDs(self):
     """Verify that glyph IDs are unique, sufficient and contiguous."""
     glyph_ids = set()
@@ -111,6 +129,46 @@ class Emoji4UnicodeTest(unittest.TestCase):
     self.assert_(glyph_ids == full_set,
                  "Missing glyph IDs: %s" % (full_set - glyph_ids))
 
+  def testWriteRoundTrip(self):
+    """Writing the parsed emoji4unicode.xml reproduces the file."""
+    here = os.path.dirname(__file__)
+    filename = os.path.join(here, "..", "data", "emoji4unicode.xml")
+    folder = tempfile.mkdtemp()
+    try:
+      out_filename = os.path.join(folder, "emoji4unicode.xml")
+      emoji4unicode.Write(xml.dom.minidom.parse(filename), out_filename)
+      with open(filename, "rb") as file: expected = file.read()
+      with open(out_filename, "rb") as file: actual = file.read()
+      self.assertEqual(expected, actual)
+    finally:
+      shutil.rmtree(folder)
+
+  def testXMLLines(self):
+    doc = xml.dom.minidom.parseString(
+        '<emoji4unicode>\n<e id="001" name="A &amp; B" '
+        'text_fallback="\xe2\x98\x83">\n<ann>= x</ann>\n</e>\n'
+        '<e id="002"/>\n</emoji4unicode>')
+    (e1, e2) = doc.getElementsByTagName("e")
+    e1.setAttribute("oldname", u'"OLD"')
+    for text in (u"\u2603 <&> \"quoted\"", u"\ntwo\nlines\n", u""):
+      ann = doc.createElement("ann")
+      ann.appendChild(doc.createTextNode(text))
+      e2.appendChild(ann)
+    self.assertEqual(
+        [u'<?xml version="1.0" encoding="UTF-8"?>',
+         u"<emoji4unicode>",
+         u'<e id="001" name="A &amp; B" oldname="&quot;OLD&quot;" '
+         u'text_fallback="\u2603">',
+         u"<ann>= x</ann>",
+         u"</e>",
+         u'<e id="002">',
+         u'<ann>&#x2603; &lt;&amp;&gt; "quoted"</ann>',
+         u"<ann>", u"two\nlines", u"</ann>",
+         u"<ann>", u"</ann>",
+         u"</e>",
+         u"</emoji4unicode>"],
+        emoji4unicode.ToXMLLines(doc))
+
 
 if __name__ == "__main__":
   unittest.main()
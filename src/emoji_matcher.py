@@ -0,0 +1,225 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Detect and extract Emoji symbols in Unicode strings.
+
+A Matcher is built from every symbol's Unicode code point or sequence,
+its proposed code point, and its round-trip Google or carrier PUA code point.
+For symbols with standardized variation sequences, the sequences with
+U+FE0E and U+FE0F are added as well.
+
+All of these strings are folded into a code point trie which is then turned
+into a single compiled regular expression, so that matching is a single pass
+over the input, and sequences like keycaps, flags and variation sequences
+always match as one unit (the longest match wins).
+"""
+
+__author__ = "Markus Scherer"
+
+import re
+import emoji4unicode
+import utf
+
+def _Escape(c):
+  """Escapes a single character (code unit) for a regular expression."""
+  if c.isalnum(): return c
+  return u"\\" + c
+
+
+def _CharClass(chars):
+  """Returns a regular expression character class for the characters,
+  with runs of consecutive characters folded into ranges."""
+  ranges = []
+  for c in sorted(chars):
+    if ranges and ord(ranges[-1][1]) + 1 == ord(c):
+      ranges[-1][1] = c
+    else:
+      ranges.append([c, c])
+  pieces = []
+  for (start, end) in ranges:
+    pieces.append(_Escape(start))
+    if end != start: pieces.append(u"-" + _Escape(end))
+  return u"[" + u"".join(pieces) + u"]"
+
+
+def _PatternFromTrie(node):
+  """Turns a trie node into a regular expression pattern string.
+
+  Args:
+    node: A dict mapping characters to child nodes.
+      The None key marks the end of a string.
+
+  Returns:
+    A pattern which matches exactly the strings in the trie below the node,
+    with longest-match semantics.
+  """
+  leaves = []  # Characters that end a string and continue no further.
+  branches = []
+  for c in sorted([key for key in node if key is not None]):
+    child = node[c]
+    if len(child) == 1 and None in child:
+      leaves.append(c)
+    else:
+      branches.append(_Escape(c) + _PatternFromTrie(child))
+  if len(leaves) == 1:
+    branches.append(_Escape(leaves[0]))
+  elif leaves:
+    branches.append(_CharClass(leaves))
+  if not branches: return u""
+  if len(branches) == 1:
+    pattern = branches[0]
+    # A single character or a character class?
+    is_atom = bool(leaves)
+  else:
+    pattern = u"(?:" + u"|".join(branches) + u")"
+    is_atom = True
+  if None in node:
+    # This node ends a string, and longer strings continue from here.
+    if not is_atom: pattern = u"(?:" + pattern + u")"
+    pattern += u"?"
+  return pattern
+
+
+def _CodePointsString(uni):
+  """Turns '0023+20E3' into the corresponding Unicode string."""
+  return u"".join([utf.UTF.CodePointString(int(code, 16))
+                   for code in uni.split("+")])
+
+
+class Matcher(object):
+  """Finds Emoji symbols in Unicode strings."""
+  def __init__(self, pua_carriers=("google",), include_unicode=True):
+    """Build the matcher.
+
+    Do not instantiate directly for default settings: Use GetMatcher().
+
+    Args:
+      pua_carriers: Sequence of carrier names whose round-trip PUA code points
+        are to be matched. The carrier PUA ranges overlap (for example,
+        KDDI and SoftBank both use U+E4xx); for such a code point the first
+        carrier in the list wins.
+      include_unicode: If False, then only PUA code points are matched.
+    """
+    emoji4unicode.Load()
+    self._strings_to_ids = {}
+    for symbol in emoji4unicode.GetSymbols():
+      uni = symbol.GetUnicode()
+      if not uni and symbol.in_proposal: uni = symbol.GetProposedUnicode()
+      if uni and include_unicode:
+        self._AddString(_CodePointsString(uni), symbol.id)
+        if symbol.UnicodeHasVariationSequence():
+          # Insert the variation selector after the first code point,
+          # in particular before U+20E3 COMBINING ENCLOSING KEYCAP.
+          code_points = uni.split("+")
+          for vs in ("FE0E", "FE0F"):
+            vs_list = code_points[:1] + [vs] + code_points[1:]
+            self._AddString(_CodePointsString("+".join(vs_list)), symbol.id)
+      for carrier in pua_carriers:
+        code = symbol.GetCarrierUnicode(carrier)
+        if code and not code.startswith(">"):
+          self._AddString(_CodePointsString(code), symbol.id)
+    trie = {}
+    self._prefixes = set()  # Proper prefixes of the Emoji strings.
+    for s in self._strings_to_ids:
+      node = trie
+      for c in s: node = node.setdefault(c, {})
+      node[None] = None
+      for length in xrange(1, len(s)): self._prefixes.add(s[:length])
+    self._max_prefix_length = max([len(s) for s in self._prefixes] + [0])
+    # The lookahead for the possible initial characters lets the regular
+    # expression engine skip quickly over most non-Emoji text.
+    self._emoji_re = re.compile(u"(?=%s)%s" % (_CharClass(trie.keys()),
+                                               _PatternFromTrie(trie)))
+
+  def _AddString(self, s, symbol_id):
+    if s not in self._strings_to_ids: self._strings_to_ids[s] = symbol_id
+
+  def ContainsEmoji(self, s):
+    """Does the string contain at least one Emoji symbol?"""
+    return self._emoji_re.search(s) is not None
+
+  def FindEmoji(self, s):
+    """Finds the Emoji symbols in the string.
+
+    Yields:
+      (start, end, symbol_id) tuples in increasing start order.
+      start and end are string indexes as for s[start:end].
+    """
+    strings_to_ids = self._strings_to_ids
+    for match in self._emoji_re.finditer(s):
+      yield (match.start(), match.end(), strings_to_ids[match.group()])
+
+  def PartialEmojiLength(self, s):
+    """Returns the length of the longest suffix of the string which could be
+    continued into a longer Emoji string, for example "#" which could be
+    followed by U+20E3, or 0 if there is no such suffix.
+
+    Used for incremental processing, to hold back the end of one piece of
+    text until the next piece is available.
+    """
+    for length in xrange(min(len(s), self._max_prefix_length), 0, -1):
+      if s[-length:] in self._prefixes: return length
+    return 0
+
+  def SplitEmoji(self, s):
+    """Splits the string into Emoji symbols and the text between them.
+
+    Returns:
+      A list like from re.split() with a capturing group:
+      Text pieces at even indexes (possibly empty strings),
+      and Emoji symbol strings at odd indexes.
+    """
+    pieces = []
+    prev_end = 0
+    for (start, end, symbol_id) in self.FindEmoji(s):
+      pieces.append(s[prev_end:start])
+      pieces.append(s[start:end])
+      prev_end = end
+    pieces.append(s[prev_end:])
+    return pieces
+
+
+# Matcher singleton with default settings
+_MATCHER = None
+
+def GetMatcher():
+  global _MATCHER
+  if not _MATCHER: _MATCHER = Matcher()
+  return _MATCHER
+
+
+def ContainsEmoji(s):
+  """Does the string contain at least one Emoji symbol?
+
+  Uses the default Matcher. See Matcher.ContainsEmoji().
+  """
+  return GetMatcher().ContainsEmoji(s)
+
+
+def FindEmoji(s):
+  """Finds the Emoji symbols in the string.
+
+  Uses the default Matcher. See Matcher.FindEmoji().
+  """
+  return GetMatcher().FindEmoji(s)
+
+
+def SplitEmoji(s):
+  """Splits the string into Emoji symbols and the text between them.
+
+  Uses the default Matcher. See Matcher.SplitEmoji().
+  """
+  return GetMatcher().SplitEmoji(s)
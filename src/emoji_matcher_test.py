@@ -0,0 +1,87 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import unittest
+import emoji4unicode
+import emoji_matcher
+import utf
+
+_FLAG_JP = (utf.UTF.CodePointString(0x1F1EF) +
+            utf.UTF.CodePointString(0x1F1F5))
+_CYCLONE = utf.UTF.CodePointString(0x1F300)
+_GOOGLE_SUN = utf.UTF.CodePointString(0xFE000)
+
+class EmojiMatcherTest(unittest.TestCase):
+  def setUp(self):
+    emoji4unicode.Load()
+
+  def testContainsEmoji(self):
+    self.assert_(emoji_matcher.ContainsEmoji(u"It is \u2600 today"))
+    self.assert_(emoji_matcher.ContainsEmoji(_CYCLONE))
+    self.assert_(emoji_matcher.ContainsEmoji(_GOOGLE_SUN))
+    self.failIf(emoji_matcher.ContainsEmoji(u"plain text \u3042"))
+
+  def testFindEmoji(self):
+    s = u"a\u2600b" + _GOOGLE_SUN
+    self.assertEqual(list(emoji_matcher.FindEmoji(s)),
+                     [(1, 2, "000"), (3, 3 + len(_GOOGLE_SUN), "000")])
+
+  def testSequences(self):
+    # Keycap with and without the emoji style variation selector.
+    s = u"#\u20e3 #\ufe0f\u20e3 #"
+    self.assertEqual([(start, end) for (start, end, symbol_id)
+                      in emoji_matcher.FindEmoji(s)],
+                     [(0, 2), (3, 6)])
+    # A flag is a pair of regional indicator symbols.
+    found = list(emoji_matcher.FindEmoji(u"x" + _FLAG_JP))
+    self.assertEqual(len(found), 1)
+    self.assertEqual(found[0][0:2], (1, 1 + len(_FLAG_JP)))
+    # Variation selector after a single code point.
+    self.assertEqual(list(emoji_matcher.FindEmoji(u"\u2600\ufe0e")),
+                     [(0, 2, "000")])
+
+  def testAllSymbolsMatch(self):
+    for symbol in emoji4unicode.GetSymbols():
+      google = symbol.GetCarrierUnicode("google")
+      if not google or google.startswith(">"): continue
+      s = utf.UTF.CodePointString(int(google, 16))
+      self.assertEqual(list(emoji_matcher.FindEmoji(s)),
+                       [(0, len(s), symbol.id)])
+
+  def testSplitEmoji(self):
+    self.assertEqual(emoji_matcher.SplitEmoji(u"a\u2600\u2601bc"),
+                     [u"a", u"\u2600", u"", u"\u2601", u"bc"])
+    self.assertEqual(emoji_matcher.SplitEmoji(u"abc"), [u"abc"])
+
+  def testCarrierPUA(self):
+    matcher = emoji_matcher.Matcher(("kddi", "softbank"))
+    # U+E488 is the KDDI sun; U+E04A is the SoftBank sun.
+    self.assertEqual([symbol_id for (start, end, symbol_id)
+                      in matcher.FindEmoji(u"\ue488\ue04a")],
+                     ["000", "000"])
+
+  def testPartialEmojiLength(self):
+    matcher = emoji_matcher.GetMatcher()
+    self.assertEqual(matcher.PartialEmojiLength(u"ab#"), 1)
+    self.assertEqual(matcher.PartialEmojiLength(u"ab#\ufe0f"), 2)
+    self.assertEqual(matcher.PartialEmojiLength(u"ab#\u20e3"), 0)
+    self.assertEqual(matcher.PartialEmojiLength(u""), 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
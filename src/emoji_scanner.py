@@ -0,0 +1,205 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Locate carrier Emoji symbols in large byte buffers without decoding them.
+
+A scanner searches for the few byte values that can start an Emoji symbol code
+(the carrier's Shift-JIS lead bytes, or the UTF-8 prefixes of the carrier's
+Private Use code points) with a compiled regular expression,
+and jumps from one candidate to the next.
+Only the candidate bytes are looked up; the rest of the text is never decoded.
+
+Scanners work on str objects and on anything else that supports the buffer
+interface, in particular mmap objects. See ScanFile().
+"""
+
+__author__ = "Markus Scherer"
+
+import mmap
+import re
+import emoji4unicode
+import utf
+
+def _LeadByteClass(lead_bytes):
+  """Returns a regular expression character class string for the bytes."""
+  return "[%s]" % "".join(["\\x%02x" % b for b in sorted(lead_bytes)])
+
+
+def _IsShiftJisLead(b):
+  """Is the byte value a Shift-JIS double-byte lead byte?"""
+  return 0x81 <= b <= 0x9f or 0xe0 <= b <= 0xfc
+
+
+class _Scanner(object):
+  """Base class for Emoji symbol scanners.
+
+  Subclasses set _code_re and _codes_to_ids.
+  """
+  def Count(self, data, start=0, end=None):
+    """Returns the number of Emoji symbols in data[start:end]."""
+    count = 0
+    for match in self.Scan(data, start, end): count += 1
+    return count
+
+
+class ShiftJisScanner(_Scanner):
+  """Finds one carrier's Emoji symbols in Shift-JIS text."""
+  def __init__(self, carrier):
+    """Build the scanner for one carrier.
+
+    Do not instantiate directly: Use GetShiftJisScanner().
+
+    Args:
+      carrier: "docomo", "kddi" or "softbank"
+    """
+    emoji4unicode.Load()
+    one_carrier_data = emoji4unicode.all_carrier_data[carrier]
+    self._codes_to_ids = {}
+    for symbol in emoji4unicode.GetSymbols():
+      code = symbol.GetCarrierUnicode(carrier)
+      if not code or code.startswith(">"): continue
+      shift_jis = one_carrier_data.SymbolFromUnicode(code).shift_jis
+      if shift_jis:
+        self._codes_to_ids[chr(int(shift_jis[0:2], 16)) +
+                           chr(int(shift_jis[2:4], 16))] = symbol.id
+    lead_bytes = one_carrier_data.GetShiftJISLeadBytes()
+    self._code_re = re.compile(_LeadByteClass(lead_bytes) +
+                               "[\\x40-\\x7e\\x80-\\xfc]")
+
+  def Scan(self, data, start=0, end=None):
+    """Finds the carrier Emoji symbols in data[start:end].
+
+    The Emoji lead bytes are also valid Shift-JIS trail bytes.
+    For each candidate we therefore verify that it begins on a character
+    boundary: We count the lead-byte values that precede it, back to a byte
+    which cannot be a lead byte (a boundary follows it) or to the end of the
+    previous candidate. The candidate is a character if that count is even.
+
+    Args:
+      data: Shift-JIS bytes, as a str or an mmap or other buffer.
+        data[start] must be at a character boundary.
+      start: Start offset.
+      end: Limit offset, or None for the end of the data.
+
+    Yields:
+      (offset, symbol_id) pairs in increasing offset order.
+    """
+    if end is None: end = len(data)
+    code_re = self._code_re
+    codes_to_ids = self._codes_to_ids
+    boundary = start  # Known character boundary.
+    pos = start
+    while True:
+      match = code_re.search(data, pos, end)
+      if not match: return
+      offset = match.start()
+      i = offset
+      while i > boundary and _IsShiftJisLead(ord(data[i - 1])): i -= 1
+      if (offset - i) & 1:
+        # The candidate lead byte is the trail byte of the previous character.
+        boundary = pos = offset + 1
+        continue
+      code = match.group()
+      symbol_id = codes_to_ids.get(code)
+      if symbol_id: yield (offset, symbol_id)
+      boundary = pos = offset + 2
+
+
+class UTF8Scanner(_Scanner):
+  """Finds Emoji symbols encoded with one carrier's or Google's PUA
+  code points in UTF-8 text."""
+  def __init__(self, carrier):
+    """Build the scanner for one carrier.
+
+    Do not instantiate directly: Use GetUTF8Scanner().
+
+    Args:
+      carrier: "docomo", "kddi", "softbank" or "google"
+    """
+    emoji4unicode.Load()
+    self._codes_to_ids = {}
+    for symbol in emoji4unicode.GetSymbols():
+      code = symbol.GetCarrierUnicode(carrier)
+      if not code or code.startswith(">"): continue
+      utf8 = utf.UTF.CodePointString(int(code, 16)).encode("UTF-8")
+      self._codes_to_ids[utf8] = symbol.id
+    # All but the last byte of each code point.
+    # For example, EE 98 for U+E600..U+E63F and F3 BE 80 for U+FE000..U+FE03F.
+    prefixes = set([utf8[:-1] for utf8 in self._codes_to_ids])
+    self._code_re = re.compile(
+        "(?:%s)[\\x80-\\xbf]" %
+        "|".join([re.escape(prefix) for prefix in sorted(prefixes)]))
+
+  def Scan(self, data, start=0, end=None):
+    """Finds the Emoji symbols in data[start:end].
+
+    Args:
+      data: UTF-8 bytes, as a str or an mmap or other buffer.
+      start: Start offset.
+      end: Limit offset, or None for the end of the data.
+
+    Yields:
+      (offset, symbol_id) pairs in increasing offset order.
+    """
+    if end is None: end = len(data)
+    codes_to_ids = self._codes_to_ids
+    for match in self._code_re.finditer(data, start, end):
+      symbol_id = codes_to_ids.get(match.group())
+      if symbol_id: yield (match.start(), symbol_id)
+
+
+def ScanFile(filename, scanner):
+  """Finds the Emoji symbols in a file via a read-only memory map.
+
+  Args:
+    filename: Path/filename of the Shift-JIS or UTF-8 file.
+    scanner: A ShiftJisScanner or UTF8Scanner instance.
+
+  Yields:
+    (offset, symbol_id) pairs in increasing offset order.
+  """
+  in_file = open(filename, "rb")
+  try:
+    # mmap cannot map an empty file.
+    if not in_file.read(1): return
+    data = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+      for result in scanner.Scan(data):
+        yield result
+    finally:
+      data.close()
+  finally:
+    in_file.close()
+
+
+# Scanner singletons, per carrier
+_shift_jis_scanners = {}
+_utf8_scanners = {}
+
+def GetShiftJisScanner(carrier):
+  """Returns the carrier's shared ShiftJisScanner, built on first use."""
+  scanner = _shift_jis_scanners.get(carrier)
+  if not scanner:
+    scanner = _shift_jis_scanners[carrier] = ShiftJisScanner(carrier)
+  return scanner
+
+
+def GetUTF8Scanner(carrier):
+  """Returns the carrier's shared UTF8Scanner, built on first use."""
+  scanner = _utf8_scanners.get(carrier)
+  if not scanner:
+    scanner = _utf8_scanners[carrier] = UTF8Scanner(carrier)
+  return scanner
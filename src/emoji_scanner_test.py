@@ -0,0 +1,71 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import os
+import tempfile
+import unittest
+import emoji_scanner
+
+class ShiftJisScannerTest(unittest.TestCase):
+  def setUp(self):
+    self.__scanner = emoji_scanner.GetShiftJisScanner("docomo")
+
+  def testScan(self):
+    # "a", DoCoMo F89F (e-000), Shift-JIS 82A0 (Hiragana A), DoCoMo F8A1.
+    data = "a\xf8\x9f\x82\xa0\xf8\xa1"
+    self.assertEqual(list(self.__scanner.Scan(data)),
+                     [(1, "000"), (5, "002")])
+    self.assertEqual(self.__scanner.Count(data), 2)
+    self.assertEqual(list(self.__scanner.Scan(data, 3)), [(5, "002")])
+
+  def testTrailByteIsNotALead(self):
+    # 88F8 is a Kanji; the following F89F must not be seen as F8 9F.
+    data = "\x88\xf8\x9f\x41"
+    self.assertEqual(list(self.__scanner.Scan(data)), [])
+    # Two Kanji 88F8 8899 followed by a real DoCoMo F89F.
+    data = "\x88\xf8\x88\x99\xf8\x9f"
+    self.assertEqual(list(self.__scanner.Scan(data)), [(4, "000")])
+
+  def testScanFile(self):
+    (fd, filename) = tempfile.mkstemp()
+    try:
+      os.write(fd, "x" * 10000 + "\xf8\x9f" + "y" * 10000)
+      os.close(fd)
+      self.assertEqual(list(emoji_scanner.ScanFile(filename, self.__scanner)),
+                       [(10000, "000")])
+    finally:
+      os.remove(filename)
+
+
+class UTF8ScannerTest(unittest.TestCase):
+  def testGoogle(self):
+    scanner = emoji_scanner.GetUTF8Scanner("google")
+    # U+FE000 (e-000), U+3042, U+FE001 (e-001), U+FEFFF (unassigned).
+    data = ("\xf3\xbe\x80\x80\xe3\x81\x82\xf3\xbe\x80\x81"
+            "\xf3\xbe\xbf\xbf")
+    self.assertEqual(list(scanner.Scan(data)), [(0, "000"), (7, "001")])
+
+  def testKddi(self):
+    scanner = emoji_scanner.GetUTF8Scanner("kddi")
+    # U+E488 (e-000) but not U+E63E which is a DoCoMo code point.
+    data = "ab\xee\x92\x88\xee\x98\xbe"
+    self.assertEqual(list(scanner.Scan(data)), [(2, "000")])
+
+
+if __name__ == "__main__":
+  unittest.main()
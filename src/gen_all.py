@@ -0,0 +1,259 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Regenerate the generated files whose inputs changed.
+
+Each generator is listed with its input files: the data files it reads and
+the Python modules it uses. The driver records the content hashes of the
+inputs after each successful run and runs a generator again only if one of
+its inputs changed or one of its outputs is missing. Outputs which are not
+known in advance, like the pages of a sharded chart, are reported by the
+generator and recorded in the state file as well.
+The generators write their outputs via gen_output, which does not rewrite
+a file with unchanged contents.
+
+The data files are parsed once, in this process. The stale generators then
+run in a pool of worker processes which are forked after loading, so that
+they share the parsed data rather than each parsing it again.
+(The generators are CPU-bound, so threads would not run them in parallel.)
+
+Usage: gen_all.py [--force] [--jobs=N]
+  --force: Run all generators.
+  --jobs=N: Number of worker processes; default: the number of CPUs.
+      With --jobs=1 the generators run one after another in this process.
+"""
+
+__author__ = "Markus Scherer"
+
+import hashlib
+import json
+import multiprocessing
+import os
+import os.path
+import sys
+import traceback
+import emoji4unicode
+import gen_conversion_files
+import gen_html
+import gen_output
+import gen_sources_file
+import unicode_age
+
+# Paths are relative to this source folder.
+_GENERATED = os.path.join("..", "generated")
+_STATE_FILENAME = os.path.join(_GENERATED, ".gen_all_state")
+
+# Inputs for every generator that calls emoji4unicode.Load().
+_E4U_INPUTS = (
+    "../data/emoji4unicode.xml",
+    "../data/docomo/carrier_data.xml",
+    "../data/kddi/carrier_data.xml",
+    "../data/softbank/carrier_data.xml",
+    "../data/arib/arib.ucm",
+    "../data/unicode/StandardizedVariants.txt",
+    "emoji4unicode.py",
+    "carrier_data.py",
+    "row_cell.py",
+    "standardized_variants.py",
+    "ucd.py",
+    "ucm.py",
+    "utf.py",
+    "gen_output.py")
+
+_HTML_INPUTS = _E4U_INPUTS + (
+    "../data/unicode/DerivedAge.txt",
+    "chart_data.py",
+    "gen_html.py",
+    "translit.py",
+    "unicode_age.py")
+
+class _Generator(object):
+  """A generator function with its inputs and outputs.
+
+  Attributes:
+    name: Unique name, used as the key in the state file.
+    function: Called without arguments to write the outputs.
+        Returns None, or a list of the filenames it wrote, for outputs
+        which are not listed in advance.
+    args: Equivalent script filename and command-line arguments,
+        for the progress output.
+    inputs: Input filenames.
+    outputs: Output filenames.
+  """
+  def __init__(self, name, function, args, inputs, outputs):
+    self.name = name
+    self.function = function
+    self.args = args
+    self.inputs = inputs
+    self.outputs = outputs
+
+
+# Same as in gen_html.sh.
+_CHARTS = (
+    ("full.html", []),
+    ("utc.html", ["--only_in_proposal"]),
+    ("short.html", ["--no_codes"]),
+    ("proposed.html", ["--proposed_by_unicode", "--show_only_font_chars"]),
+    ("utc_pdf.html", ["--only_in_proposal", "--show_only_font_chars"]),
+    ("emojidata.html", ["--emoji_data"]),
+    ("full_by_category.html", ["--shard_by_category"]),
+    ("chart.html", ["--json"]))
+
+_HTML_CACHE_FILENAME = os.path.join(_GENERATED, ".gen_html_cache")
+
+def _GenerateCharts():
+  # All charts in one generator, so that they share the rendered cells.
+  return gen_html.GenerateFiles([(flags, os.path.join(_GENERATED, output))
+                                 for (output, flags) in _CHARTS],
+                                _HTML_CACHE_FILENAME)
+
+
+def _ConversionOutputs():
+  outputs = [os.path.join(_GENERATED, "transform_gpua.txt")]
+  for name in ("docomo-shift_jis", "docomo-jisx_208",
+               "kddi-shift_jis", "kddi-jisx_208", "softbank-shift_jis"):
+    for suffix in ("partial.ucm", "partial.bin", "2012.ucm", "2012.bin"):
+      outputs.append(os.path.join(_GENERATED, "%s-%s" % (name, suffix)))
+  return tuple(outputs)
+
+
+_GENERATORS = (
+    _Generator("charts", _GenerateCharts,
+               ("gen_html.py", "--cache", _HTML_CACHE_FILENAME, "..."),
+               _HTML_INPUTS,
+               tuple([os.path.join(_GENERATED, output)
+                      for (output, flags) in _CHARTS] +
+                     [os.path.join(_GENERATED, "chart.json")])),
+    _Generator("EmojiSources.txt", gen_sources_file.Generate,
+               ("gen_sources_file.py",),
+               _E4U_INPUTS + ("gen_sources_file.py",),
+               (os.path.join(_GENERATED, "EmojiSources.txt"),)),
+    _Generator("conversion_files", gen_conversion_files.Generate,
+               ("gen_conversion_files.py",),
+               _E4U_INPUTS + ("../data/icu/windows-932-2000.ucm",
+                              "code_point_trie.py",
+                              "conversion_table.py",
+                              "gen_conversion_files.py"),
+               _ConversionOutputs()))
+
+_hashes = {}
+
+def _GetHash(filename):
+  """Returns the hex SHA-1 hash of the file contents, computed once per run."""
+  file_hash = _hashes.get(filename)
+  if not file_hash:
+    with open(filename, "rb") as reader:
+      file_hash = _hashes[filename] = hashlib.sha1(reader.read()).hexdigest()
+  return file_hash
+
+
+def _ReadState():
+  try:
+    with open(_STATE_FILENAME, "r") as reader:
+      return json.load(reader)
+  except (IOError, ValueError):
+    return {}
+
+
+def _WriteState(state):
+  gen_output.WriteIfChanged(_STATE_FILENAME,
+                            json.dumps(state, indent=1, sort_keys=True) + "\n")
+
+
+def _IsUpToDate(generator, input_hashes, state):
+  """Returns True if the generator's inputs have the recorded hashes
+  and all of its outputs exist, including the ones recorded after
+  its last run."""
+  generator_state = state.get(generator.name)
+  if not generator_state or generator_state.get("inputs") != input_hashes:
+    return False
+  for filename in generator.outputs + tuple(generator_state["outputs"]):
+    if not os.path.exists(filename): return False
+  return True
+
+
+def _Run(index):
+  """Runs _GENERATORS[index] in this process.
+
+  Module-level function so that a multiprocessing pool can call it
+  with just the index.
+
+  Returns:
+    The sorted list of the outputs which the generator reported
+    in addition to its listed ones, or None if it failed.
+  """
+  generator = _GENERATORS[index]
+  try:
+    filenames = generator.function() or []
+    return sorted(set(filenames) - set(generator.outputs))
+  except Exception:
+    traceback.print_exc()
+    return None
+
+
+def main():
+  force = False
+  jobs = 0
+  for arg in sys.argv[1:]:
+    if arg == "--force": force = True
+    if arg.startswith("--jobs="): jobs = int(arg[7:])
+  os.chdir(os.path.dirname(os.path.abspath(__file__)))
+  if not os.path.isdir(_GENERATED): os.makedirs(_GENERATED)
+  # Drop the entries of generators that no longer exist.
+  state = dict([(name, generator_state)
+                for (name, generator_state) in _ReadState().iteritems()
+                if name in [generator.name for generator in _GENERATORS]])
+  stale = []  # (index, input_hashes) pairs
+  for (index, generator) in enumerate(_GENERATORS):
+    input_hashes = dict([(filename, _GetHash(filename))
+                         for filename in generator.inputs])
+    if not force and _IsUpToDate(generator, input_hashes, state):
+      print "%s: up to date" % generator.name
+      continue
+    print "%s: running %s" % (generator.name, " ".join(generator.args))
+    stale.append((index, input_hashes))
+  if not stale: return
+  # Parse the data once, before forking.
+  emoji4unicode.Load()
+  unicode_age.Load()
+  indexes = [index for (index, input_hashes) in stale]
+  if not jobs: jobs = multiprocessing.cpu_count()
+  jobs = min(jobs, len(stale))
+  if jobs <= 1:
+    results = map(_Run, indexes)
+  else:
+    pool = multiprocessing.Pool(jobs)
+    try:
+      results = pool.map(_Run, indexes)
+    finally:
+      pool.close()
+      pool.join()
+  failed = []
+  for ((index, input_hashes), outputs) in zip(stale, results):
+    name = _GENERATORS[index].name
+    if outputs is not None:
+      state[name] = {"inputs": input_hashes, "outputs": outputs}
+    else:
+      failed.append(name)
+      state.pop(name, None)
+  _WriteState(state)
+  if failed:
+    print "failed: %s" % " ".join(failed)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
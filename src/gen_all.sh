@@ -15,10 +15,10 @@
 #
 # Author: Markus Scherer
 
-mkdir -p ../generated
+# gen_all.py runs gen_html.py, gen_sources_file.py and gen_conversion_files.py
+# but only those whose inputs changed since the last run.
+# Use ./gen_all.sh --force to regenerate everything.
 # (was only used for proposal process) ./gen_font_data.py
-./gen_html.sh
-./gen_sources_file.py
-./gen_conversion_files.py
 # (was only used for proposal process) ./gen_names_list.py
 # (was only used for proposal process) ./gen_chart_font_list.py
+./gen_all.py "$@"
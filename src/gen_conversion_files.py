@@ -18,12 +18,14 @@
 
 __author__ = "Markus Scherer"
 
-import codecs
 import os.path
 import re
 import sys
+import conversion_table
 import emoji4unicode
+import gen_output
 import row_cell
+import ucm
 
 def _CarrierSymbolToBytes(carrier_symbol, for_sjis):
   """Takes a single carrier private use Unicode code point and returns
@@ -37,18 +39,19 @@ def _CarrierSymbolToBytes(carrier_symbol, for_sjis):
     if not carrier_symbol.jis: return ""
     carrier_bytes = ""
     for jis in carrier_symbol.jis.split("+"):
-      carrier_bytes += row_cell.From2022String(jis).ToShiftJisString()
+      carrier_bytes += "%04X" % row_cell.ShiftJisFromJis(int(jis, 16))
   b = ""
   for i in xrange(0, len(carrier_bytes), 2):
     b += u"\\x" + carrier_bytes[i:i + 2]
   return b
 
 
-def _WriteMappings(writer, carrier, for_sjis):
-  """Writes Emoji carrier mappings in ICU .ucm format."""
+def _GetMappings(carrier, for_sjis):
+  """Returns the Emoji carrier mappings in ICU .ucm format, as one string."""
   carrier_data = emoji4unicode.all_carrier_data[carrier]
+  lines = []
   gpua_fallbacks = []
-  writer.write(u"# Mappings for Unicode Standard Emoji symbols.\n")
+  lines.append(u"# Mappings for Unicode Standard Emoji symbols.\n")
   symbols = emoji4unicode.GetSymbolsSortedByUnicode()
   for (cp_list, symbol) in symbols:
     code = symbol.GetCarrierUnicode(carrier)
@@ -87,7 +90,7 @@ def _WriteMappings(writer, carrier, for_sjis):
       # A |4 "good one-way" mapping is a one-way mapping, like a fallback,
       # but it is always taken, regardless of the use-fallback flag.
       non_emoji_style_precision = "|4" if precision == "|0" else precision
-      writer.write(u"%s %s %s\n" % (uni, b, non_emoji_style_precision))
+      lines.append(u"%s %s %s\n" % (uni, b, non_emoji_style_precision))
       # Add fallback mappings from "text style" and "emoji style"
       # Variation Selector sequences.
       vs_list = cp_list
@@ -97,12 +100,12 @@ def _WriteMappings(writer, carrier, for_sjis):
       # the second code point.
       vs_list.insert(1, 0xfe0e)  # VS15 for text style
       uni = "+".join([u"<U%04X>" % cp for cp in vs_list])
-      writer.write(u"%s %s %s\n" % (uni, b, non_emoji_style_precision))
+      lines.append(u"%s %s %s\n" % (uni, b, non_emoji_style_precision))
       vs_list[1] = 0xfe0f  # VS16 for emoji style
       uni = "+".join([u"<U%04X>" % cp for cp in vs_list])
-      writer.write(u"%s %s %s\n" % (uni, b, precision))
+      lines.append(u"%s %s %s\n" % (uni, b, precision))
     else:
-      writer.write(u"%s %s %s\n" % (uni, b, precision))
+      lines.append(u"%s %s %s\n" % (uni, b, precision))
     if cp_list[0] < 0xF0000:
       google_uni = symbol.GetCarrierUnicode("google")
       if google_uni:
@@ -114,24 +117,74 @@ def _WriteMappings(writer, carrier, for_sjis):
           reverse_precision = "|1"  # legacy fallback _from_ Google PUA
         gpua_fallbacks.append(u"<U%s> %s %s\n" %
                               (google_uni, b, reverse_precision))
-  writer.write(u"# Fallbacks for Google PUA code points, "
-                "for Unicode Standard Emoji symbols.\n")
+  lines.append(u"# Fallbacks for Google PUA code points, "
+               "for Unicode Standard Emoji symbols.\n")
   gpua_fallbacks.sort()
-  for fallback in gpua_fallbacks:
-    writer.write(fallback)
+  lines.extend(gpua_fallbacks)
+  return u"".join(lines)
 
 
-def _WritePartialMappingFile(path, carrier, for_sjis):
+def _WritePartialMappingFile(path, carrier, for_sjis, mappings,
+                             parsed_mappings):
   type = "shift_jis" if for_sjis else "jisx_208"
   filename = os.path.join(path, "%s-%s-partial.ucm" % (carrier, type))
-  with codecs.open(filename, "w", "UTF-8") as writer:
-    _WriteMappings(writer, carrier, for_sjis)
+  with gen_output.Open(filename) as writer:
+    writer.write(mappings)
+  # The same mappings as a memory-mappable binary table.
+  filename = os.path.join(path, "%s-%s-partial.bin" % (carrier, type))
+  with gen_output.Open(filename) as writer:
+    writer.write(conversion_table.Build(parsed_mappings))
 
 
-_lead_byte_re = re.compile(u"^<U.+> +\\\\x([0-9A-Fa-f]{2})")
+_lead_byte_re = re.compile("^<U.+> +\\\\x([0-9A-Fa-f]{2})")
 
-def _WriteCompleteMappingFile(sjis_reader, path, carrier, for_sjis):
-  sjis_reader.seek(0, 0)
+class _BaseMappingTable(object):
+  """The base Shift-JIS .ucm file, read once for all complete mapping files.
+
+  Attributes:
+    lines: List of the lines of the file.
+    end_charmap_index: Index of the END CHARMAP line.
+    lead_byte_lines: Map from a lead byte value to the set of indexes of
+      the lines with mappings with that lead byte.
+    mappings: List of (unicode, bytes, precision) mappings,
+      parsed as by ucm.ParseMappings().
+  """
+  def __init__(self, filename):
+    with open(filename, "r") as reader:
+      self.lines = reader.readlines()
+    self.end_charmap_index = len(self.lines)
+    self.lead_byte_lines = {}
+    for (i, line) in enumerate(self.lines):
+      if line.startswith("END CHARMAP"):
+        self.end_charmap_index = i
+        break
+      match = _lead_byte_re.match(line)
+      if match:
+        lead_byte = int(match.group(1), 16)
+        self.lead_byte_lines.setdefault(lead_byte, set()).add(i)
+    head = "".join(self.lines[:self.end_charmap_index])
+    self.mappings = ucm.ParseMappings(head, head.find("\nCHARMAP") + 1)
+
+  def GetLinesWithout(self, lead_bytes):
+    """Returns the text before END CHARMAP, without the lines with mappings
+    with the given lead bytes, and the text from END CHARMAP to the end."""
+    excluded = set()
+    for lead_byte in lead_bytes:
+      excluded.update(self.lead_byte_lines.get(lead_byte, ()))
+    end = self.end_charmap_index
+    head = "".join([line for (i, line) in enumerate(self.lines[:end])
+                    if i not in excluded])
+    return (head, "".join(self.lines[end:]))
+
+  def GetMappingsWithout(self, lead_bytes):
+    """Returns the parsed mappings without those with the given lead bytes."""
+    lead_bytes = frozenset(lead_bytes)
+    return [mapping for mapping in self.mappings
+            if ord(mapping[1][0]) not in lead_bytes]
+
+
+def _WriteCompleteMappingFile(base_table, path, carrier, for_sjis, mappings,
+                              parsed_mappings):
   carrier_data = emoji4unicode.all_carrier_data[carrier]
   if for_sjis:
     lead_bytes = carrier_data.GetShiftJISLeadBytes()
@@ -139,34 +192,22 @@ def _WriteCompleteMappingFile(sjis_reader, path, carrier, for_sjis):
     lead_bytes = carrier_data.GetJISLeadBytesAsShiftJIS()
   type = "shift_jis" if for_sjis else "jisx_208"
   filename = os.path.join(path, "%s-%s-2012.ucm" % (carrier, type))
-  with codecs.open(filename, "w", "UTF-8") as writer:
-    for line in sjis_reader:
-      if line.startswith("END CHARMAP"):
-        _WriteMappings(writer, carrier, for_sjis)
-      # Copy all lines except for those with mappings with Emoji lead bytes.
-      match = _lead_byte_re.match(line)
-      if not match or int(match.group(1), 16) not in lead_bytes:
-        writer.write(line)
+  # Copy all lines except for those with mappings with Emoji lead bytes,
+  # and insert the Emoji mappings before END CHARMAP.
+  (head, tail) = base_table.GetLinesWithout(lead_bytes)
+  with gen_output.Open(filename) as writer:
+    writer.write(head + mappings + tail)
+  # The same mappings as a memory-mappable binary table.
+  filename = os.path.join(path, "%s-%s-2012.bin" % (carrier, type))
+  with gen_output.Open(filename) as writer:
+    writer.write(conversion_table.Build(
+        base_table.GetMappingsWithout(lead_bytes) + parsed_mappings))
 
 
-def _WriteGooglePUATransformFile(writer):
-  """Writes data for transforming Google PUA to Unicode 6.1 Emoji."""
+def _GetGooglePUAMap():
+  """Returns a dictionary from Google PUA code points to 32-bit values
+  for the standard Unicode Emoji, as described in transform_gpua.txt."""
   gpua_map = {}
-  gpua_per16 = [False] * 256  # Boolean per 16 code points <= FEFFF
-  gpua_index = [0xff] * 64  # 0xff = none of 64 gpua's has a mapping
-  max_gpua = 0
-  writer.write(u"""// Mapping from Google PUA to Unicode 6.1 Emoji.
-// Folded array maps code points U+FE000..U+FEFFF to
-// 32-bit values as follows (0 = no mapping):
-// Bits 20.. 0: first code point
-// Bits 28..24: second code point
-//                   0: none
-//                   1: U+20E3 COMBINING ENCLOSING KEYCAP
-//              06..1f: U+1F1E6 REGIONAL INDICATOR SYMBOL LETTER A..
-//                      U+1F1FF REGIONAL INDICATOR SYMBOL LETTER Z
-// Bit      30: set if the symbol has variation selector sequences, see
-//              http://www.unicode.org/Public/UNIDATA/StandardizedVariants.html
-""")
   symbols = emoji4unicode.GetSymbolsSortedByUnicode()
   for (cp_list, symbol) in symbols:
     google_uni = symbol.GetCarrierUnicode("google")
@@ -198,13 +239,34 @@ def _WriteGooglePUATransformFile(writer):
     if gpua in gpua_map:
       raise ValueError("Google PUA U+%s maps to multiple symbols" % google_uni)
     gpua_map[gpua] = value
-    gpua_per16[(gpua - 0xfe000) >> 4] = True
-    gpua_index[(gpua - 0xfe000) >> 6] = 0
-    if gpua > max_gpua: max_gpua = gpua
-  writer.write(u"// Google PUA mappings for U+FE000..U+%04X\n" % (max_gpua))
   if not gpua_map:
     raise ValueError("no Google PUA code points found with " +
                      "mappings to standard Unicode")
+  return gpua_map
+
+
+def _WriteGooglePUATransformFile(writer):
+  """Writes data for transforming Google PUA to Unicode 6.1 Emoji."""
+  gpua_map = _GetGooglePUAMap()
+  gpua_per16 = [False] * 256  # Boolean per 16 code points <= FEFFF
+  gpua_index = [0xff] * 64  # 0xff = none of 64 gpua's has a mapping
+  for gpua in gpua_map:
+    gpua_per16[(gpua - 0xfe000) >> 4] = True
+    gpua_index[(gpua - 0xfe000) >> 6] = 0
+  max_gpua = max(gpua_map)
+  writer.write(u"""// Mapping from Google PUA to Unicode 6.1 Emoji.
+// Folded array maps code points U+FE000..U+FEFFF to
+// 32-bit values as follows (0 = no mapping):
+// Bits 20.. 0: first code point
+// Bits 28..24: second code point
+//                   0: none
+//                   1: U+20E3 COMBINING ENCLOSING KEYCAP
+//              06..1f: U+1F1E6 REGIONAL INDICATOR SYMBOL LETTER A..
+//                      U+1F1FF REGIONAL INDICATOR SYMBOL LETTER Z
+// Bit      30: set if the symbol has variation selector sequences, see
+//              http://www.unicode.org/Public/UNIDATA/StandardizedVariants.html
+""")
+  writer.write(u"// Google PUA mappings for U+FE000..U+%04X\n" % (max_gpua))
   # Find blocks of Google PUA code points with mappings.
   # Build a dense index.
   # 4 row indexes per block. row = 16 code points, block = 64.
@@ -271,35 +333,43 @@ def _WriteGooglePUATransformFile(writer):
       index += 1
 
 
-def main():
+def Generate(sjis_filename=None):
+  """Writes the conversion files. Loads the data if it is not loaded yet.
+
+  Args:
+    sjis_filename: Path/filename of a custom base Shift-JIS .ucm table,
+      or None for the Windows Shift-JIS table.
+  """
   emoji4unicode.Load()
   here = os.path.dirname(__file__)
   path = os.path.join(here, "..", "generated")
-  _WritePartialMappingFile(path, "docomo", True)
-  _WritePartialMappingFile(path, "docomo", False)
-  _WritePartialMappingFile(path, "kddi", True)
-  _WritePartialMappingFile(path, "kddi", False)
-  _WritePartialMappingFile(path, "softbank", True)
-  # We do not have JIS mapping data for SoftBank.
-
-  if len(sys.argv) >= 2:
-    # Use a custom Shift-JIS table as the base.
-    sjis_filename = sys.argv[1]
-  else:
+  if not sjis_filename:
     # Use the Windows Shift-JIS table as the base.
     sjis_filename = os.path.join(here, "..",
                                  "data", "icu", "windows-932-2000.ucm")
-  with codecs.open(sjis_filename, "r") as sjis_reader:
-    _WriteCompleteMappingFile(sjis_reader, path, "docomo", True)
-    _WriteCompleteMappingFile(sjis_reader, path, "docomo", False)
-    _WriteCompleteMappingFile(sjis_reader, path, "kddi", True)
-    _WriteCompleteMappingFile(sjis_reader, path, "kddi", False)
-    _WriteCompleteMappingFile(sjis_reader, path, "softbank", True)
-    # We do not have JIS mapping data for SoftBank.
+  base_table = _BaseMappingTable(sjis_filename)
+  # We do not have JIS mapping data for SoftBank.
+  for (carrier, for_sjis) in (("docomo", True), ("docomo", False),
+                              ("kddi", True), ("kddi", False),
+                              ("softbank", True)):
+    mappings = _GetMappings(carrier, for_sjis)
+    parsed_mappings = ucm.ParseMappings(mappings)
+    _WritePartialMappingFile(path, carrier, for_sjis, mappings,
+                             parsed_mappings)
+    _WriteCompleteMappingFile(base_table, path, carrier, for_sjis, mappings,
+                              parsed_mappings)
   filename = os.path.join(path, "transform_gpua.txt")
-  with codecs.open(filename, "w", "UTF-8") as writer:
+  with gen_output.Open(filename) as writer:
     _WriteGooglePUATransformFile(writer)
 
 
+def main():
+  if len(sys.argv) >= 2:
+    # Use a custom Shift-JIS table as the base.
+    Generate(sys.argv[1])
+  else:
+    Generate()
+
+
 if __name__ == "__main__":
   main()
@@ -15,7 +15,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Generate an HTML chart with the emoji4unicode.xml and related data."""
+"""Generate an HTML chart with the emoji4unicode.xml and related data.
+
+Usage: gen_html.py [--cache FILE] [flags] [--out FILE [flags] --out FILE ...]
+Writes one chart per "--out FILE", with the flags before it,
+all from one load of the data. Without --out, writes one chart
+to the standard output.
+Rendered table cells are shared among the charts, and with --cache
+they are also kept in the FILE for the next run.
+
+Large charts can be split into pages:
+  --shard_by_category: one page per category.
+  --shard_size=N: pages of about N symbols, split between rows.
+The --out FILE becomes an index page with the page links, counts and the
+legend; links like FILE#e-4B0 redirect to the symbol's page.
+  --lazy_images (implied by sharding): images load only when they are
+      scrolled into view, with fixed dimensions so that the layout is stable.
+
+With --json, the --out FILE is a page that renders the chart in the browser
+from the compact chart_data dataset, written next to it as a .json file.
+The page filters and paginates the chart on the client, in place of
+the separate chart variants.
+"""
 
 __author__ = "Darick Tong"
 __author__ = "Markus Scherer"
@@ -23,24 +44,186 @@ __author__ = "Markus Scherer"
 import cgi
 import codecs
 import datetime
+import hashlib
+import json
+import os.path
+import re
 import sys
+import chart_data
 import emoji4unicode
+import gen_output
 import translit
 import unicode_age
 import utf
 
-# Flags from command-line options.
-_only_in_proposal = False
-_no_unified = False
-_no_temp_notes = False
-_no_fallbacks = False
-_no_codes = False
-_no_symbol_numbers = False
-_show_font_chars = False
-_show_only_font_chars = False
-_show_real_chars = False
+class _Options(object):
+  """Options for rendering one chart, parsed from command-line flags.
+
+  Each chart has its own options, so that several charts with different
+  options can be rendered from one Load().
+  """
+  def __init__(self, args):
+    """Parses the flags.
+
+    Args:
+      args: List of flags, like ["--only_in_proposal", "--no_codes"].
+    """
+    self.only_in_proposal = False
+    self.no_unified = False
+    self.no_temp_notes = False
+    self.no_fallbacks = False
+    self.no_codes = False
+    self.no_symbol_numbers = False
+    self.show_font_chars = False
+    self.show_only_font_chars = False
+    self.show_real_chars = False
+    self.proposed_by_unicode = False
+    self.emoji_data = False
+    self.lazy_images = False
+    self.shard_by_category = False
+    self.shard_size = 0
+    self.json = False
+    for arg in args:
+      if arg == "--only_in_proposal": self.only_in_proposal = True
+      if arg == "--no_codes": self.no_codes = True
+      if arg == "--proposed_by_unicode":
+        self.no_temp_notes = True
+        self.proposed_by_unicode = True
+      if arg == "--emoji_data":
+        self.show_real_chars = True
+        self.no_temp_notes = True
+        self.emoji_data = True
+      if arg == "--show_font_chars":
+        self.show_font_chars = True
+      if arg == "--show_only_font_chars":
+        self.show_font_chars = True
+        self.show_only_font_chars = True
+      if arg == "--design":
+        self.only_in_proposal = True
+        self.no_unified = True
+        self.no_fallbacks = True
+        self.no_codes = True
+        self.no_symbol_numbers = True
+        self.show_font_chars = True
+      if arg == "--lazy_images": self.lazy_images = True
+      if arg == "--shard_by_category":
+        self.shard_by_category = True
+        self.lazy_images = True
+      if arg.startswith("--shard_size="):
+        self.shard_size = int(arg[len("--shard_size="):])
+        self.lazy_images = True
+      if arg == "--json": self.json = True
+    # The options that each kind of cell depends on, for _CellCache keys.
+    self.representation_bits = _Bits(self.show_real_chars,
+                                     self.show_font_chars,
+                                     self.show_only_font_chars,
+                                     self.lazy_images)
+    self.name_bits = _Bits(self.no_temp_notes)
+    self.carrier_bits = _Bits(self.no_fallbacks, self.no_symbol_numbers,
+                              self.no_codes, self.lazy_images)
+
+  def IsSharded(self):
+    """Is the chart split into pages with an index page?"""
+    return self.shard_by_category or self.shard_size > 0
+
+
+def _Bits(*flags):
+  """Turns booleans into a string like "010"."""
+  return "".join([flag and "1" or "0" for flag in flags])
+
+
+class _CellCache(object):
+  """Rendered table cells, shared by all charts in a run.
+
+  Cells are keyed by the kind of cell, the symbol and the option bits that
+  the cell depends on, so that each distinct cell is rendered once per run.
+
+  With Load() and Save(), cells are also kept in a file between runs,
+  keyed by the symbol's content hash instead of its ID, so that only the
+  rows of changed symbols are rendered again. The file is ignored when
+  the code or the carrier and age data changed.
+  """
+  def __init__(self):
+    self.__cells = {}  # (kind, symbol ID, bits) -> HTML
+    self.__stored_cells = None  # From the file: "kind hash bits" -> HTML
+    self.__saved_cells = {}  # To be written to the file.
+    self.__content_hashes = {}  # symbol ID -> GetContentHash()
+
+  def Get(self, kind, symbol, bits, render, *args):
+    """Returns the cell HTML, calling render(*args) if it is not cached."""
+    key = (kind, symbol.id, bits)
+    html = self.__cells.get(key)
+    if html is not None: return html
+    if self.__stored_cells is not None:
+      content_hash = self.__content_hashes.get(symbol.id)
+      if content_hash is None:
+        content_hash = self.__content_hashes[symbol.id] = (
+            symbol.GetContentHash())
+      file_key = "%s %s %s" % (kind, content_hash, bits)
+      html = self.__stored_cells.get(file_key)
+      if html is None: html = render(*args)
+      self.__saved_cells[file_key] = html
+    else:
+      html = render(*args)
+    self.__cells[key] = html
+    return html
+
+  def Load(self, filename):
+    """Reads the cells from an earlier run, and enables Save()."""
+    self.__stored_cells = {}
+    try:
+      with open(filename, "rb") as reader:
+        stored = json.load(reader)
+    except (IOError, ValueError):
+      return  # No usable cache file.
+    if stored.get("version") == _CacheVersion():
+      self.__stored_cells = stored["cells"]
+
+  def Save(self, filename):
+    """Writes the cells used in this run (since Load()) to the file."""
+    if self.__stored_cells is None: return  # Not loaded.
+    gen_output.WriteIfChanged(
+        filename, json.dumps({"version": _CacheVersion(),
+                              "cells": self.__saved_cells},
+                             sort_keys=True))
+
+
+# Files other than emoji4unicode.xml that the cells depend on,
+# relative to this source folder.
+_CACHE_DEPENDENCIES = (
+    "../data/arib/arib.ucm",
+    "../data/docomo/carrier_data.xml",
+    "../data/kddi/carrier_data.xml",
+    "../data/softbank/carrier_data.xml",
+    "../data/unicode/DerivedAge.txt",
+    "../data/unicode/StandardizedVariants.txt",
+    "carrier_data.py",
+    "emoji4unicode.py",
+    "gen_html.py",
+    "row_cell.py",
+    "standardized_variants.py",
+    "translit.py",
+    "ucd.py",
+    "ucm.py",
+    "unicode_age.py",
+    "utf.py")
+
+def _CacheVersion():
+  """Returns a hash of the code and data files that the cells depend on."""
+  here = os.path.dirname(os.path.abspath(__file__))
+  digest = hashlib.sha1()
+  for filename in _CACHE_DEPENDENCIES:
+    with open(os.path.join(here, filename), "rb") as reader:
+      digest.update(reader.read())
+  return digest.hexdigest()
+
+
+_cell_cache = _CellCache()
+
 
 _date = datetime.date.today().strftime("%Y-%b-%d")
+# A new date alone does not make a chart file change.
+_date_re = re.compile(r"Date: [0-9]{4}-[A-Za-z]{3}-[0-9]{2}")
 
 _AUTHORS = u"""Authors:<br>
 Markus Scherer, Mark Davis, Kat Momoi, Darick Tong (Google Inc.)<br>
@@ -244,98 +427,602 @@ set. For example: (&gt;人&lt;) for PERSON WITH FOLDED HANDS ("Sorry" or
 The carrier symbol images point to images on other sites. The images are only for comparison and may change.<br>
 </body></html>"""
 
-def _WriteEmoji4UnicodeHTML(writer):
-  number_symbols_in_chart = 0
-  number_symbols_unified = 0
-  number_symbols_new = 0
-  writer.write(_HEADER)
+class _ChartCounts(object):
+  """Numbers of symbols in a chart, for the report."""
+  def __init__(self):
+    self.in_chart = 0
+    self.unified = 0
+    self.new = 0
+
+
+def _Emoji4UnicodeRows(options):
+  """Selects the rows for the chart in emoji4unicode.xml order.
+
+  Returns:
+    (items, counts) where items is a list of
+    (style, contents, category_name, symbols) tuples:
+    A single-celled row of the style with the contents, followed by the
+    rows for the symbols (if any); and counts is a _ChartCounts object.
+  """
+  items = []
+  counts = _ChartCounts()
   for category in emoji4unicode.GetCategories():
     category_string = category.name
     if not category.in_proposal:
-      if _only_in_proposal: continue  # Skip this category.
+      if options.only_in_proposal: continue  # Skip this category.
       category_string += (" (This section is for comparison only -- "
                           "not part of the Emoji proposal.)")
-    _WriteSingleCelledRow(writer, "category", category_string)
+    items.append(("category", category_string, category.name, []))
     for subcategory in category.GetSubcategories():
       symbols = []
       for symbol in subcategory.GetSymbols():
-        if not symbol.in_proposal and _only_in_proposal:
+        if not symbol.in_proposal and options.only_in_proposal:
           continue  # Skip this symbol.
         if symbol.GetUnicode():
-          if _no_unified: continue  # Skip this symbol.
-          number_symbols_unified += 1
+          if options.no_unified: continue  # Skip this symbol.
+          counts.unified += 1
         elif symbol.in_proposal:
-          number_symbols_new += 1
-        number_symbols_in_chart += 1
+          counts.new += 1
+        counts.in_chart += 1
         symbols.append(symbol)
       if symbols:
-        _WriteSingleCelledRow(writer,
-                              "subcategory",
-                              "%s (%s)" % (subcategory.name, category.name))
-        _WriteFullSymbolRowsHTML(writer, symbols)
-  writer.write("</table>\n")
+        items.append(("subcategory",
+                      "%s (%s)" % (subcategory.name, category.name),
+                      category.name, symbols))
+  return (items, counts)
+
+
+def _WriteEmoji4UnicodeReport(writer, counts, options):
   writer.write("<p class='report'>Number of symbols in this chart: %d</p>\n" %
-               number_symbols_in_chart)
-  if _no_unified:
+               counts.in_chart)
+  if options.no_unified:
     writer.write("<p class='report'>Number of symbols unified with existing "
                  "Unicode characters: None shown in this chart.</p>\n")
   else:
     writer.write("<p class='report'>Number of symbols unified with existing "
                  "Unicode characters: %d</p>\n" %
-                 number_symbols_unified)
+                 counts.unified)
   writer.write("<p class='report'>Number of proposed new symbols: %d</p>\n" %
-               number_symbols_new)
-  writer.write(_FOOTER)
+               counts.new)
 
-def _WriteEmojiDataHTML(writer):
-  number_symbols_in_chart = 0
-  number_symbols_unified = 0
-  number_symbols_new = 0
-  writer.write(_HEADER)
+
+def _EmojiDataRows(options):
+  """Selects the rows for the chart in Unicode order.
+
+  Returns:
+    (items, counts) as from _Emoji4UnicodeRows().
+  """
+  items = []
+  counts = _ChartCounts()
   prev_subcategory_name = ""
   subcategory_symbols = []
   all_symbols = emoji4unicode.GetSymbolsSortedByUnicode()
   for symbol in all_symbols:
     symbol = symbol[1]  # Discard the Unicode code point list.
-    if not symbol.in_proposal and _only_in_proposal:
+    if not symbol.in_proposal and options.only_in_proposal:
       continue  # Skip this symbol.
     if symbol.GetUnicode():
-      if _no_unified: continue  # Skip this symbol.
-      number_symbols_unified += 1
+      if options.no_unified: continue  # Skip this symbol.
+      counts.unified += 1
     elif symbol.in_proposal:
-      number_symbols_new += 1
+      counts.new += 1
     subcategory_name = symbol.subcategory.name
     if prev_subcategory_name != subcategory_name:
       if subcategory_symbols:
-        _WriteSingleCelledRow(writer,
-                              "subcategory",
-                              "%s" % prev_subcategory_name)
-        _WriteFullSymbolRowsHTML(writer, subcategory_symbols)
+        items.append(_EmojiDataItem(prev_subcategory_name, subcategory_symbols))
       prev_subcategory_name = subcategory_name
       subcategory_symbols = []
-    number_symbols_in_chart += 1
+    counts.in_chart += 1
     subcategory_symbols.append(symbol)
   if subcategory_symbols:
-    _WriteSingleCelledRow(writer,
-                          "subcategory",
-                          "%s" % prev_subcategory_name)
-    _WriteFullSymbolRowsHTML(writer, subcategory_symbols)
-  writer.write("</table>\n")
+    items.append(_EmojiDataItem(prev_subcategory_name, subcategory_symbols))
+  return (items, counts)
+
+
+def _EmojiDataItem(subcategory_name, symbols):
+  # Same-named subcategories may be in different categories:
+  # Use the category of the first symbol.
+  return ("subcategory", "%s" % subcategory_name,
+          symbols[0].subcategory.category.name, symbols)
+
+
+def _WriteEmojiDataReport(writer, counts, options):
   writer.write("<p class='report'>Number of symbols in this chart: %d</p>\n" %
-               number_symbols_in_chart)
-  if _no_unified:
+               counts.in_chart)
+  if options.no_unified:
     writer.write("<p class='report'>Number of symbols unified with existing "
                  "Unicode characters: None shown in this chart.</p>\n")
-  elif number_symbols_unified != number_symbols_in_chart:
+  elif counts.unified != counts.in_chart:
     writer.write("<p class='report'>Number of symbols unified with existing "
                  "Unicode characters: %d</p>\n" %
-                 number_symbols_unified)
-  if number_symbols_new:
+                 counts.unified)
+  if counts.new:
     writer.write("<p class='report'>Number of proposed new symbols: %d</p>\n" %
-                number_symbols_new)
+                counts.new)
+
+
+def _WriteTableRowsHTML(writer, items, options):
+  for (style, contents, category_name, symbols) in items:
+    _WriteSingleCelledRow(writer, style, contents)
+    if symbols: _WriteFullSymbolRowsHTML(writer, symbols, options)
+
+
+def _FullChartRows(options):
+  if options.emoji_data: return _EmojiDataRows(options)
+  return _Emoji4UnicodeRows(options)
+
+
+def _WriteFullChartReport(writer, counts, options):
+  if options.emoji_data:
+    _WriteEmojiDataReport(writer, counts, options)
+  else:
+    _WriteEmoji4UnicodeReport(writer, counts, options)
+
+
+def _WriteFullChartHTML(writer, options):
+  """Writes the emoji4unicode.xml-order or the Unicode-order chart."""
+  (items, counts) = _FullChartRows(options)
+  writer.write(_HEADER)
+  _WriteTableRowsHTML(writer, items, options)
+  writer.write("</table>\n")
+  _WriteFullChartReport(writer, counts, options)
   writer.write(_FOOTER)
 
-def _WriteFullSymbolRowsHTML(writer, symbols):
+
+def _ShardItems(items, options):
+  """Splits the chart rows into pages.
+
+  Returns:
+    List of (title, items, number of symbols) per page.
+  """
+  pages = []
+  if options.shard_by_category:
+    category_to_page = {}
+    for item in items:
+      category_name = item[2]
+      page = category_to_page.get(category_name)
+      if page is None:
+        page = category_to_page[category_name] = [category_name, [], 0]
+        pages.append(page)
+      page[1].append(item)
+      page[2] += len(item[3])
+  else:
+    num_symbols = 0
+    for item in items:
+      if not pages or pages[-1][2] >= options.shard_size:
+        pages.append([None, [], 0])
+      pages[-1][1].append(item)
+      pages[-1][2] += len(item[3])
+    for page in pages:
+      page[0] = u"Symbols %d-%d" % (num_symbols + 1, num_symbols + page[2])
+      num_symbols += page[2]
+  return [tuple(page) for page in pages]
+
+
+def _PageHeaderHTML(title):
+  return (u"""<html>
+<title>%s</title>
+<head>
+<meta http-equiv='Content-Type' content='text/html; charset=UTF-8'>
+""" % title +
+  _CSS +
+  u"""
+</head>
+<body>
+<h1>%s</h1>
+""" % title)
+
+
+# Sends #e-XXX links to the index page on to the page with the symbol's row.
+_REDIRECT_SCRIPT = u"""<script>
+var pages = %s;
+var symbolPages = %s;
+var page = symbolPages[location.hash.replace("#e-", "")];
+if (page !== undefined) location.replace(pages[page] + location.hash);
+</script>
+"""
+
+def _WriteShardedHTML(filename, options):
+  """Writes the chart as one page per category or per shard_size symbols,
+  plus an index page with links, counts and the legend.
+
+  Args:
+    filename: The index page. The other pages are written to the same
+        folder, with "-01" etc. appended to the base name.
+    options: _Options with shard_by_category or shard_size.
+
+  Returns:
+    The filenames of the pages, not including the index page.
+  """
+  (items, counts) = _FullChartRows(options)
+  pages = _ShardItems(items, options)
+  (base, extension) = os.path.splitext(filename)
+  page_filenames = ["%s-%02d%s" % (base, i + 1, extension)
+                    for i in xrange(len(pages))]
+  page_links = [os.path.basename(page_filename)
+                for page_filename in page_filenames]
+  index_link = os.path.basename(filename)
+  symbol_pages = {}
+  for (i, (title, page_items, num_symbols)) in enumerate(pages):
+    nav = [u"<a href='%s'>Index and legend</a>" % index_link]
+    if i > 0: nav.append(u"<a href='%s'>Previous</a>" % page_links[i - 1])
+    if i + 1 < len(pages):
+      nav.append(u"<a href='%s'>Next</a>" % page_links[i + 1])
+    nav = u"<p>%s</p>\n" % u" | ".join(nav)
+    with gen_output.Open(page_filenames[i]) as writer:
+      writer.write(_PageHeaderHTML(u"Emoji Symbols: " + cgi.escape(title)))
+      writer.write(nav)
+      writer.write(_FULL_TABLE_HEADER)
+      _WriteTableRowsHTML(writer, page_items, options)
+      writer.write("</table>\n")
+      writer.write(nav)
+      writer.write(u"</body></html>")
+    for item in page_items:
+      for symbol in item[3]: symbol_pages[symbol.id] = i
+  with gen_output.Open(filename, _date_re) as writer:
+    writer.write(_PageHeaderHTML(u"Emoji Symbols: Background Data"))
+    writer.write(u"<p align='right'>Date: %s</p>\n" % _date)
+    writer.write(u"""<p>The carrier symbol images in this chart point to images on other sites.
+  The images are only for comparison and may change.</p>
+<p>The chart is split into the following pages.
+  A link to this index page with a symbol anchor like
+  <a href="#e-4B0">#e-4B0</a> goes to the page with that symbol's row.</p>
+<table border='1' cellspacing='0'>
+<tr><th>Page</th><th>Symbols</th></tr>
+""")
+    for (i, (title, page_items, num_symbols)) in enumerate(pages):
+      writer.write(u"<tr><td><a href='%s'>%s</a></td>"
+                   u"<td class='num'>%d</td></tr>\n" %
+                   (page_links[i], cgi.escape(title), num_symbols))
+    writer.write("</table>\n")
+    _WriteFullChartReport(writer, counts, options)
+    writer.write(_REDIRECT_SCRIPT %
+                 (json.dumps(page_links),
+                  json.dumps(symbol_pages, sort_keys=True,
+                             separators=(",", ":"))))
+    writer.write(_FOOTER)
+  return page_filenames
+
+
+_VIEWER_HEADER = (u"""<html>
+<title>Emoji Symbols: Background Data</title>
+<head>
+<meta http-equiv='Content-Type' content='text/html; charset=UTF-8'>
+""" +
+_CSS +
+u"""
+</head>
+<body>
+<h1>Emoji Symbols: Background Data</h1>
+<p align='right'>
+  Date: """ + _date +
+u"""</p>
+<p>The carrier symbol images in this file point to images on other sites.
+  The images are only for comparison and may change.</p>
+<p>See the <a href="#legend">chart legend</a>
+  for an explanation of the data presentation in this chart.
+  Links like <a href="#e-4B0">#e-4B0</a> go to the symbol's row.</p>
+<p>
+  <label><input type='checkbox' id='only_in_proposal'>
+    Only symbols in the proposal</label>
+  <label><input type='checkbox' id='no_codes'> No carrier codes</label>
+  <label><input type='checkbox' id='by_unicode'> Sorted by Unicode</label>
+  <label>Name or ID: <input type='search' id='search' size='20'></label>
+  <label>Page size: <select id='page_size'>
+    <option value='100'>100</option>
+    <option value='250' selected>250</option>
+    <option value='500'>500</option>
+    <option value='0'>all</option>
+  </select></label>
+</p>
+<p><button id='prev'>Previous</button> <button id='next'>Next</button>
+  <span id='status'>Loading...</span></p>
+""" +
+_FULL_TABLE_HEADER +
+u"""<tbody id='rows'></tbody>
+</table>
+""")
+
+_VIEWER_SCRIPT = u"""<script>
+var dataUrl = DATA_URL;
+var imageSizes = IMAGE_SIZES;  // [URL prefix, width, height] records.
+var data = null;
+var carrierSymbols = [];  // For each carrier, a map from PUA code to record.
+var page = 0;
+
+function field(record, i) { return i < record.length ? record[i] : 0; }
+function str(i) { return i ? data.strings[i] : ""; }
+function esc(s) {
+  return s.replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;");
+}
+function image(ref, cls) {
+  if (!ref) return "";
+  var url = data.urlPrefixes[ref[0]] + ref[1];
+  var html = "<img loading=lazy src='" + url + "'" +
+      (cls ? " class='" + cls + "'" : "");
+  for (var i = 0; i < imageSizes.length; ++i) {
+    var size = imageSizes[i];
+    if (url.indexOf(size[0]) == 0) {
+      html += " width=" + size[1] + " height=" + size[2];
+      break;
+    }
+  }
+  return html + ">";
+}
+function chars(uni) {
+  return uni.split("+").map(function(code) {
+    return String.fromCodePoint(parseInt(code, 16));
+  }).join("");
+}
+function codePoints(uni) { return "U+" + uni.split("+").join(" U+"); }
+function checked(id) { return document.getElementById(id).checked; }
+
+function representation(r) {
+  var flags = field(r, 1);
+  // Symbols in the proposal were accepted into Unicode 6.0.
+  var uni = field(r, 5) || ((flags & 1) ? field(r, 6) : "");
+  if (uni) {
+    var html;
+    if (flags & 2) {
+      html = image([-1, "U+" + uni + ".jpg"], "fontimg") + "<br>" +
+          codePoints(uni);
+    } else {
+      html = "<span class='unified'>" + chars(uni) + "</span><br>" +
+          codePoints(uni);
+    }
+    var age = field(r, 8);
+    var status = age ?
+        (age >= "6.0" ? "encoded" : "unified") + " (Unicode&nbsp;" + age + ")" :
+        "unified";
+    return html + "<br><span class='status'>" + status + "</span>";
+  }
+  if (flags & 1) {
+    return image([-2, "AEmoji_" + field(r, 7) + ".png"], "fontimg") +
+        "<br><span class='proposed_uni'>U+xxxxx</span>" +
+        "<br><span class='status'>proposed</span>";
+  }
+  return image(field(r, 10), "") || esc(str(field(r, 11))) || "?repr?";
+}
+
+function nameAnnotations(r) {
+  var lines = [esc(str(field(r, 3)))];
+  if (field(r, 15)) {
+    lines.push("<span class='old_name'>Old name: " + esc(str(r[15])) +
+               "</span>");
+  }
+  if (field(r, 13)) lines.push("<span class='arib'>= ARIB-" + r[13] + "</span>");
+  if (field(r, 1) & 2) {
+    lines.push("<span class='desc'>Temporary Note: " +
+               "Unified with an upcoming Unicode 5.2/AMD6 character; " +
+               "code point and name are preliminary.</span>");
+  }
+  if (field(r, 14)) lines.push("Proposed Properties: " + esc(str(r[14])));
+  (field(r, 12) || []).forEach(function(i) { lines.push(esc(str(i))); });
+  if (field(r, 16)) {
+    lines.push("<span class='desc'>Temporary Notes: " + esc(str(r[16])) +
+               "</span>");
+  }
+  if (field(r, 17)) {
+    lines.push("<span class='desc'>Design Note: " + esc(str(r[17])) +
+               "</span>");
+  }
+  return lines.join("<br>");
+}
+
+function carrierCell(c, r, noCodes) {
+  var mapping = field(r, 4)[c];
+  if (!mapping) {
+    return "<td class='text_fallback'>" +
+        (esc(str(field(r, 9))) || String.fromCharCode(0x3013)) + "</td>";
+  }
+  var style = "round_trip";
+  if (mapping.charAt(0) == ">") {
+    style = "fallback";
+    mapping = mapping.substring(1);
+  }
+  var codes = mapping.split("+");
+  // One list of pieces per type of data, as in the HTML charts.
+  var lines = [[], [], [], [], [], [], [], [], [], []];
+  codes.forEach(function(code) {
+    var s = carrierSymbols[c][code] || [code];
+    var img = image(field(s, 9), "");
+    if (img) lines[0].push(img);
+    var number = field(s, 1);
+    if (number) {
+      lines[1].push(data.carriers[c] == "docomo" && number >= 300 ?
+                    "#Exp." + (number - 300) : "#" + number);
+    }
+    if (field(s, 2)) lines[2].push("#old" + s[2]);
+    if (field(s, 3)) lines[3].push("#new" + s[3]);
+    if (field(s, 4)) lines[4].push("'" + esc(str(s[4])) + "'");
+    if (field(s, 5)) lines[5].push(esc(str(s[5])));
+    if (field(s, 6)) {
+      lines[6].push(String.fromCharCode(0x300C) + esc(str(s[6])) +
+                    String.fromCharCode(0x300D));
+    }
+    if (!noCodes) {
+      lines[7].push("U+" + code);
+      if (field(s, 7)) lines[8].push("SJIS-" + s[7]);
+      if (field(s, 8)) lines[9].push("JIS-" + s[8]);
+    }
+  });
+  var groups = codes.length == 1 ?
+      // Reduce the cell height by putting several pieces on each line.
+      [[0, 1, 2, 3], [4, 5, 6], [7], [8, 9]] :
+      [[0], [1], [2], [3], [4], [5], [6], [7], [8], [9]];
+  var result = [];
+  groups.forEach(function(group) {
+    var pieces = [];
+    group.forEach(function(i) {
+      if (lines[i].length) pieces.push(lines[i].join("+"));
+    });
+    if (pieces.length) result.push(pieces.join(" "));
+  });
+  return "<td class='" + style + "'>" + (result.join("<br>") || "-") + "</td>";
+}
+
+function symbolRow(r, noCodes) {
+  var id = "e-" + r[0];
+  var html = "<tr id=" + id + ((field(r, 1) & 1) ? "" :
+                               " class=not_in_proposal") +
+      "><td class='id'><a href=#" + id + ">" + id + "</a></td>" +
+      "<td class='rep'>" + representation(r) + "</td>" +
+      "<td class='name_anno'>" + nameAnnotations(r) + "</td>";
+  for (var c = 0; c < data.carriers.length; ++c) {
+    html += carrierCell(c, r, noCodes);
+  }
+  return html + "</tr>";
+}
+
+function headerRow(style, text) {
+  return "<tr><td class='" + style + "' colspan=7>" + esc(text) +
+      "</td></tr>";
+}
+
+// Returns the indexes of the symbols that pass the filters, in chart order.
+function selectSymbols() {
+  var order = data.unicodeOrder;
+  if (!checked("by_unicode")) {
+    order = data.symbols.map(function(r, i) { return i; });
+  }
+  var onlyInProposal = checked("only_in_proposal");
+  var search = document.getElementById("search").value.toUpperCase();
+  return order.filter(function(i) {
+    var r = data.symbols[i];
+    if (onlyInProposal && !(field(r, 1) & 1)) return false;
+    return !search || r[0] == search.replace(/^E-/, "") ||
+        str(field(r, 3)).indexOf(search) >= 0;
+  });
+}
+
+function render() {
+  var selected = selectSymbols();
+  var pageSize = parseInt(document.getElementById("page_size").value, 10) ||
+      selected.length || 1;
+  var numPages = Math.max(1, Math.ceil(selected.length / pageSize));
+  page = Math.min(Math.max(page, 0), numPages - 1);
+  var start = page * pageSize;
+  var limit = Math.min(start + pageSize, selected.length);
+  var byUnicode = checked("by_unicode");
+  var noCodes = checked("no_codes");
+  var html = [];
+  var prevCategory = -1, prevSubcategory = -1, prevSubcategoryName = null;
+  for (var j = start; j < limit; ++j) {
+    var r = data.symbols[selected[j]];
+    var subcategory = data.subcategories[r[2]];
+    var categoryName = str(data.categories[subcategory[1]][0]);
+    var subcategoryName = str(subcategory[0]);
+    if (byUnicode) {
+      if (subcategoryName != prevSubcategoryName) {
+        html.push(headerRow("subcategory", subcategoryName));
+      }
+    } else {
+      if (subcategory[1] != prevCategory) {
+        var category = data.categories[subcategory[1]];
+        html.push(headerRow("category", categoryName + (category[1] ? "" :
+            " (This section is for comparison only -- " +
+            "not part of the Emoji proposal.)")));
+      }
+      if (r[2] != prevSubcategory) {
+        html.push(headerRow("subcategory",
+                            subcategoryName + " (" + categoryName + ")"));
+      }
+    }
+    prevCategory = subcategory[1];
+    prevSubcategory = r[2];
+    prevSubcategoryName = subcategoryName;
+    html.push(symbolRow(r, noCodes));
+  }
+  document.getElementById("rows").innerHTML = html.join("");
+  document.getElementById("status").textContent = selected.length ?
+      "Symbols " + (start + 1) + "-" + limit + " of " + selected.length +
+      " (page " + (page + 1) + " of " + numPages + ")" :
+      "No symbols";
+  document.getElementById("prev").disabled = page == 0;
+  document.getElementById("next").disabled = page + 1 >= numPages;
+  return {selected: selected, pageSize: pageSize};
+}
+
+// Shows the page with the symbol of a link like #e-4B0.
+function showHash() {
+  var id = location.hash.replace(/^#e-/, "");
+  var selected = render().selected;
+  for (var j = 0; j < selected.length; ++j) {
+    if (data.symbols[selected[j]][0] == id) {
+      var pageSize = parseInt(document.getElementById("page_size").value, 10);
+      page = pageSize ? Math.floor(j / pageSize) : 0;
+      render();
+      document.getElementById("e-" + id).scrollIntoView();
+      return;
+    }
+  }
+}
+
+function init() {
+  data.carriers.forEach(function(carrier, c) {
+    carrierSymbols[c] = {};
+    data.carrierSymbols[c].forEach(function(s) {
+      carrierSymbols[c][s[0]] = s;
+    });
+  });
+  // Special images for the representations; see image().
+  data.urlPrefixes[-1] = "../uni52img/";
+  data.urlPrefixes[-2] = "../fontimg/";
+  ["only_in_proposal", "no_codes", "by_unicode", "page_size"].forEach(
+      function(id) {
+        document.getElementById(id).onchange = function() {
+          page = 0;
+          render();
+        };
+      });
+  document.getElementById("search").oninput = function() {
+    page = 0;
+    render();
+  };
+  document.getElementById("prev").onclick = function() { --page; render(); };
+  document.getElementById("next").onclick = function() { ++page; render(); };
+  window.onhashchange = showHash;
+  if (location.hash) showHash(); else render();
+}
+
+var request = new XMLHttpRequest();
+request.open("GET", dataUrl);
+request.onload = function() {
+  data = JSON.parse(request.responseText);
+  init();
+};
+request.onerror = function() {
+  document.getElementById("status").textContent =
+      "Unable to load " + dataUrl;
+};
+request.send();
+</script>
+"""
+
+def _WriteChartViewer(filename):
+  """Writes the chart dataset as JSON and a page that renders it.
+
+  The page renders, filters and paginates the chart in the browser,
+  which replaces the several large HTML chart variants with one download.
+  It loads the data with an XMLHttpRequest, so browsers may require it
+  to be served via HTTP rather than opened as a local file.
+
+  Args:
+    filename: The viewer page. The data is written to the same
+        folder and base name, with the extension ".json".
+  """
+  json_filename = os.path.splitext(filename)[0] + ".json"
+  with gen_output.Open(json_filename) as writer:
+    writer.write(chart_data.ToJSON(chart_data.Build()))
+  with gen_output.Open(filename, _date_re) as writer:
+    writer.write(_VIEWER_HEADER)
+    writer.write(_VIEWER_SCRIPT.replace(
+        u"DATA_URL", json.dumps(os.path.basename(json_filename))).replace(
+        u"IMAGE_SIZES", json.dumps(_IMAGE_SIZES)))
+    writer.write(_FOOTER)
+
+
+def _WriteFullSymbolRowsHTML(writer, symbols, options):
   for symbol in symbols:
     if symbol.in_proposal:
       row_style = ""
@@ -344,33 +1031,78 @@ def _WriteFullSymbolRowsHTML(writer, symbols):
     e_id = "e-" + symbol.id
     writer.write("<tr id=%s%s><td class='id'><a href=#%s>%s</a></td>" %
                   (e_id, row_style, e_id, e_id))
-    writer.write("<td class='rep'>%s</td>" % _RepresentationHTML(symbol))
-    writer.write("<td class='name_anno'>%s</td>" % _NameAnnotationHTML(symbol))
+    writer.write("<td class='rep'>%s</td>" %
+                 _cell_cache.Get("rep", symbol, options.representation_bits,
+                                 _RenderWithImageOptions, options,
+                                 _RepresentationHTML, symbol, options))
+    writer.write("<td class='name_anno'>%s</td>" %
+                 _cell_cache.Get("name_anno", symbol, options.name_bits,
+                                 _NameAnnotationHTML, symbol, options))
     for carrier in emoji4unicode.carriers:
-      code = symbol.GetCarrierUnicode(carrier)
-      if code:
-        if code.startswith(">"):
-          if _no_fallbacks:
-            writer.write("<td class='no_mapping'>-</td>")
-            continue
-          template = "<td class='fallback'>%s</td>"
-          code = code[1:]
-        else:
-          template = "<td class='round_trip'>%s</td>"
-        cell = template % _CarrierSymbolHTML(
-            carrier,
-            emoji4unicode.all_carrier_data[carrier],
-            code)
-      elif _no_fallbacks:
-        cell = "<td class='no_mapping'>-</td>"
-      else:
-        text_fallback = symbol.GetTextFallback()
-        if not text_fallback: text_fallback = u"\u3013"  # geta mark
-        cell = "<td class='text_fallback'>%s</td>" % text_fallback
-      writer.write(cell)
+      writer.write(_cell_cache.Get(carrier, symbol, options.carrier_bits,
+                                   _RenderWithImageOptions, options,
+                                   _CarrierCellHTML, symbol, carrier, options))
     writer.write("</tr>\n")
 
 
+_img_re = re.compile(u"<img ([^>]*)>")
+_img_src_re = re.compile(u"""src=['"]?([^'" >]+)""")
+
+# The sizes of the image files on the sites that the charts link to,
+# as (URL prefix, width, height). The font images match the fontimg class.
+_IMAGE_SIZES = (
+    ("http://www.nttdocomo.co.jp/", 16, 16),
+    ("http://www001.upp.so-net.ne.jp/hdml/emoji/", 14, 15),
+    ("http://mail.google.com/mail/e/", 15, 15),
+    ("http://creation.mb.softbank.jp/web/img/", 20, 20),
+    ("../uni52img/", 40, 40),
+    ("../fontimg/", 40, 40))
+
+def _LazyImage(match):
+  attributes = match.group(1)
+  src = _img_src_re.search(attributes)
+  if src and "width=" not in attributes:
+    for (prefix, width, height) in _IMAGE_SIZES:
+      if src.group(1).startswith(prefix):
+        attributes += u" width=%d height=%d" % (width, height)
+        break
+  return u"<img loading=lazy %s>" % attributes
+
+
+def _RenderWithImageOptions(options, render, *args):
+  """Returns render(*args), with lazy-loaded images if requested.
+
+  With options.lazy_images, the browser loads images only when they are
+  scrolled into view, and explicit dimensions keep the layout stable.
+  """
+  html = render(*args)
+  if options.lazy_images: html = _img_re.sub(_LazyImage, html)
+  return html
+
+
+def _CarrierCellHTML(symbol, carrier, options):
+  """Return the table cell HTML for the symbol's carrier mapping."""
+  code = symbol.GetCarrierUnicode(carrier)
+  if code:
+    if code.startswith(">"):
+      if options.no_fallbacks:
+        return "<td class='no_mapping'>-</td>"
+      template = "<td class='fallback'>%s</td>"
+      code = code[1:]
+    else:
+      template = "<td class='round_trip'>%s</td>"
+    return template % _CarrierSymbolHTML(
+        carrier,
+        emoji4unicode.all_carrier_data[carrier],
+        code, options)
+  elif options.no_fallbacks:
+    return "<td class='no_mapping'>-</td>"
+  else:
+    text_fallback = symbol.GetTextFallback()
+    if not text_fallback: text_fallback = u"\u3013"  # geta mark
+    return "<td class='text_fallback'>%s</td>" % text_fallback
+
+
 _PROPOSED_EMOJI_HEADER = (u"""<html>
 <title>Emoji Symbols Proposed for New Encoding</title>
 <head>
@@ -405,7 +1137,7 @@ _PROPOSED_EMOJI_TABLE_HEADER = u"""
 
 _PROPOSED_EMOJI_FOOTER = u"""</body></html>"""
 
-def _WriteProposedEmojiHTML(writer):
+def _WriteProposedEmojiHTML(writer, options):
   proposed_symbols = emoji4unicode.GetSymbolsInProposalSortedByUnicode()
   number_symbols_new = 0
   writer.write(_PROPOSED_EMOJI_HEADER)
@@ -430,7 +1162,9 @@ def _WriteProposedEmojiHTML(writer):
     font_str = utf.UTF.CodePointString(int(font_uni, 16))
     writer.write("<td class='rep'><span class='efont'>%s</span></td>" %
                  font_str)
-    writer.write("<td class='name_anno'>%s</td>" % _NameAnnotationHTML(symbol))
+    writer.write("<td class='name_anno'>%s</td>" %
+                 _cell_cache.Get("name_anno", symbol, options.name_bits,
+                                 _NameAnnotationHTML, symbol, options))
     writer.write("<td class='id'><a href=#%s>%s</a></td>" %
                   (e_id, e_id))
     writer.write("</tr>\n")
@@ -440,14 +1174,14 @@ def _WriteProposedEmojiHTML(writer):
   writer.write(_PROPOSED_EMOJI_FOOTER)
 
 
-def _WriteFullSymbolTableHTML(writer, symbols):
+def _WriteFullSymbolTableHTML(writer, symbols, options):
   writer.write(u"<p>Number of changes: %d</p>\n" % len(symbols))
   writer.write(_FULL_TABLE_HEADER)
-  _WriteFullSymbolRowsHTML(writer, symbols)
+  _WriteFullSymbolRowsHTML(writer, symbols, options)
   writer.write("</table>\n")
 
 
-def _RepresentationHTML(e4u_symbol):
+def _RepresentationHTML(e4u_symbol, options):
   """Return HTML with the symbol representation."""
   uni = e4u_symbol.GetUnicode()
   # Begin "proposal was accepted into Unicode 6.0"
@@ -458,9 +1192,10 @@ def _RepresentationHTML(e4u_symbol):
   if not uni and e4u_symbol.in_proposal: uni = e4u_symbol.GetProposedUnicode()
   # End "proposal was accepted into Unicode 6.0"
   if uni:
-    if _show_real_chars:
+    if options.show_real_chars:
       repr = _UnicodeHTML(uni, u"chartfonts")
-    elif e4u_symbol.IsUnifiedWithUpcomingCharacter() and not _show_font_chars:
+    elif (e4u_symbol.IsUnifiedWithUpcomingCharacter() and
+          not options.show_font_chars):
       # Print only code points, not also characters,
       # because no one will have a font for these.
       # return (u"<span class='upcoming'>U5.2</span><br>"
@@ -481,12 +1216,12 @@ def _RepresentationHTML(e4u_symbol):
   font_img = u"<img src='../fontimg/AEmoji_%s.png' class='fontimg'>" % font_uni
   if e4u_symbol.in_proposal:
     proposed_uni = e4u_symbol.GetProposedUnicode()
-    if _show_real_chars and proposed_uni:
+    if options.show_real_chars and proposed_uni:
       font_str = utf.UTF.CodePointString(int(proposed_uni, 16))
       repr = u"<span class='chartfonts'>%s</span>" % font_str
-    elif _show_font_chars:
+    elif options.show_font_chars:
       font_str = utf.UTF.CodePointString(int(font_uni, 16))
-      if _show_only_font_chars:
+      if options.show_only_font_chars:
         repr = u"<span class='efont'>%s</span>" % font_str
       else:
         repr = u"<span class='efont'>%s</span>=%s" % (font_str, font_img)
@@ -524,16 +1259,16 @@ def _UnicodeHTML(uni, style):
           u"</span><br>" + code_points[1:])
 
 
-def _NameAnnotationHTML(e4u_symbol):
+def _NameAnnotationHTML(e4u_symbol, options):
   """Return HTML with the symbol name, annotations, etc."""
   name = e4u_symbol.GetName()
   lines = [name]
   old_name = e4u_symbol.GetOldName()
-  if old_name and not _no_temp_notes:
+  if old_name and not options.no_temp_notes:
     lines.append(u"<span class='old_name'>Old name: " + old_name + u"</span>")
   arib = e4u_symbol.GetARIB()
   if arib: lines.append(u"<span class='arib'>= ARIB-%s</span>" % arib)
-  if e4u_symbol.IsUnifiedWithUpcomingCharacter() and not _no_temp_notes:
+  if e4u_symbol.IsUnifiedWithUpcomingCharacter() and not options.no_temp_notes:
     lines.append(u"<span class='desc'>Temporary Note: "
                   "Unified with an upcoming Unicode 5.2/AMD6 character; "
                   "code point and name are preliminary.</span>")
@@ -541,7 +1276,7 @@ def _NameAnnotationHTML(e4u_symbol):
   if prop: lines.append(u"Proposed Properties: " + prop)
   anno = e4u_symbol.GetAnnotations()
   for line in anno: lines.append(cgi.escape(line))
-  if not _no_temp_notes:
+  if not options.no_temp_notes:
     desc = e4u_symbol.GetDescription()
     if desc: lines.append(u"<span class='desc'>Temporary Notes: " +
                           cgi.escape(desc) + u"</span>")
@@ -551,7 +1286,7 @@ def _NameAnnotationHTML(e4u_symbol):
   return "<br>".join(lines)
 
 
-def _CarrierSymbolHTML(carrier, one_carrier_data, code_string):
+def _CarrierSymbolHTML(carrier, one_carrier_data, code_string, options):
   codes = code_string.split("+")
   img_string = ""
   number_string = ""
@@ -567,7 +1302,7 @@ def _CarrierSymbolHTML(carrier, one_carrier_data, code_string):
     symbol = one_carrier_data.SymbolFromUnicode(code)
     img_html = emoji4unicode.CarrierImageHTML(carrier, symbol)
     if img_html: img_string += "+%s" % img_html
-    if not _no_symbol_numbers:
+    if not options.no_symbol_numbers:
       if symbol.number:
         if carrier == "docomo" and symbol.number >= 300:
           # DoCoMo shows symbol numbers 1..176 for "Basic Pictograms" and
@@ -590,7 +1325,7 @@ def _CarrierSymbolHTML(carrier, one_carrier_data, code_string):
       japanese_string += "+" + name_ja
       xlit = translit.Transliterate(name_ja)
       xlit_string += u"+" + xlit
-    if not _no_codes:
+    if not options.no_codes:
       uni_string += "+U+" + code
       if symbol.shift_jis: shift_jis_string += "+SJIS-" + symbol.shift_jis
       if symbol.jis: jis_string += "+JIS-" + symbol.jis
@@ -620,7 +1355,7 @@ def _CarrierSymbolHTML(carrier, one_carrier_data, code_string):
                  uni_string, shift_jis_string, jis_string):
       if line: result_pieces.append(line[1:])  # Remove leading separator.
   if not result_pieces:
-    # Show *something* despite _no_codes.
+    # Show *something* despite options.no_codes.
     return u"-"
   return "<br>".join(result_pieces)
 
@@ -630,43 +1365,103 @@ def _WriteSingleCelledRow(writer, style, contents):
   writer.write("<tr><td class='%s' colspan=7>%s</td></tr>\n" % (style, contents))
 
 
-def main():
-  global _only_in_proposal, _no_unified, _no_temp_notes, _no_fallbacks
-  global _no_codes, _no_symbol_numbers, _show_font_chars, _show_only_font_chars
-  global _show_real_chars
-  _proposed_by_unicode = False
-  _emoji_data = False
-  for i in range(1, len(sys.argv)):
-    if sys.argv[i] == "--only_in_proposal": _only_in_proposal = True
-    if sys.argv[i] == "--no_codes": _no_codes = True
-    if sys.argv[i] == "--proposed_by_unicode":
-      _no_temp_notes = True
-      _proposed_by_unicode = True
-    if sys.argv[i] == "--emoji_data":
-      _show_real_chars = True
-      _no_temp_notes = True
-      _emoji_data = True
-    if sys.argv[i] == "--show_font_chars":
-      _show_font_chars = True
-    if sys.argv[i] == "--show_only_font_chars":
-      _show_font_chars = True
-      _show_only_font_chars = True
-    if sys.argv[i] == "--design":
-      _only_in_proposal = True
-      _no_unified = True
-      _no_fallbacks = True
-      _no_codes = True
-      _no_symbol_numbers = True
-      _show_font_chars = True
+def Generate(args, writer):
+  """Writes one HTML chart.
+
+  May be called several times in one process, for example from gen_all.py;
+  the data is loaded only once.
+
+  Args:
+    args: List of command-line options, like ["--only_in_proposal"].
+    writer: File-like object to which the unicode HTML is written.
+  """
+  _GenerateChart(_Options(args), writer)
+
+
+def _GenerateChart(options, writer):
+  """Writes one HTML chart with already-parsed options; see Generate()."""
+  if options.IsSharded():
+    raise ValueError("a sharded chart needs an --out filename")
+  if options.json:
+    raise ValueError("the --json chart viewer needs an --out filename")
   emoji4unicode.Load()
   unicode_age.Load()
-  writer = codecs.getwriter("UTF-8")(sys.stdout)
-  if _emoji_data:
-    _WriteEmojiDataHTML(writer)
-  elif _proposed_by_unicode:
-    _WriteProposedEmojiHTML(writer)
+  if options.proposed_by_unicode:
+    _WriteProposedEmojiHTML(writer, options)
   else:
-    _WriteEmoji4UnicodeHTML(writer)
+    _WriteFullChartHTML(writer, options)
+
+
+def _SplitOutputSpecs(args):
+  """Splits the command line into output specs.
+
+  Each "--out FILE" ends the spec with the flags before it.
+  Flags after the last "--out FILE" are for a chart on the standard output;
+  without any "--out" that is the only chart.
+
+  Returns:
+    List of (flags, filename) pairs, with filename=None for the standard output.
+  """
+  specs = []
+  flags = []
+  i = 0
+  while i < len(args):
+    if args[i] == "--out":
+      if i + 1 >= len(args): raise ValueError("--out without a filename")
+      specs.append((flags, args[i + 1]))
+      flags = []
+      i += 2
+    else:
+      flags.append(args[i])
+      i += 1
+  if flags or not specs: specs.append((flags, None))
+  return specs
+
+
+def GenerateFiles(specs, cache_filename=None):
+  """Writes HTML chart files, sharing the rendered cells among them.
+
+  Args:
+    specs: List of (flags, filename) pairs,
+        with filename=None for the standard output.
+    cache_filename: If not None, the file with the rendered cells
+        from the previous run, updated for the next one.
+
+  Returns:
+    The filenames of the files written, including the ones which are
+    derived from the spec filenames, like the pages of a sharded chart.
+  """
+  if cache_filename: _cell_cache.Load(cache_filename)
+  filenames = []
+  for (flags, filename) in specs:
+    options = _Options(flags)
+    if filename and options.json:
+      emoji4unicode.Load()
+      unicode_age.Load()
+      _WriteChartViewer(filename)
+      filenames.append(os.path.splitext(filename)[0] + ".json")
+    elif filename and options.IsSharded():
+      emoji4unicode.Load()
+      unicode_age.Load()
+      filenames.extend(_WriteShardedHTML(filename, options))
+    elif filename:
+      with gen_output.Open(filename, _date_re) as writer:
+        _GenerateChart(options, writer)
+    else:
+      _GenerateChart(options, codecs.getwriter("UTF-8")(sys.stdout))
+    if filename: filenames.append(filename)
+  if cache_filename: _cell_cache.Save(cache_filename)
+  return filenames
+
+
+def main():
+  args = sys.argv[1:]
+  cache_filename = None
+  if "--cache" in args:
+    i = args.index("--cache")
+    cache_filename = args[i + 1]
+    del args[i:i + 2]
+  GenerateFiles(_SplitOutputSpecs(args), cache_filename)
 
 if __name__ == "__main__":
   main()
@@ -16,20 +16,31 @@
 # Author: Markus Scherer
 
 mkdir -p ../generated
-# The full chart with all information.
-./gen_html.py > ../generated/full.html
-# All information, but only with the symbols that are in the proposal.
-./gen_html.py --only_in_proposal > ../generated/utc.html
-# All symbols, but shorter format. Omits carrier character codes.
-./gen_html.py --no_codes > ../generated/short.html
-# Special chart for the font and glyph design.
-# ./gen_html.py --design > ../generated/design.html
-# Special chart with only the symbols proposed for new encoding,
-# sorted by Unicode code points.
-./gen_html.py --proposed_by_unicode --show_only_font_chars > ../generated/proposed.html
-# All information, but only with the symbols that are in the proposal.
-# Same as utc.html but uses the fonts rather than the images.
-./gen_html.py --only_in_proposal --show_only_font_chars > ../generated/utc_pdf.html
-# All information, except category names, temporary and design notes;
-# sorted by Unicode code points.
-./gen_html.py --emoji_data > ../generated/emojidata.html
+# Renders all charts from one load of the data.
+# Each chart's flags go before its --out filename.
+# The cache file keeps rendered table cells for the next run.
+# full.html: The full chart with all information.
+# utc.html: All information, but only with the symbols that are in the proposal.
+# short.html: All symbols, but shorter format. Omits carrier character codes.
+# proposed.html: Special chart with only the symbols proposed for new encoding,
+#   sorted by Unicode code points.
+# utc_pdf.html: All information, but only with the symbols that are in the
+#   proposal. Same as utc.html but uses the fonts rather than the images.
+# emojidata.html: All information, except category names, temporary and
+#   design notes; sorted by Unicode code points.
+# full_by_category.html: Index page for the full chart split into one page
+#   per category (full_by_category-01.html etc.).
+# chart.html: Renders, filters and paginates the chart in the browser,
+#   from the compact dataset in chart.json.
+# (Special chart for the font and glyph design:
+#   --design --out ../generated/design.html)
+./gen_html.py --cache ../generated/.gen_html_cache \
+  --out ../generated/full.html \
+  --only_in_proposal --out ../generated/utc.html \
+  --no_codes --out ../generated/short.html \
+  --proposed_by_unicode --show_only_font_chars \
+      --out ../generated/proposed.html \
+  --only_in_proposal --show_only_font_chars --out ../generated/utc_pdf.html \
+  --emoji_data --out ../generated/emojidata.html \
+  --shard_by_category --out ../generated/full_by_category.html \
+  --json --out ../generated/chart.html
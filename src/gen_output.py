@@ -0,0 +1,93 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write generated files only when their contents change.
+
+A generated file that would be rewritten with the same bytes is left alone,
+so that its modification time stays stable for downstream builds.
+Parts like the generation date can be ignored in the comparison, so that
+a rerun on a later day does not rewrite otherwise unchanged files.
+"""
+
+__author__ = "Markus Scherer"
+
+def WriteIfChanged(filename, contents, ignore=None):
+  """Writes the contents to the file unless it already has exactly these bytes.
+
+  Args:
+    filename: Path/filename of the output file.
+    contents: The complete file contents, as a byte str.
+    ignore: Optional compiled regular expression for parts of the file,
+        like a date line, which alone do not make the file change.
+
+  Returns:
+    True if the file was written.
+  """
+  try:
+    with open(filename, "rb") as reader:
+      old_contents = reader.read()
+    if old_contents == contents: return False
+    if ignore and ignore.sub("", old_contents) == ignore.sub("", contents):
+      return False
+  except IOError:
+    pass  # No such file yet.
+  with open(filename, "wb") as writer:
+    writer.write(contents)
+  return True
+
+
+class Writer(object):
+  """File-like object for a generated file.
+
+  Collects the output, encoding unicode strings as UTF-8,
+  and writes the file with WriteIfChanged() when it is closed.
+  Can be used in a with statement.
+  """
+  def __init__(self, filename, ignore):
+    """Do not instantiate directly: Use Open()."""
+    self.__filename = filename
+    self.__ignore = ignore
+    self.__pieces = []
+    self.written = False  # Set by close().
+
+  def write(self, s):
+    if isinstance(s, unicode): s = s.encode("UTF-8")
+    self.__pieces.append(s)
+
+  def close(self):
+    if self.__pieces is None: return  # Already closed.
+    self.written = WriteIfChanged(self.__filename, "".join(self.__pieces),
+                                  self.__ignore)
+    self.__pieces = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    # Do not write a partial file after an error.
+    if exc_type is None: self.close()
+
+
+def Open(filename, ignore=None):
+  """Returns a Writer for the generated file.
+
+  Replaces codecs.open(filename, "w", "UTF-8") for generated files.
+
+  Args:
+    filename: Path/filename of the output file.
+    ignore: See WriteIfChanged().
+  """
+  return Writer(filename, ignore)
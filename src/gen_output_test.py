@@ -0,0 +1,78 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import os
+import os.path
+import re
+import shutil
+import tempfile
+import unittest
+import gen_output
+
+class GenOutputTest(unittest.TestCase):
+  def setUp(self):
+    self.__dir = tempfile.mkdtemp()
+    self.__filename = os.path.join(self.__dir, "out.txt")
+
+  def tearDown(self):
+    shutil.rmtree(self.__dir)
+
+  def testWriteIfChanged(self):
+    self.assert_(gen_output.WriteIfChanged(self.__filename, "abc"))
+    # Make the file look old so that a rewrite would be visible.
+    os.utime(self.__filename, (1000000000, 1000000000))
+    self.failIf(gen_output.WriteIfChanged(self.__filename, "abc"))
+    self.assertEqual(os.path.getmtime(self.__filename), 1000000000)
+    self.assert_(gen_output.WriteIfChanged(self.__filename, "abd"))
+    self.assertEqual(open(self.__filename, "rb").read(), "abd")
+
+  def testIgnore(self):
+    date_re = re.compile(r"Date: [0-9-]+")
+    gen_output.WriteIfChanged(self.__filename, "Date: 2012-03-08\nabc\n")
+    self.failIf(gen_output.WriteIfChanged(
+        self.__filename, "Date: 2012-03-09\nabc\n", date_re))
+    self.assertEqual(open(self.__filename, "rb").read(),
+                     "Date: 2012-03-08\nabc\n")
+    self.assert_(gen_output.WriteIfChanged(
+        self.__filename, "Date: 2012-03-09\nabd\n", date_re))
+    self.assertEqual(open(self.__filename, "rb").read(),
+                     "Date: 2012-03-09\nabd\n")
+
+  def testWriter(self):
+    with gen_output.Open(self.__filename) as writer:
+      writer.write(u"a\u3042")
+      writer.write("b")
+    self.assert_(writer.written)
+    self.assertEqual(open(self.__filename, "rb").read(), "a\xe3\x81\x82b")
+    writer = gen_output.Open(self.__filename)
+    writer.write(u"a\u3042b")
+    writer.close()
+    self.failIf(writer.written)
+
+  def testNoPartialFileOnError(self):
+    try:
+      with gen_output.Open(self.__filename) as writer:
+        writer.write("partial")
+        raise ValueError("generator failed")
+    except ValueError:
+      pass
+    self.failIf(os.path.exists(self.__filename))
+
+
+if __name__ == "__main__":
+  unittest.main()
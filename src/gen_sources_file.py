@@ -18,12 +18,15 @@
 
 __author__ = "Markus Scherer"
 
-import codecs
 import datetime
 import os.path
+import re
 import emoji4unicode
+import gen_output
 
 _date = datetime.date.today().strftime("%Y-%m-%d")
+# A new date alone does not make the file change.
+_date_re = re.compile(r"^# Date: .*$", re.MULTILINE)
 
 _HEADER = """# EmojiSources.txt
 # Date: """ + _date + """ [MS]
@@ -89,11 +92,16 @@ def _WriteSourcesFile(writer):
   writer.close()
 
 
-def main():
+def Generate():
+  """Writes EmojiSources.txt. Loads the data if it is not loaded yet."""
   emoji4unicode.Load()
   here = os.path.dirname(__file__)
   filename = os.path.join(here, "..", "generated", "EmojiSources.txt")
-  _WriteSourcesFile(codecs.open(filename, "w", "UTF-8"))
+  _WriteSourcesFile(gen_output.Open(filename, _date_re))
+
+
+def main():
+  Generate()
 
 
 if __name__ == "__main__":
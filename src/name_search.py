@@ -0,0 +1,214 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Search Unicode character names, Emoji symbol names and carrier names.
+
+The index is built once, on the first search, from
+- the Unicode character names (without the algorithmic CJK and Hangul names),
+- the emoji4unicode.xml symbol names, old names and annotations,
+- the carriers' English and Japanese symbol names, and the transliterations
+  of the Japanese names.
+
+Latin text is split into words of letters and digits, and Japanese text
+into single characters. A query matches a document that contains all of
+the query's tokens; the last query token may also be the prefix of a word,
+for search-as-you-type. Matches are ranked by the weights of the fields
+with the matching tokens, and an exact match of the whole name ranks first.
+
+Usage: name_search.py query words
+"""
+
+__author__ = "Markus Scherer"
+
+import bisect
+import heapq
+import re
+import sys
+import emoji4unicode
+import translit
+import unicode_names
+
+# Kinds of matches, besides the carrier names.
+UNICODE = "unicode"
+EMOJI = "emoji"
+
+# Field weights.
+_NAME_WEIGHT = 4
+_CARRIER_NAME_WEIGHT = 3
+_OLD_NAME_WEIGHT = 2
+_ANNOTATION_WEIGHT = 1
+_EXACT_NAME_BONUS = 100
+
+# Shortest last query token that is also matched as a prefix.
+_MIN_PREFIX_LENGTH = 2
+
+# Latin words, and single Kana/Han/halfwidth Katakana characters.
+_token_re = re.compile(u"[A-Z0-9]+|[\u3040-\u30FF\u3400-\u9FFF"
+                       u"\uF900-\uFAFF\uFF66-\uFF9F]")
+
+def _Tokenize(text):
+  return _token_re.findall(text.upper())
+
+
+def _IsWord(token):
+  return token[0] < u"\u3040"
+
+
+class Match(object):
+  """One search result.
+
+  Attributes:
+    kind: UNICODE, EMOJI, or a carrier name like "docomo".
+    key: The code point like "263A" for UNICODE, the symbol ID like "e-4B0"
+        for EMOJI, or the carrier's Unicode PUA code point like "E63E".
+    name: The display name.
+    score: Ranking score; higher is better.
+  """
+  def __init__(self, kind, key, name, score):
+    self.kind = kind
+    self.key = key
+    self.name = name
+    self.score = score
+
+  def __repr__(self):
+    return "Match(%r, %r, %r, %g)" % (self.kind, self.key, self.name,
+                                      self.score)
+
+
+class NameIndex(object):
+  """An inverted index from tokens to documents, plus a sorted token array
+  for prefix lookups."""
+  def __init__(self):
+    self.__documents = []  # (kind, key, name) tuples
+    self.__exact_names = {}  # Uppercased names to lists of document numbers.
+    self.__postings = {}  # Tokens to {document number: weight}.
+    self.__sorted_tokens = None
+
+  def Add(self, kind, key, name, fields):
+    """Adds a document.
+
+    Args:
+      kind: Kind of document, see Match.
+      key: Document key, see Match.
+      name: Display name, also matched as a whole by an exact query.
+      fields: List of (text, weight) pairs to be indexed.
+    """
+    number = len(self.__documents)
+    self.__documents.append((kind, key, name))
+    self.__exact_names.setdefault(name.upper(), []).append(number)
+    for (text, weight) in fields:
+      for token in _Tokenize(text):
+        postings = self.__postings.get(token)
+        if postings is None: postings = self.__postings[token] = {}
+        if postings.get(number, 0) < weight: postings[number] = weight
+    self.__sorted_tokens = None
+
+  def __PrefixPostings(self, prefix):
+    """Returns {document number: weight} for the words that start with the
+    prefix, with half weight for words that are longer than the prefix."""
+    if self.__sorted_tokens is None:
+      self.__sorted_tokens = sorted(self.__postings)
+    tokens = self.__sorted_tokens
+    result = dict(self.__postings.get(prefix, {}))
+    i = bisect.bisect_right(tokens, prefix)
+    while i < len(tokens) and tokens[i].startswith(prefix):
+      for (number, weight) in self.__postings[tokens[i]].iteritems():
+        weight = weight / 2.0
+        if result.get(number, 0) < weight: result[number] = weight
+      i += 1
+    return result
+
+  def Search(self, query, limit=20):
+    """Returns up to limit Match objects, best first.
+
+    Args:
+      query: Words or Japanese text, like "UMBRELLA", "umbr" or u"\u6674".
+      limit: Maximum number of results.
+    """
+    tokens = _Tokenize(query)
+    if not tokens: return []
+    scores = None
+    for (i, token) in enumerate(tokens):
+      if (i == len(tokens) - 1 and _IsWord(token) and
+          len(token) >= _MIN_PREFIX_LENGTH):
+        postings = self.__PrefixPostings(token)
+      else:
+        postings = self.__postings.get(token, {})
+      if scores is None:
+        scores = dict(postings)
+      else:
+        scores = dict([(number, score + postings[number])
+                       for (number, score) in scores.iteritems()
+                       if number in postings])
+      if not scores: return []
+    for number in self.__exact_names.get(query.strip().upper(), []):
+      scores[number] = scores.get(number, 0) + _EXACT_NAME_BONUS
+    # Best score first; then shorter names, then document order.
+    ranked = heapq.nsmallest(
+        limit, scores.iteritems(),
+        key=lambda (number, score):
+            (-score, len(self.__documents[number][2]), number))
+    return [Match(*(self.__documents[number] + (score,)))
+            for (number, score) in ranked]
+
+
+def _BuildIndex():
+  emoji4unicode.Load()
+  index = NameIndex()
+  for symbol in emoji4unicode.GetSymbols():
+    fields = [(symbol.GetName(), _NAME_WEIGHT),
+              (symbol.GetOldName(), _OLD_NAME_WEIGHT)]
+    for annotation in symbol.GetAnnotations():
+      fields.append((annotation, _ANNOTATION_WEIGHT))
+    index.Add(EMOJI, "e-" + symbol.id, symbol.GetName(), fields)
+  for carrier in emoji4unicode.carriers:
+    carrier_data = emoji4unicode.all_carrier_data[carrier]
+    for uni in sorted(carrier_data.all_uni):
+      symbol = carrier_data.SymbolFromUnicode(uni)
+      name_en = symbol.GetEnglishName()
+      name_ja = symbol.GetJapaneseName()
+      if not name_en and not name_ja: continue
+      fields = [(name_en, _CARRIER_NAME_WEIGHT),
+                (name_ja, _CARRIER_NAME_WEIGHT)]
+      if name_ja:
+        fields.append((translit.Transliterate(name_ja), _ANNOTATION_WEIGHT))
+      index.Add(carrier, uni, name_en or name_ja, fields)
+  for (code_point, name) in unicode_names.GetExplicitNames():
+    index.Add(UNICODE, "%04X" % code_point, name, [(name, _NAME_WEIGHT)])
+  return index
+
+
+_index = None
+
+def Load():
+  """Builds the search index. Called automatically by Search()."""
+  global _index
+  if not _index: _index = _BuildIndex()
+
+
+def Search(query, limit=20):
+  """Searches all names; see NameIndex.Search()."""
+  Load()
+  return _index.Search(query, limit)
+
+
+def main():
+  query = " ".join([arg.decode("UTF-8") for arg in sys.argv[1:]])
+  for match in Search(query):
+    print (u"%s\t%s\t%s" % (match.kind, match.key, match.name)).encode("UTF-8")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for name_search.py."""
+
+__author__ = "Markus Scherer"
+
+import unittest
+import name_search
+
+class NameIndexTest(unittest.TestCase):
+  def setUp(self):
+    self.index = name_search.NameIndex()
+    self.index.Add("unicode", "2602", "UMBRELLA", [("UMBRELLA", 4)])
+    self.index.Add("emoji", "e-007", "CLOSED UMBRELLA",
+                   [("CLOSED UMBRELLA", 4), ("rain gear", 1)])
+    self.index.Add("docomo", "E63F", "Cloud",
+                   [("Cloud", 3), (u"\u66C7\u308A", 3), (u"\u66C7ri", 1)])
+
+  def Keys(self, query):
+    return [match.key for match in self.index.Search(query)]
+
+  def testExactNameFirst(self):
+    self.assertEqual(["2602", "e-007"], self.Keys("umbrella"))
+    self.assertEqual(["e-007"], self.Keys("closed umbrella"))
+
+  def testAllTokens(self):
+    self.assertEqual(["e-007"], self.Keys("umbrella closed"))
+    self.assertEqual([], self.Keys("umbrella cloud"))
+    self.assertEqual(["e-007"], self.Keys("RAIN"))
+
+  def testPrefix(self):
+    self.assertEqual(["2602", "e-007"], self.Keys("umbr"))
+    self.assertEqual([], self.Keys("clo umbrella"))  # Only the last token.
+    self.assertEqual(["e-007"], self.Keys("umbrella clo"))
+    self.assertEqual([], self.Keys("u"))  # Too short for a prefix.
+
+  def testJapanese(self):
+    self.assertEqual(["E63F"], self.Keys(u"\u66C7"))
+    self.assertEqual(["E63F"], self.Keys(u"\u308A\u66C7"))
+    self.assertEqual(["E63F"], self.Keys(u"RI"))
+    self.assertEqual([], self.Keys(u"\u6674"))
+
+  def testLimit(self):
+    self.assertEqual(1, len(self.index.Search("umbrella", limit=1)))
+    self.assertEqual([], self.index.Search(" - "))
+
+  def testRepr(self):
+    # A prefix match has half weight, so scores can be fractional.
+    (match,) = self.index.Search("rai")
+    self.assertEqual("Match('emoji', 'e-007', 'CLOSED UMBRELLA', 0.5)",
+                     repr(match))
+
+
+class SearchTest(unittest.TestCase):
+  def testSearch(self):
+    matches = name_search.Search("WHITE SMILING FACE")
+    self.assertEqual(set([(name_search.EMOJI, "e-336"),
+                          (name_search.UNICODE, "263A")]),
+                     set([(match.kind, match.key) for match in matches[:2]]))
+    self.assertEqual([("docomo", "E63E")],
+                     [(match.kind, match.key)
+                      for match in name_search.Search(u"\u6674\u308C")
+                      if match.kind == "docomo"])
+    # Transliterated Japanese name.
+    self.assertTrue("E6E0" in [match.key for match in
+                               name_search.Search("shiyaapudaiyaru")])
+
+
+if __name__ == "__main__":
+  unittest.main()
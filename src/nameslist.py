@@ -18,75 +18,197 @@
 
 The file format is documented in
 http://www.unicode.org/Public/UNIDATA/NamesList.html
+
+Read() parses a whole file in one pass, dispatching on the first byte
+of each line, and only decodes the lines that end up in records.
+For lookups of a few characters, GetRecord() and GetRecords() use an index
+from code points to the byte ranges of their records in the file. The index
+is built once per version of the file and cached (see ucd.LoadCached()),
+so that a lookup reads and parses only the records it returns.
 """
 
 __author__ = "Markus Scherer"
 
-import codecs
+import mmap
+import os.path
 import re
+import ucd
+
+class Record(object):
+  """The data for one character (CHAR_ENTRY) in a NamesList file.
+
+  For compatibility with older callers, a Record also works like a dictionary
+  with "uni", "name" and "data" keys, where "data" is only present if
+  the data list is not empty.
+
+  Attributes:
+    uni: The code point as a 4-6-hex-digit string.
+    name: The character name.
+    data: List of strings which are the lines of data for this character,
+        minus the leading TAB.
+    offset: Byte offset of the record in the file.
+    length: Length of the record in bytes, up to the end of its last line.
+  """
+  __slots__ = ("uni", "name", "data", "offset", "length")
 
-def Read(filename):
-  """Reads data records from a Unicode NamesList.txt-format file.
+  def __init__(self, uni, name, offset, length):
+    self.uni = uni
+    self.name = name
+    self.data = []
+    self.offset = offset
+    self.length = length
 
-  Args:
-    filename: Path and filename for the NamesList.txt-format file to read.
+  def __contains__(self, key):
+    if key == "data": return bool(self.data)
+    return key in ("uni", "name")
 
-  Yields:
-    A record per character. Each record is a Python dictionary.
-    For each character in the NamesList,
-    the "uni" key has the code point as a 4-6-hex-digit string,
-    the "name" key has the character name,
-    and the "data" key has a list of strings which are the lines of data
-    for this character, minus the leading TAB.
+  def __getitem__(self, key):
+    if key not in self: raise KeyError(key)
+    return getattr(self, key)
+
+  def get(self, key, default=None):
+    if key not in self: return default
+    return getattr(self, key)
+
+
+# Match a NAME_LINE in the Unicode NamesList.txt file.
+_name_line_re = re.compile(r"^([0-9A-F]{4,6})\t(.+)$")
+
+_HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+def _Parse(contents, offset=0):
+  """Yields the Records in NamesList.txt-format file contents.
+
+  Args:
+    contents: Byte str with whole lines from a NamesList file.
+    offset: The file offset of the contents.
   """
-  # Match a NAME_LINE in the Unicode NamesList.txt file.
-  name_line_re = re.compile(r"^([0-9A-F]{4,6})\t(.+)$")
   # NamesList.txt is in "ISO-8859-1" up to Unicode 6.1,
   # and in "UTF-8" starting with Unicode 6.2.
-  in_file = codecs.open(filename, "r", "UTF-8")
-  # A record is a unit of data we yield to the caller.
-  # Normally, it contains the data for one character.
-  record = {}
-  for line in in_file:
+  limit = offset + len(contents)
+  record = None
+  for line in contents.split("\n"):
+    start = offset
+    offset += len(line) + 1
+    first = line[:1]
+    if first == "\t":
+      # Most CHAR_ENTRY data lines for a character start with a TAB.
+      if record is None: continue
+      comment_start = line.find(";")
+      if comment_start >= 0: line = line[:comment_start]
+      line = line.decode("UTF-8").rstrip()
+      if line:
+        record.data.append(line[1:])
+        record.length = offset - record.offset
+      continue
+    if first == ";":
+      # Starting 2009-nov-04 the NamesList has commented-out Emoji ID lines
+      # so that the Emoji ID do not show up in UniBook chart production.
+      if record is not None and line.startswith(";\t= e-"):
+        record.data.append(line[2:].decode("UTF-8").rstrip())
+        record.length = offset - record.offset
+      # Otherwise a FILE_COMMENT.
+      continue
+    if first == "@" and line.startswith("@+\t"):
+      # A NOTICE_LINE which is part of the current CHAR_ENTRY.
+      if record is not None: record.length = offset - record.offset
+      continue
     comment_start = line.find(";")
-    if comment_start >= 0:
-      if line.startswith(";\t= e-"):
-        # Starting 2009-nov-04 the NamesList has commented-out Emoji ID lines
-        # so that the Emoji ID do not show up in UniBook chart production.
-        line = line[1:].rstrip()  # Remove the ; and the line ending.
-      else:
-        line = line[:comment_start].rstrip()  # Remove comment.
-    else:
-      line = line.rstrip()  # Remove line ending.
+    if comment_start >= 0: line = line[:comment_start]
+    line = line.decode("UTF-8").rstrip()
     if not line:
-      # Skip EMPTY_LINE or FILE_COMMENT.
+      # Skip EMPTY_LINE.
       continue
-    if "uni" in record:
-      # Most CHAR_ENTRY data lines for a character start with a TAB.
-      if line.startswith("\t"):
-        if "data" not in record:
-          record["data"] = []
-        record["data"].append(line[1:])
-        continue
-      elif line.startswith("@+\t"):
-        # A NOTICE_LINE which is part of the current CHAR_ENTRY.
-        continue
-      else:
-        # If a line does not start with a TAB and is not a NOTICE_LINE,
-        # then it indicates the end of a CHAR_ENTRY.
-        yield record
-        record = {}
-    match = name_line_re.match(line)
-    if match:
-      # Begin a new CHAR_ENTRY.
-      record["uni"] = match.group(1)
-      record["name"] = match.group(2)
-
-  if record:
-    # The last data record in the file.
+    # If a line does not start with a TAB and is not a NOTICE_LINE,
+    # then it indicates the end of a CHAR_ENTRY.
+    if record is not None:
+      yield record
+      record = None
+    if first in _HEX_DIGITS:
+      match = _name_line_re.match(line)
+      if match:
+        # Begin a new CHAR_ENTRY.
+        record = Record(match.group(1), match.group(2), start, offset - start)
+  if record is not None:
+    # The last data record in the file, which might not end with a newline.
+    record.length = min(record.length, limit - record.offset)
     yield record
 
 
+def Read(filename):
+  """Reads data records from a Unicode NamesList.txt-format file.
+
+  Args:
+    filename: Path and filename for the NamesList.txt-format file to read.
+
+  Yields:
+    A Record per character, in file order.
+  """
+  return _Parse(ucd.ReadFile(filename))
+
+
+_INDEX_VERSION = 1
+
+def _BuildIndex(contents):
+  return dict([(record.uni, (record.offset, record.length))
+               for record in _Parse(contents)])
+
+
+_indexes = {}
+
+def LoadIndex(filename):
+  """Returns the index of a NamesList.txt-format file.
+
+  The index is loaded once per process, from the cache if the file
+  has not changed.
+
+  Returns:
+    Dictionary from code point hex strings like "1F600"
+    to (offset, length) byte ranges of their records in the file.
+  """
+  index = _indexes.get(filename)
+  if index is None:
+    index = _indexes[filename] = ucd.LoadCached(
+        filename, "nameslist-" + os.path.basename(filename),
+        _INDEX_VERSION, _BuildIndex)
+  return index
+
+
+def GetRecords(filename, unis):
+  """Reads the records for some characters from a NamesList.txt-format file.
+
+  Args:
+    filename: Path and filename for the NamesList.txt-format file to read.
+    unis: Iterable of code point hex strings like "1F600".
+
+  Returns:
+    List of the Records, in the order of unis.
+    Characters which are not in the file are omitted.
+  """
+  index = LoadIndex(filename)
+  ranges = [index[uni] for uni in unis if uni in index]
+  if not ranges: return []
+  records = []
+  with open(filename, "rb") as file:
+    contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+      for (offset, length) in ranges:
+        records.extend(_Parse(contents[offset:offset + length], offset))
+    finally:
+      contents.close()
+  return records
+
+
+def GetRecord(filename, uni):
+  """Returns the Record for one character, or None if it is not in the file.
+
+  See GetRecords().
+  """
+  records = GetRecords(filename, [uni])
+  if records: return records[0]
+  return None
+
+
 _emoji_alias_re = re.compile(r"^= e-([0-9A-F]{3})$")
 
 def GetEmojiID(record):
@@ -100,9 +222,8 @@ def GetEmojiID(record):
     The Emoji symbol ID as a 3-hex-digit string, if present.
     Otherwise None.
   """
-  if "uni" in record and "data" in record:
-    data = record["data"]
-    for item in data:
+  if record.data:
+    for item in record.data:
       match = _emoji_alias_re.match(item)
       if match:
         return match.group(1)
@@ -120,9 +241,8 @@ def GetDecomposition(record):
     Compatibility decompositions begin with <compat>, <wide> etc.
     Returns an empty string if the character does not decompose.
   """
-  if "uni" in record and "data" in record:
-    data = record["data"]
-    for item in data:
+  if record.data:
+    for item in record.data:
       match = _decomp_re.match(item)
       if match:
         decomp = match.group(2)
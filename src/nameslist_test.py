@@ -0,0 +1,117 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for nameslist.py."""
+
+__author__ = "Markus Scherer"
+
+import os.path
+import shutil
+import tempfile
+import unittest
+import nameslist
+import ucd
+
+_CONTENTS = """@@@\tThe Unicode Standard 6.0.0
+@@@+\tA file comment.
+; Another file comment.
+
+@@\t0080\tLatin-1 Supplement\t00FF
+00BD\tVULGAR FRACTION ONE HALF
+\t* bar may be horizontal or slanted ; comment
+\t# <fraction> 0031 2044 0032
+00BF\tINVERTED QUESTION MARK
+\t= turned question mark
+@\t\tEmoji
+1F422\tTURTLE
+;\t= e-1CB
+@+\t\tA notice which belongs to the character.
+\t: 1F422
+1F423\tHATCHING CHICK"""
+
+class NamesListTest(unittest.TestCase):
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.filename = os.path.join(self.folder, "Sample.lst")
+    with open(self.filename, "wb") as file:
+      file.write(_CONTENTS)
+    self.saved_cache_folder = ucd._cache_folder
+    ucd._cache_folder = os.path.join(self.folder, "cache")
+    nameslist._indexes.clear()
+
+  def tearDown(self):
+    ucd._cache_folder = self.saved_cache_folder
+    nameslist._indexes.clear()
+    shutil.rmtree(self.folder)
+
+  def testRead(self):
+    records = list(nameslist.Read(self.filename))
+    self.assertEqual([("00BD", "VULGAR FRACTION ONE HALF",
+                       ["* bar may be horizontal or slanted",
+                        "# <fraction> 0031 2044 0032"]),
+                      ("00BF", "INVERTED QUESTION MARK",
+                       ["= turned question mark"]),
+                      ("1F422", "TURTLE", ["= e-1CB", ": 1F422"]),
+                      ("1F423", "HATCHING CHICK", [])],
+                     [(record.uni, record.name, record.data)
+                      for record in records])
+
+  def testDictionaryAccess(self):
+    (half, question, turtle, chick) = nameslist.Read(self.filename)
+    self.assertTrue("uni" in turtle)
+    self.assertEqual("1F422", turtle["uni"])
+    self.assertEqual("TURTLE", turtle["name"])
+    self.assertEqual(["= e-1CB", ": 1F422"], turtle["data"])
+    self.assertFalse("data" in chick)
+    self.assertRaises(KeyError, lambda: chick["data"])
+    self.assertEqual(None, chick.get("data"))
+    self.assertFalse("offset" in chick)
+
+  def testEmojiIDAndDecomposition(self):
+    (half, question, turtle, chick) = nameslist.Read(self.filename)
+    self.assertEqual("1CB", nameslist.GetEmojiID(turtle))
+    self.assertEqual(None, nameslist.GetEmojiID(half))
+    self.assertEqual(None, nameslist.GetEmojiID(chick))
+    self.assertEqual("<fraction> 0031 2044 0032",
+                     nameslist.GetDecomposition(half))
+    self.assertEqual("1F422", nameslist.GetDecomposition(turtle))
+    self.assertEqual("", nameslist.GetDecomposition(question))
+
+  def testGetRecords(self):
+    for record in nameslist.Read(self.filename):
+      found = nameslist.GetRecord(self.filename, record.uni)
+      self.assertEqual((record.uni, record.name, record.data,
+                        record.offset, record.length),
+                       (found.uni, found.name, found.data,
+                        found.offset, found.length))
+    self.assertEqual(["1F423", "00BD"],
+                     [record.uni for record in nameslist.GetRecords(
+                         self.filename, ["1F423", "0041", "00BD"])])
+    self.assertEqual(None, nameslist.GetRecord(self.filename, "0041"))
+
+  def testIndexCache(self):
+    index = nameslist.LoadIndex(self.filename)
+    self.assertEqual(_CONTENTS.index("1F422"), index["1F422"][0])
+    self.assertEqual(len(_CONTENTS), sum(index["1F423"]))
+    # Another process loads the cached index.
+    nameslist._indexes.clear()
+    self.assertEqual(index, nameslist.LoadIndex(self.filename))
+    self.assertTrue(os.path.exists(os.path.join(
+        ucd._cache_folder, "nameslist-Sample.lst.marshal")))
+
+
+if __name__ == "__main__":
+  unittest.main()
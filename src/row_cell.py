@@ -33,10 +33,70 @@ values.
 RowCell can only represent row-cell values corresponding to JIS X 0208,
 limiting Shift-JIS codes to double-byte codes with lead bytes 81..9f and e0..ef,
 excluding f0..fc.
+
+For conversions in loops, the ...Index() functions work with integers only:
+Each of the 94x94=8836 cells has a linear index 0..8835
+(row-major, so index = (row - 1) * 94 + (cell - 1)),
+and module-level tables map indexes to and from 16-bit Shift-JIS,
+ISO-2022 (JIS) and EUC codes, without creating RowCell objects.
+
+The Shift-JIS index functions also cover the user-defined area with
+lead bytes f0..fc, which Japanese mobile carriers use for Emoji.
+The Shift-JIS scheme continues there as if with rows 95..120, so these
+codes have indexes 8836..11279 in the same linear order.
 """
 
 __author__ = "Markus Scherer"
 
+NUM_CELLS = 94 * 94
+# Including the Shift-JIS user-defined area.
+NUM_SHIFT_JIS_CELLS = 120 * 94
+
+def _ShiftJisFromRowCell(row, cell):
+  """Computes the Shift-JIS byte pair for row 1..120 and cell 1..94."""
+  b1 = row
+  b2 = cell
+  if b1 & 1:
+    b1 += 1
+    if b2 <= 0x3f:
+      b2 += 0x3f
+    else:
+      b2 += 0x40
+  else:
+    b2 += 0x9e;
+  b1 >>= 1
+  if b1 <= 0x1f:
+    b1 += 0x80
+  else:
+    b1 += 0xc0
+  return (b1, b2)
+
+
+# Index-to-code tables, and code-to-index dictionaries which contain only
+# the valid codes.
+_index_to_shift_jis = []
+_index_to_jis = []
+_index_to_euc = []
+_index_to_row_cell = []  # (row, cell) pairs
+for _row in xrange(1, 95):
+  for _cell in xrange(1, 95):
+    (_b1, _b2) = _ShiftJisFromRowCell(_row, _cell)
+    _index_to_shift_jis.append((_b1 << 8) | _b2)
+    _index_to_jis.append(((_row + 0x20) << 8) | (_cell + 0x20))
+    _index_to_euc.append(((_row + 0xa0) << 8) | (_cell + 0xa0))
+    _index_to_row_cell.append((_row, _cell))
+_jis_to_index = dict(zip(_index_to_jis, xrange(NUM_CELLS)))
+_euc_to_index = dict(zip(_index_to_euc, xrange(NUM_CELLS)))
+# The Shift-JIS user-defined area, as rows 95..120.
+for _row in xrange(95, 121):
+  for _cell in xrange(1, 95):
+    (_b1, _b2) = _ShiftJisFromRowCell(_row, _cell)
+    _index_to_shift_jis.append((_b1 << 8) | _b2)
+_shift_jis_to_index = dict(zip(_index_to_shift_jis,
+                               xrange(NUM_SHIFT_JIS_CELLS)))
+del _row, _cell, _b1, _b2
+
+
 class RowCell(object):
   """Row-cell value pair.
 
@@ -94,11 +154,10 @@ class RowCell(object):
     """
     if other < 0:
       raise ValueError("expect non-negative increment but got %d" % other)
-    (row_inc, cell_rem) = divmod(self.cell - 1 + other, 94)
-    row = self.row + row_inc
-    if row > 94:
+    index = self.Index() + other
+    if index >= NUM_CELLS:
       raise OverflowError("RowCell %s + %d overflow" % (self, other))
-    return RowCell(row, cell_rem + 1)
+    return FromIndex(index)
 
   def __sub__(self, other):
     """Return the linear difference between two row-cell pairs.
@@ -110,9 +169,11 @@ class RowCell(object):
     Returns:
       An integer with the linear difference between the two row-cell pairs.
     """
-    row_diff = self.row - other.row
-    cell_diff = self.cell - other.cell
-    return row_diff * 94 + cell_diff
+    return self.Index() - other.Index()
+
+  def Index(self):
+    """Returns the linear index 0..8835 of the row-cell value pair."""
+    return (self.row - 1) * 94 + self.cell - 1
 
   def ToDecimalString(self):
     """Create a 4-decimal-digit string from the row-cell values.
@@ -138,22 +199,8 @@ class RowCell(object):
     Returns:
       The pair of Shift-JIS bytes corresponding to the row-cell value pair.
     """
-    b1 = self.row
-    b2 = self.cell
-    if b1 & 1:
-      b1 += 1
-      if b2 <= 0x3f:
-        b2 += 0x3f
-      else:
-        b2 += 0x40
-    else:
-      b2 += 0x9e;
-    b1 >>= 1
-    if b1 <= 0x1f:
-      b1 += 0x80
-    else:
-      b1 += 0xc0
-    return (b1, b2)
+    code = _index_to_shift_jis[self.Index()]
+    return (code >> 8, code & 0xff)
 
   def ToShiftJisString(self):
     """Convert the row-cell values to Shift-JIS in a hex-digit string.
@@ -162,8 +209,23 @@ class RowCell(object):
       The pair of Shift-JIS bytes corresponding to the row-cell value pair,
       with the Shift-JIS bytes represented as 2 uppercase hex digits each.
     """
-    sjis = self.ToShiftJis()
-    return "%02X%02X" % (sjis[0], sjis[1])
+    return "%04X" % _index_to_shift_jis[self.Index()]
+
+
+def FromIndex(index):
+  """Create a RowCell instance from a linear index.
+
+  Returns:
+    A RowCell instance with the row-cell value pair.
+
+  Raises:
+    ValueError: The index is not 0..8835.
+  """
+  if not 0 <= index < NUM_CELLS:
+    raise ValueError("index %d out of range" % index)
+  rc = RowCell.__new__(RowCell)
+  (rc.row, rc.cell) = _index_to_row_cell[index]
+  return rc
 
 
 def FromHexString(s):
@@ -214,7 +276,7 @@ def From2022(b1, b2):
   """
   if not 0x21 <= b1 <= 0x7e or not 0x21 <= b2 <= 0x7e:
     raise ValueError("value out of range")
-  return RowCell(b1 - 0x20, b2 - 0x20)
+  return FromIndex(_jis_to_index[(b1 << 8) | b2])
 
 
 def From2022Integer(jis):
@@ -258,22 +320,10 @@ def FromShiftJis(b1, b2):
     ValueError: The lead byte is not 0x81..0x9f or 0xe0..0xef, and/or
       the trail byte is not 0x40..0x7e or 0x80..0xfc.
   """
-  if not ((0x81 <= b1 <= 0x9f or 0xe0 <= b1 <= 0xef) and
-          0x40 <= b2 <= 0xfc and b2 != 0x7f):
+  index = _shift_jis_to_index.get((b1 << 8) | b2)
+  if index is None or index >= NUM_CELLS or not 0 <= b2 <= 0xff:
     raise ValueError("value out of range")
-  if b1 <= 0x9f:
-    b1 = (b1 - 0x80) << 1
-  else:
-    b1 = (b1 - 0xc0) << 1
-  if b2 <= 0x9e:
-    b1 -= 1
-    if b2 <= 0x7e:
-      b2 -= 0x3f
-    else:
-      b2 -= 0x40
-  else:
-    b2 -= 0x9e
-  return RowCell(b1, b2)
+  return FromIndex(index)
 
 
 def FromShiftJisString(s):
@@ -293,3 +343,84 @@ def FromShiftJisString(s):
   """
   if len(s) != 4: raise ValueError("the string must contain 4 hex digits")
   return FromShiftJis(int(s[0:2], 16), int(s[2:4], 16))
+
+
+def IndexFromShiftJis(code):
+  """Returns the linear index for a 16-bit Shift-JIS code like 0x8140.
+
+  Codes with lead bytes 0xf0..0xfc (user-defined area) have
+  indexes NUM_CELLS..NUM_SHIFT_JIS_CELLS-1.
+
+  Raises:
+    ValueError: The code is not a double-byte Shift-JIS code with
+      a lead byte 0x81..0x9f or 0xe0..0xfc.
+  """
+  index = _shift_jis_to_index.get(code)
+  if index is None: raise ValueError("Shift-JIS code %X out of range" % code)
+  return index
+
+
+def ShiftJisFromIndex(index):
+  """Returns the 16-bit Shift-JIS code for a linear index 0..11279.
+
+  Indexes from NUM_CELLS=8836 are in the user-defined area.
+
+  Raises:
+    ValueError: The index is not 0..11279.
+  """
+  if not 0 <= index < NUM_SHIFT_JIS_CELLS:
+    raise ValueError("index %d out of range" % index)
+  return _index_to_shift_jis[index]
+
+
+def IndexFromJis(code):
+  """Returns the linear index for a 16-bit ISO-2022 "GL" code like 0x2121.
+
+  Raises:
+    ValueError: One or both code bytes are not 0x21..0x7e.
+  """
+  index = _jis_to_index.get(code)
+  if index is None: raise ValueError("JIS code %X out of range" % code)
+  return index
+
+
+def JisFromIndex(index):
+  """Returns the 16-bit ISO-2022 "GL" code for a linear index 0..8835.
+
+  Raises:
+    ValueError: The index is not 0..8835.
+  """
+  if not 0 <= index < NUM_CELLS:
+    raise ValueError("index %d out of range" % index)
+  return _index_to_jis[index]
+
+
+def IndexFromEuc(code):
+  """Returns the linear index for a 16-bit EUC "GR" code like 0xa1a1.
+
+  Raises:
+    ValueError: One or both code bytes are not 0xa1..0xfe.
+  """
+  index = _euc_to_index.get(code)
+  if index is None: raise ValueError("EUC code %X out of range" % code)
+  return index
+
+
+def EucFromIndex(index):
+  """Returns the 16-bit EUC "GR" code for a linear index 0..8835.
+
+  Raises:
+    ValueError: The index is not 0..8835.
+  """
+  if not 0 <= index < NUM_CELLS:
+    raise ValueError("index %d out of range" % index)
+  return _index_to_euc[index]
+
+
+def ShiftJisFromJis(code):
+  """Converts a 16-bit ISO-2022 "GL" code to the 16-bit Shift-JIS code.
+
+  Raises:
+    ValueError: One or both code bytes are not 0x21..0x7e.
+  """
+  return _index_to_shift_jis[IndexFromJis(code)]
@@ -134,6 +134,65 @@ class RowCellTest(unittest.TestCase):
     self.assertRaises(ValueError, row_cell.FromShiftJisString, "809E")
     self.assertRaises(ValueError, row_cell.FromShiftJisString, "817F")
 
+  def testIndex(self):
+    self.assertEqual(row_cell.RowCell(1, 1).Index(), 0)
+    self.assertEqual(row_cell.RowCell(2, 1).Index(), 94)
+    self.assertEqual(row_cell.RowCell(94, 94).Index(), 8835)
+    self.assertEqual(row_cell.FromIndex(95), row_cell.RowCell(2, 2))
+    self.assertRaises(ValueError, row_cell.FromIndex, -1)
+    self.assertRaises(ValueError, row_cell.FromIndex, 8836)
+
+  def testIntegerConversions(self):
+    self.assertEqual(row_cell.IndexFromShiftJis(0x819e), 93)
+    self.assertEqual(row_cell.ShiftJisFromIndex(8835), 0xeffc)
+    self.assertEqual(row_cell.IndexFromJis(0x217e), 93)
+    self.assertEqual(row_cell.JisFromIndex(8835), 0x7e7e)
+    self.assertEqual(row_cell.IndexFromEuc(0xa1fe), 93)
+    self.assertEqual(row_cell.EucFromIndex(8835), 0xfefe)
+    self.assertEqual(row_cell.ShiftJisFromJis(0x2121), 0x8140)
+    self.assertRaises(ValueError, row_cell.IndexFromShiftJis, 0x817f)
+    self.assertRaises(ValueError, row_cell.IndexFromShiftJis, 0xfd40)
+    self.assertRaises(ValueError, row_cell.IndexFromJis, 0x217f)
+    self.assertRaises(ValueError, row_cell.IndexFromEuc, 0xa1ff)
+    self.assertRaises(ValueError, row_cell.ShiftJisFromIndex, 11280)
+    self.assertRaises(ValueError, row_cell.JisFromIndex, -1)
+    self.assertRaises(ValueError, row_cell.EucFromIndex, -1)
+    self.assertRaises(ValueError, row_cell.ShiftJisFromJis, 0x2020)
+    # The integer functions agree with RowCell for all cells.
+    for index in xrange(row_cell.NUM_CELLS):
+      rc = row_cell.FromIndex(index)
+      (b1, b2) = rc.ToShiftJis()
+      self.assertEqual(row_cell.ShiftJisFromIndex(index), (b1 << 8) | b2)
+      (b1, b2) = rc.To2022()
+      self.assertEqual(row_cell.JisFromIndex(index), (b1 << 8) | b2)
+      self.assertEqual(
+          row_cell.IndexFromShiftJis(row_cell.ShiftJisFromIndex(index)), index)
+      self.assertEqual(row_cell.IndexFromJis(row_cell.JisFromIndex(index)),
+                       index)
+      self.assertEqual(row_cell.IndexFromEuc(row_cell.EucFromIndex(index)),
+                       index)
+
+  def testShiftJisUserDefinedArea(self):
+    self.assertEqual(row_cell.NUM_SHIFT_JIS_CELLS, 11280)
+    self.assertEqual(row_cell.IndexFromShiftJis(0xf040), row_cell.NUM_CELLS)
+    self.assertEqual(row_cell.ShiftJisFromIndex(11279), 0xfcfc)
+    # Linear order continues across the gap in the trail bytes,
+    # and across the lead bytes.
+    self.assertEqual(row_cell.IndexFromShiftJis(0xf280) -
+                     row_cell.IndexFromShiftJis(0xf27e), 1)
+    self.assertEqual(row_cell.IndexFromShiftJis(0xf340) -
+                     row_cell.IndexFromShiftJis(0xf2fc), 1)
+    self.assertEqual(row_cell.IndexFromShiftJis(0xf040) -
+                     row_cell.IndexFromShiftJis(0xeffc), 1)
+    for index in xrange(row_cell.NUM_SHIFT_JIS_CELLS):
+      self.assertEqual(
+          row_cell.IndexFromShiftJis(row_cell.ShiftJisFromIndex(index)), index)
+    # RowCell remains limited to JIS X 0208.
+    self.assertRaises(ValueError, row_cell.FromShiftJis, 0xf0, 0x40)
+    self.assertRaises(ValueError, row_cell.FromShiftJisString, "F040")
+    self.assertRaises(ValueError, row_cell.FromIndex, row_cell.NUM_CELLS)
+    self.assertRaises(ValueError, row_cell.JisFromIndex, row_cell.NUM_CELLS)
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -14,45 +14,206 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Load and make available Unicode Standardized Variants data."""
+"""Load and make available Unicode Standardized Variants data.
+
+All standardized variation sequences are kept in a trie keyed by code point,
+for matching sequences of any length in text.
+The Emoji presentation sequences (descriptions "text style" and
+"emoji style", with U+FE0E and U+FE0F) are also kept as maps from their
+base sequences, and there are string helpers to add, strip and
+canonicalize these presentation selectors in whole strings.
+The helpers take and return unicode strings.
+"""
 
 __author__ = "Markus Scherer"
 
-import os.path
+import re
+import ucd
+import utf
+
+TEXT_PRESENTATION_SELECTOR = 0xFE0E  # VS15
+EMOJI_PRESENTATION_SELECTOR = 0xFE0F  # VS16
+
+_TEXT_STYLE = "text style"
+_EMOJI_STYLE = "emoji style"
 
+# Trie of all standardized variation sequences: Nested dictionaries keyed
+# by code point; the None key of a node has the description of the sequence
+# that ends there.
+_trie = {}
+# Base sequences (tuples of code points, without the selector)
+# with text style and emoji style variation sequences.
+_text_style_bases = set()
+_emoji_style_bases = set()
 # Code points with Emoji variation selector sequences.
 _emoji_vs_code_points = set()
 
+# unicode.translate() table that removes the presentation selectors.
+_STRIP_TABLE = {TEXT_PRESENTATION_SELECTOR: None,
+                EMOJI_PRESENTATION_SELECTOR: None}
+
+_SELECTORS = u"\uFE0E\uFE0F"
+
+# Compiled by Load(): Presentation selectors with an optional
+# preceding base sequence, and base sequences without a following selector.
+_selectors_re = None
+_text_bases_re = None
+_emoji_bases_re = None
+
+def _SequenceString(code_points):
+  return u"".join([utf.UTF.CodePointString(cp) for cp in code_points])
+
+
+def _BasesPattern(bases):
+  """Returns a regular expression alternation of the base sequences,
+  longest first so that the longest base matches."""
+  strings = sorted([_SequenceString(base) for base in bases],
+                   key=lambda s: (-len(s), s))
+  return u"|".join([re.escape(s) for s in strings]) or u"(?!)"
+
+
 def Load():
   """Loads Unicode Standardized Variants data."""
-  if _emoji_vs_code_points: return  # Already loaded.
-  # TODO(mscherer): Add argument for root data folder path.
-  filename = os.path.join(os.path.dirname(__file__),
-                          "..", "data", "unicode", "StandardizedVariants.txt")
-  file = open(filename, "r")
-  for line in file:
-    line = line.strip()  # Remove trailing newlines etc.
-    index = line.find("#")  # Remove comments.
-    if index >= 0: line = line[:index].rstrip()
-    if not line: continue  # Skip empty lines.
-    fields = line.split(";")
+  global _selectors_re, _text_bases_re, _emoji_bases_re
+  if _trie: return  # Already loaded.
+  contents = ucd.ReadFile(ucd.DataFilename("StandardizedVariants.txt"))
+  for fields in ucd.ParseFields(contents):
     # Sample lines:
     # 2601 FE0E; text style;  # CLOUD
     # 2601 FE0F; emoji style; # CLOUD
+    # 2229 FE00; with serifs; # INTERSECTION
+    code_points = ucd.ParseCodePoints(fields[0])
     description = fields[1]
-    if "emoji style" not in description: continue  # Ignore non-Emoji sequences.
-    # Turn the Unicode code point sequence string into an integer list.
-    code_points = fields[0].split()
-    for i in range(len(code_points)):
-      code_points[i] = int(code_points[i], 16)
-    if code_points[-1] != 0xFE0F:
-      # The sequence must end with Variation Selector 16.
-      raise ValueError("emoji style for sequence without VS16: " + line)
-    if len(code_points) != 2:
-      raise ValueError("current limitation: emoji style sequences must be " +
-                       "one code point plus VS16")
-    _emoji_vs_code_points.add(code_points[0])
+    node = _trie
+    for cp in code_points: node = node.setdefault(cp, {})
+    node[None] = description
+    base = tuple(code_points[:-1])
+    if description == _TEXT_STYLE:
+      if code_points[-1] != TEXT_PRESENTATION_SELECTOR:
+        # The sequence must end with Variation Selector 15.
+        raise ValueError("text style for sequence without VS15: " +
+                         "; ".join(fields))
+      _text_style_bases.add(base)
+    elif description == _EMOJI_STYLE:
+      if code_points[-1] != EMOJI_PRESENTATION_SELECTOR:
+        # The sequence must end with Variation Selector 16.
+        raise ValueError("emoji style for sequence without VS16: " +
+                         "; ".join(fields))
+      _emoji_style_bases.add(base)
+      if len(base) == 1: _emoji_vs_code_points.add(base[0])
+  _selectors_re = re.compile(
+      u"(%s)?([%s]+)" % (_BasesPattern(_text_style_bases | _emoji_style_bases),
+                         _SELECTORS))
+  _text_bases_re = re.compile(u"(?:%s)(?![%s])" %
+                              (_BasesPattern(_text_style_bases), _SELECTORS))
+  _emoji_bases_re = re.compile(u"(?:%s)(?![%s])" %
+                               (_BasesPattern(_emoji_style_bases), _SELECTORS))
 
 
 def GetSetOfUnicodeWithEmojiVS():
+  """Returns the set of single code points with emoji style sequences."""
   return _emoji_vs_code_points
+
+
+def GetDescription(code_points):
+  """Returns the description of a standardized variation sequence,
+  like "emoji style" or "second form", or None if it is not one.
+
+  Args:
+    code_points: Sequence of code point integers, including the selector.
+  """
+  node = _trie
+  for cp in code_points:
+    node = node.get(cp)
+    if node is None: return None
+  return node.get(None)
+
+
+def HasTextStyle(base):
+  """Does the base code point or sequence of code points have a
+  text style variation sequence?"""
+  if isinstance(base, (int, long)): base = (base,)
+  return tuple(base) in _text_style_bases
+
+
+def HasEmojiStyle(base):
+  """Does the base code point or sequence of code points have an
+  emoji style variation sequence?"""
+  if isinstance(base, (int, long)): base = (base,)
+  return tuple(base) in _emoji_style_bases
+
+
+def _CodePoints(s, start):
+  """Generator of (code point, limit index) from the start index,
+  with surrogate pairs combined on narrow Python builds."""
+  i = start
+  while i < len(s):
+    cp = ord(s[i])
+    i += 1
+    if 0xD800 <= cp < 0xDC00 and i < len(s) and 0xDC00 <= ord(s[i]) < 0xE000:
+      cp = 0x10000 + ((cp - 0xD800) << 10) + (ord(s[i]) - 0xDC00)
+      i += 1
+    yield (cp, i)
+
+
+def FindVariants(s):
+  """Generator of the standardized variation sequences in a string.
+
+  Matches the longest sequence at each position, and continues after it.
+
+  Yields:
+    (start, limit, description) triples with string indexes.
+  """
+  start = 0
+  while start < len(s):
+    node = _trie
+    match_limit = None
+    next_start = None
+    for (cp, limit) in _CodePoints(s, start):
+      if next_start is None: next_start = limit
+      node = node.get(cp)
+      if node is None: break
+      if None in node: (match_limit, description) = (limit, node[None])
+    if match_limit is not None:
+      yield (start, match_limit, description)
+      start = match_limit
+    else:
+      start = next_start
+
+
+def StripPresentationSelectors(s):
+  """Removes all U+FE0E and U+FE0F from the string."""
+  return s.translate(_STRIP_TABLE)
+
+
+def AddEmojiPresentation(s):
+  """Appends U+FE0F to each base with an emoji style sequence
+  that is not already followed by a presentation selector."""
+  return _emoji_bases_re.sub(u"\\g<0>\uFE0F", s)
+
+
+def AddTextPresentation(s):
+  """Appends U+FE0E to each base with a text style sequence
+  that is not already followed by a presentation selector."""
+  return _text_bases_re.sub(u"\\g<0>\uFE0E", s)
+
+
+def _CanonicalSelector(match):
+  base = match.group(1)
+  if base:
+    selector = ord(match.group(2)[0])
+    base_code_points = tuple([cp for (cp, limit) in _CodePoints(base, 0)])
+    if ((selector == TEXT_PRESENTATION_SELECTOR and
+         base_code_points in _text_style_bases) or
+        (selector == EMOJI_PRESENTATION_SELECTOR and
+         base_code_points in _emoji_style_bases)):
+      return base + unichr(selector)
+    return base
+  return u""
+
+
+def CanonicalizePresentationSelectors(s):
+  """Keeps only the presentation selectors that form standardized
+  variation sequences with the preceding base, at most one per base.
+  Removes stray, unsupported and repeated selectors."""
+  return _selectors_re.sub(_CanonicalSelector, s)
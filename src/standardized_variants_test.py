@@ -0,0 +1,87 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for standardized_variants.py."""
+
+__author__ = "Markus Scherer"
+
+import unittest
+import standardized_variants
+import utf
+
+_CLOUD = u"\u2601"
+_MAHJONG = utf.UTF.CodePointString(0x1F004)  # Supplementary
+_VS15 = u"\uFE0E"
+_VS16 = u"\uFE0F"
+
+class StandardizedVariantsTest(unittest.TestCase):
+  def setUp(self):
+    standardized_variants.Load()
+
+  def testModel(self):
+    sv = standardized_variants
+    self.assertTrue(0x2601 in sv.GetSetOfUnicodeWithEmojiVS())
+    self.assertFalse(0x0041 in sv.GetSetOfUnicodeWithEmojiVS())
+    self.assertTrue(sv.HasEmojiStyle(0x2601))
+    self.assertTrue(sv.HasTextStyle([0x2601]))
+    self.assertTrue(sv.HasEmojiStyle(0x1F004))
+    self.assertTrue(sv.HasTextStyle(0x1F004))
+    self.assertFalse(sv.HasEmojiStyle(0x2229))
+    self.assertEqual("emoji style", sv.GetDescription([0x2601, 0xFE0F]))
+    self.assertEqual("text style", sv.GetDescription((0x0023, 0xFE0E)))
+    self.assertEqual("with serifs", sv.GetDescription([0x2229, 0xFE00]))
+    self.assertEqual(None, sv.GetDescription([0x2229]))
+    self.assertEqual(None, sv.GetDescription([0x0041, 0xFE0F]))
+
+  def testFindVariants(self):
+    s = (u"a" + _CLOUD + _VS15 + u"\u2229\uFE00" + _MAHJONG + _VS16 +
+         _CLOUD + u"b" + _VS16)
+    start = len(u"a" + _CLOUD + _VS15 + u"\u2229\uFE00")
+    self.assertEqual([(1, 3, "text style"), (3, 5, "with serifs"),
+                      (start, start + len(_MAHJONG) + 1, "emoji style")],
+                     list(standardized_variants.FindVariants(s)))
+    self.assertEqual([], list(standardized_variants.FindVariants(u"")))
+
+  def testStrip(self):
+    self.assertEqual(u"a" + _CLOUD + _MAHJONG + u"b\uFE00",
+                     standardized_variants.StripPresentationSelectors(
+                         u"a" + _CLOUD + _VS15 + _MAHJONG + _VS16 + _VS16 +
+                         u"b\uFE00"))
+
+  def testAdd(self):
+    sv = standardized_variants
+    self.assertEqual(_CLOUD + _VS16 + u"a" + _MAHJONG + _VS16,
+                     sv.AddEmojiPresentation(_CLOUD + u"a" + _MAHJONG))
+    # Existing selectors are kept.
+    self.assertEqual(_CLOUD + _VS15 + _MAHJONG + _VS16,
+                     sv.AddEmojiPresentation(_CLOUD + _VS15 + _MAHJONG))
+    self.assertEqual(_CLOUD + _VS15 + u"a" + _MAHJONG + _VS15,
+                     sv.AddTextPresentation(_CLOUD + u"a" + _MAHJONG))
+
+  def testCanonicalize(self):
+    sv = standardized_variants
+    self.assertEqual(
+        _CLOUD + _VS15 + _CLOUD + _VS16 + u"\u2229a" + _CLOUD,
+        sv.CanonicalizePresentationSelectors(
+            _CLOUD + _VS15 + _VS15 +  # Repeated selector.
+            _CLOUD + _VS16 + _VS15 +  # Conflicting selectors: first wins.
+            u"\u2229" + _VS16 +  # Only other variation sequences.
+            u"a" + _VS16 +  # Not a base.
+            _VS16 + _CLOUD))  # Stray selector.
+
+
+if __name__ == "__main__":
+  unittest.main()
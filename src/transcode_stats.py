@@ -0,0 +1,125 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Counters for the lossiness of Emoji transcoding.
+
+A TranscodeStats object can be passed to the transcoders in transcoder.py.
+They count how each Emoji symbol was converted, per carrier:
+- round_trip: A round-trip (|0) mapping.
+- fallback: A fallback (|1) mapping, including from Google PUA code points.
+- one_way: A "good one-way" (|4) mapping from a text-style or
+  default-style variation sequence.
+- text_fallback: No mapping; the symbol was replaced by its text fallback.
+- unmappable: No mapping, and replaced by "?" or U+FFFD.
+- malformed: Malformed input bytes.
+
+The counts are kept in preallocated lists indexed by
+emoji4unicode.id_to_index, so that counting is a list item increment.
+Counts that do not belong to a symbol (for example, for a non-Emoji
+character without a mapping, or for a malformed byte)
+are at the NO_SYMBOL index.
+"""
+
+__author__ = "Markus Scherer"
+
+import emoji4unicode
+
+# Kinds of conversions, as indexes into a carrier's counts.
+ROUND_TRIP = 0
+FALLBACK = 1
+ONE_WAY = 2
+TEXT_FALLBACK = 3
+UNMAPPABLE = 4
+MALFORMED = 5
+
+KINDS = ("round_trip", "fallback", "one_way", "text_fallback",
+         "unmappable", "malformed")
+
+class TranscodeStats(object):
+  """Per-carrier, per-kind, per-symbol conversion counters.
+
+  Attributes:
+    NO_SYMBOL: Index for counts that do not belong to an Emoji symbol.
+  """
+  def __init__(self):
+    emoji4unicode.Load()
+    self.__symbol_ids = emoji4unicode.symbol_ids
+    self.NO_SYMBOL = len(self.__symbol_ids)
+    self.__carrier_counts = {}
+
+  def GetCounts(self, carrier):
+    """Returns the carrier's counts for a transcoder to increment.
+
+    Returns:
+      A list indexed by kind (ROUND_TRIP etc.) of lists indexed by
+      symbol index or NO_SYMBOL.
+    """
+    counts = self.__carrier_counts.get(carrier)
+    if not counts:
+      counts = self.__carrier_counts[carrier] = (
+          [[0] * (self.NO_SYMBOL + 1) for kind in KINDS])
+    return counts
+
+  def Reset(self):
+    """Sets all counts to zero."""
+    for counts in self.__carrier_counts.itervalues():
+      for kind_counts in counts:
+        kind_counts[:] = [0] * len(kind_counts)
+
+  def GetTotal(self, carrier, kind):
+    """Returns the sum of one kind of counts for the carrier."""
+    counts = self.__carrier_counts.get(carrier)
+    if not counts: return 0
+    return sum(counts[kind])
+
+  def AsDict(self):
+    """Returns the non-zero counts.
+
+    Returns:
+      A nested dict carrier -> kind name -> symbol ID -> count,
+      where the symbol ID is "" for counts that do not belong to a symbol.
+    """
+    result = {}
+    for (carrier, counts) in self.__carrier_counts.iteritems():
+      for (kind, kind_counts) in enumerate(counts):
+        for (index, count) in enumerate(kind_counts):
+          if not count: continue
+          symbol_id = self.__symbol_ids[index] if index < self.NO_SYMBOL else ""
+          carrier_dict = result.setdefault(carrier, {})
+          carrier_dict.setdefault(KINDS[kind], {})[symbol_id] = count
+    return result
+
+  def PrometheusText(self, name="emoji4unicode_transcode_total"):
+    """Returns the non-zero counts in the Prometheus text exposition format.
+
+    Args:
+      name: The metric name.
+
+    Returns:
+      A string with one line per non-zero counter, with carrier, kind and
+      symbol labels (symbol="" for counts that do not belong to a symbol).
+    """
+    lines = ["# HELP %s Emoji transcoding results by carrier, kind and symbol."
+             % name,
+             "# TYPE %s counter" % name]
+    as_dict = self.AsDict()
+    for carrier in sorted(as_dict):
+      for kind in KINDS:
+        kind_dict = as_dict[carrier].get(kind, {})
+        for symbol_id in sorted(kind_dict):
+          lines.append('%s{carrier="%s",kind="%s",symbol="%s"} %d' %
+                       (name, carrier, kind, symbol_id, kind_dict[symbol_id]))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import unittest
+import emoji4unicode
+import transcode_stats
+import transcoder
+import utf
+
+class TranscodeStatsTest(unittest.TestCase):
+  def setUp(self):
+    self.__stats = transcode_stats.TranscodeStats()
+
+  def testEncoderCounts(self):
+    encoder = transcoder.ShiftJisEncoder("docomo", self.__stats)
+    # e-000 sun: round trip from Unicode and from DoCoMo PUA,
+    # legacy fallback from Google PUA.
+    # e-009 sunrise over mountains: fallback to the DoCoMo sun.
+    # e-00B cityscape at dusk: text fallback.
+    # #-keycap: one-way from the sequence without U+FE0F.
+    # U+0E01 is not mappable.
+    s = (u"\u2600\ue63e" + utf.UTF.CodePointString(0xFE000) +
+         utf.UTF.CodePointString(0x1F304) + utf.UTF.CodePointString(0x1F306) +
+         u"#\u20e3#\ufe0f\u20e3\u0e01")
+    encoder.Convert(s, True)
+    encoder.EncodedLength(s)  # Does not count.
+    self.assertEqual(self.__stats.AsDict(),
+                     {"docomo": {"round_trip": {"000": 2, "82C": 1},
+                                 "fallback": {"000": 1, "009": 1},
+                                 "one_way": {"82C": 1},
+                                 "text_fallback": {"00B": 1},
+                                 "unmappable": {"": 1}}})
+
+  def testDecoderCounts(self):
+    decoder = transcoder.ShiftJisDecoder("docomo", self.__stats)
+    # DoCoMo sun, unassigned DoCoMo code, unassigned Shift-JIS code,
+    # malformed byte.
+    decoder.Convert("\xf8\x9f\xf8\x40\x85\x40\xff", True)
+    self.assertEqual(self.__stats.AsDict(),
+                     {"docomo": {"round_trip": {"000": 1},
+                                 "unmappable": {"": 2},
+                                 "malformed": {"": 1}}})
+    self.assertEqual(self.__stats.GetTotal("docomo",
+                                           transcode_stats.UNMAPPABLE), 2)
+    self.__stats.Reset()
+    self.assertEqual(self.__stats.AsDict(), {})
+
+  def testPrometheusText(self):
+    decoder = transcoder.GooglePUADecoder(self.__stats)
+    decoder.Convert(utf.UTF.CodePointString(0xFE000) * 3, True)
+    self.assertEqual(
+        self.__stats.PrometheusText("e4u_total"),
+        "# HELP e4u_total Emoji transcoding results by carrier, kind and "
+        "symbol.\n"
+        "# TYPE e4u_total counter\n"
+        'e4u_total{carrier="google",kind="round_trip",symbol="000"} 3\n')
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,716 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental conversion of text with Emoji symbols.
+
+Transcoders convert between Unicode and
+- a carrier's Shift-JIS (the Windows-932 charset plus the carrier's Emoji
+  symbols in the user-defined area),
+- a carrier's ISO-2022-JP (JIS X 0208 plus Emoji symbols in unassigned rows),
+- Google PUA code points (Unicode strings with U+FE000..U+FEFFF).
+They use the same mappings as the .ucm files from gen_conversion_files.py:
+Emoji symbols are decoded to standard Unicode (or to Google PUA code points
+for symbols that are not in Unicode),
+and encoded with round-trip or fallback mappings.
+
+Each transcoder is stateful: Convert() may be called with any piece of the
+input, and it holds back an incomplete character, escape sequence or
+Emoji sequence at the end of the piece until the next one is available.
+The last call must pass final=True.
+
+IterConvert() and the Reader and Writer classes run a transcoder over a
+sequence of chunks or over a file-like stream, converting at most a bounded
+amount of input per step. A cooperative scheduler (for example, an event loop
+that drives generators) can run other work between the steps instead of
+blocking on a large message.
+"""
+
+__author__ = "Markus Scherer"
+
+import binascii
+import copy
+import re
+import emoji4unicode
+import emoji_matcher
+import transcode_stats
+import utf
+
+# Default maximum number of input bytes or characters per conversion step.
+_CHUNK_SIZE = 8192
+
+# For malformed input and for codes without a mapping.
+_REPLACEMENT_CHAR = u"\ufffd"
+
+# For Emoji symbols without a carrier mapping nor a text fallback.
+_GETA_MARK = u"\u3013"
+
+def _ByteClass(byte_values):
+  """Returns a regular expression character class string for the bytes."""
+  return "[%s]" % "".join(["\\x%02x" % b for b in sorted(byte_values)])
+
+
+def _CodePointsString(cp_list):
+  return u"".join([utf.UTF.CodePointString(cp) for cp in cp_list])
+
+
+class _CarrierTables(object):
+  """One carrier's Emoji conversion tables for Shift-JIS or JIS.
+
+  Shared by all of the carrier's transcoders for that charset.
+
+  Attributes:
+    codes_to_unicode: Map from a 2-byte carrier code to the Unicode string
+      for its Emoji symbol. (JIS codes are stored as 7-bit byte pairs.)
+    codes_to_indexes: Map from a 2-byte carrier code to the
+      emoji4unicode.id_to_index value of its Emoji symbol.
+    ids_to_codes: Map from a symbol ID to the carrier bytes for the symbol,
+      for round-trip and fallback mappings.
+    ids_to_text_fallbacks: Map from a symbol ID to the encoded text fallback
+      (or geta mark) for each symbol that is not in ids_to_codes.
+      The encoded text starts and ends in the initial (ASCII) state.
+    lead_bytes: frozenset of the lead byte values of the carrier's codes.
+  """
+  def __init__(self, carrier, for_sjis):
+    emoji4unicode.Load()
+    one_carrier_data = emoji4unicode.all_carrier_data[carrier]
+    self.codes_to_unicode = {}
+    self.codes_to_indexes = {}
+    self.ids_to_codes = {}
+    for (cp_list, symbol) in emoji4unicode.GetSymbolsSortedByUnicode():
+      code = symbol.GetCarrierUnicode(carrier)
+      if not code: continue
+      is_round_trip = not code.startswith(">")
+      if not is_round_trip: code = code[1:]
+      carrier_bytes = ""
+      for one_code in code.split("+"):
+        carrier_symbol = one_carrier_data.SymbolFromUnicode(one_code)
+        if for_sjis:
+          hex_code = carrier_symbol.shift_jis
+        else:
+          hex_code = carrier_symbol.jis
+        if not hex_code:
+          carrier_bytes = ""
+          break
+        carrier_bytes += binascii.unhexlify(hex_code.replace("+", ""))
+      if not carrier_bytes: continue
+      self.ids_to_codes[symbol.id] = carrier_bytes
+      if is_round_trip:
+        if symbol.UnicodeHasVariationSequence() and len(cp_list) >= 2:
+          # Same as the round-trip mapping in the .ucm files.
+          cp_list.insert(1, 0xfe0f)
+        self.codes_to_unicode[carrier_bytes] = _CodePointsString(cp_list)
+        self.codes_to_indexes[carrier_bytes] = (
+            emoji4unicode.id_to_index[symbol.id])
+    if not self.codes_to_unicode:
+      raise ValueError("no %s data for %s" %
+                       ("Shift-JIS" if for_sjis else "JIS", carrier))
+    self.lead_bytes = frozenset([ord(code[0])
+                                 for code in self.codes_to_unicode])
+    # Same text as in the gen_html.py carrier table cells.
+    # Encoded once here so that substituting one is a single lookup.
+    codec = "cp932" if for_sjis else "iso2022_jp"
+    self.ids_to_text_fallbacks = {}
+    for symbol in emoji4unicode.GetSymbols():
+      if symbol.id in self.ids_to_codes: continue
+      text_fallback = symbol.GetTextFallback() or _GETA_MARK
+      try:
+        encoded = text_fallback.encode(codec)
+      except UnicodeError:
+        encoded = _GETA_MARK.encode(codec)
+      self.ids_to_text_fallbacks[symbol.id] = encoded
+
+
+_tables = {}
+
+def _GetTables(carrier, for_sjis):
+  tables = _tables.get((carrier, for_sjis))
+  if not tables:
+    tables = _tables[(carrier, for_sjis)] = _CarrierTables(carrier, for_sjis)
+  return tables
+
+
+_matchers = {}
+
+def _GetMatcher(pua_carriers, include_unicode=True):
+  matcher = _matchers.get((pua_carriers, include_unicode))
+  if not matcher:
+    matcher = emoji_matcher.Matcher(pua_carriers, include_unicode)
+    _matchers[(pua_carriers, include_unicode)] = matcher
+  return matcher
+
+
+class _Transcoder(object):
+  """Base class for transcoders.
+
+  Attributes:
+    input_type: str or unicode
+    output_type: str or unicode
+  """
+  _counts = None
+  _no_symbol = None
+
+  def _SetStats(self, carrier, stats):
+    """Makes this transcoder count its conversions in the TranscodeStats
+    object, if it is not None."""
+    if stats:
+      self._counts = stats.GetCounts(carrier)
+      self._no_symbol = stats.NO_SYMBOL
+
+  def _CountReplacements(self, kind, decoded):
+    """Counts the U+FFFD characters in the decoded text."""
+    self._counts[kind][self._no_symbol] += decoded.count(_REPLACEMENT_CHAR)
+
+  def Convert(self, data, final=False):
+    """Converts the next piece of the input.
+
+    Args:
+      data: The next piece of the input (a str or unicode string,
+        depending on the transcoder).
+      final: True if this is the last piece of the input.
+
+    Returns:
+      The output for as much of the input as could be converted.
+    """
+    raise NotImplementedError
+
+  def Reset(self):
+    """Discards held-back input and resets the conversion state.
+
+    Does not reset the counts in a TranscodeStats object.
+    """
+    raise NotImplementedError
+
+
+class ShiftJisDecoder(_Transcoder):
+  """Converts a carrier's Shift-JIS bytes to Unicode."""
+  input_type = str
+  output_type = unicode
+
+  def __init__(self, carrier, stats=None):
+    """Args:
+      carrier: "docomo", "kddi" or "softbank"
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    tables = _GetTables(carrier, True)
+    self._codes_to_unicode = tables.codes_to_unicode
+    self._codes_to_indexes = tables.codes_to_indexes
+    self._SetStats(carrier, stats)
+    text_lead_bytes = (set(range(0x81, 0xa0) + range(0xe0, 0xfd)) -
+                       tables.lead_bytes)
+    # Tokens:
+    # 1. Run of single bytes and double-byte codes without Emoji lead bytes.
+    # 2. Code with an Emoji lead byte.
+    # 3. Lead byte at the end of the piece of input.
+    # Any other byte is malformed.
+    self._token_re = re.compile(
+        "((?:[\\x00-\\x7f\\xa1-\\xdf]|%s[\\x40-\\x7e\\x80-\\xfc])+)|"
+        "(%s[\\x40-\\x7e\\x80-\\xfc])|"
+        "([\\x81-\\x9f\\xe0-\\xfc]\\Z)|." %
+        (_ByteClass(text_lead_bytes), _ByteClass(tables.lead_bytes)),
+        re.DOTALL)
+    self._pending = ""
+
+  def Reset(self):
+    self._pending = ""
+
+  def Convert(self, data, final=False):
+    if self._pending:
+      data = self._pending + data
+      self._pending = ""
+    codes_to_unicode = self._codes_to_unicode
+    counts = self._counts
+    if counts:
+      round_trip_counts = counts[transcode_stats.ROUND_TRIP]
+      codes_to_indexes = self._codes_to_indexes
+    out = []
+    for match in self._token_re.finditer(data):
+      (text, code, lead) = match.groups()
+      if text:
+        decoded = text.decode("cp932", "replace")
+        if counts and _REPLACEMENT_CHAR in decoded:
+          self._CountReplacements(transcode_stats.UNMAPPABLE, decoded)
+        out.append(decoded)
+      elif code:
+        uni = codes_to_unicode.get(code)
+        if uni:
+          if counts: round_trip_counts[codes_to_indexes[code]] += 1
+          out.append(uni)
+        else:
+          if counts: counts[transcode_stats.UNMAPPABLE][self._no_symbol] += 1
+          out.append(_REPLACEMENT_CHAR)
+      elif lead and not final:
+        self._pending = lead
+      else:
+        if counts: counts[transcode_stats.MALFORMED][self._no_symbol] += 1
+        out.append(_REPLACEMENT_CHAR)
+    return u"".join(out)
+
+
+_ESC_TO_ASCII = "\x1b(B"
+_ESC_TO_JIS_X_0208 = "\x1b$B"
+
+class JisDecoder(_Transcoder):
+  """Converts a carrier's ISO-2022-JP bytes to Unicode."""
+  input_type = str
+  output_type = unicode
+
+  # Tokens:
+  # 1. Supported escape sequence.
+  # 2. Beginning of an escape sequence at the end of the piece of input.
+  # 3. Run of other bytes, interpreted according to the current mode.
+  # A lone ESC is malformed.
+  _token_re = re.compile("(\x1b(?:\\(B|\\(J|\\$@|\\$B))|"
+                         "(\x1b[\\(\\$]?\\Z)|"
+                         "([^\x1b]+)|\x1b")
+
+  def __init__(self, carrier, stats=None):
+    """Args:
+      carrier: "docomo" or "kddi"
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    tables = _GetTables(carrier, False)
+    self._codes_to_unicode = tables.codes_to_unicode
+    self._codes_to_indexes = tables.codes_to_indexes
+    self._SetStats(carrier, stats)
+    text_lead_bytes = set(range(0x21, 0x7f)) - tables.lead_bytes
+    # Tokens in a double-byte mode:
+    # 1. Run of codes without Emoji lead bytes.
+    # 2. Code with an Emoji lead byte.
+    # 3. Half a code at the end of the run.
+    # Any other byte (e.g., a line feed) is treated as a single byte.
+    self._pair_re = re.compile(
+        "((?:%s[\\x21-\\x7e])+)|(%s[\\x21-\\x7e])|([\\x21-\\x7e]\\Z)|." %
+        (_ByteClass(text_lead_bytes), _ByteClass(tables.lead_bytes)),
+        re.DOTALL)
+    self.Reset()
+
+  def Reset(self):
+    self._pending = ""
+    self._escape = _ESC_TO_ASCII  # The escape sequence for the current mode.
+
+  def Convert(self, data, final=False):
+    if self._pending:
+      data = self._pending + data
+      self._pending = ""
+    counts = self._counts
+    out = []
+    for match in self._token_re.finditer(data):
+      (escape, partial_escape, run) = match.groups()
+      if escape:
+        self._escape = escape
+      elif partial_escape and not final:
+        self._pending = partial_escape
+      elif run:
+        if self._escape[1] == "$":
+          self._ConvertPairs(run, out, final or match.end() < len(data))
+        else:
+          # Only 8-bit bytes are replaced in the single-byte modes.
+          decoded = (self._escape + run).decode("iso2022_jp", "replace")
+          if counts and _REPLACEMENT_CHAR in decoded:
+            self._CountReplacements(transcode_stats.MALFORMED, decoded)
+          out.append(decoded)
+      else:
+        if counts: counts[transcode_stats.MALFORMED][self._no_symbol] += 1
+        out.append(_REPLACEMENT_CHAR)
+    return u"".join(out)
+
+  def _ConvertPairs(self, run, out, is_complete):
+    """Converts a run of bytes in a double-byte mode."""
+    codes_to_unicode = self._codes_to_unicode
+    counts = self._counts
+    if counts:
+      round_trip_counts = counts[transcode_stats.ROUND_TRIP]
+      codes_to_indexes = self._codes_to_indexes
+    for match in self._pair_re.finditer(run):
+      (text, code, half) = match.groups()
+      if text:
+        decoded = (self._escape + text).decode("iso2022_jp", "replace")
+        if counts and _REPLACEMENT_CHAR in decoded:
+          self._CountReplacements(transcode_stats.UNMAPPABLE, decoded)
+        out.append(decoded)
+      elif code:
+        uni = codes_to_unicode.get(code)
+        if uni:
+          if counts: round_trip_counts[codes_to_indexes[code]] += 1
+          out.append(uni)
+        else:
+          if counts: counts[transcode_stats.UNMAPPABLE][self._no_symbol] += 1
+          out.append(_REPLACEMENT_CHAR)
+      elif half and not is_complete:
+        self._pending = half
+      else:
+        c = match.group()
+        if c < "\x80":
+          out.append(unicode(c))
+        else:
+          if counts: counts[transcode_stats.MALFORMED][self._no_symbol] += 1
+          out.append(_REPLACEMENT_CHAR)
+
+
+class _LengthCounter(object):
+  """Stands in for an output list, and only adds up the lengths."""
+  def __init__(self):
+    self.length = 0
+
+  def append(self, piece):
+    self.length += len(piece)
+
+
+class _UnicodeInputTranscoder(_Transcoder):
+  """Base class for transcoders with Unicode string input.
+
+  Subclasses set _matcher and implement _AppendText() and _AppendSymbol().
+  """
+  input_type = unicode
+  output_type = str
+
+  def __init__(self):
+    self._pending = u""
+
+  def Reset(self):
+    self._pending = u""
+
+  def Convert(self, s, final=False):
+    if self._pending:
+      s = self._pending + s
+      self._pending = u""
+    if not final:
+      partial_length = self._matcher.PartialEmojiLength(s)
+      if partial_length:
+        self._pending = s[-partial_length:]
+        s = s[:-partial_length]
+    out = []
+    self._AppendAll(out, s, final)
+    return self.output_type().join(out)
+
+  def EncodedLength(self, s):
+    """Returns the exact length of the output for the complete string s,
+    as for Convert(s, True) after Reset(), without building the output.
+
+    Does not modify this transcoder's state, and does not count
+    in its TranscodeStats.
+    """
+    counter = _LengthCounter()
+    transcoder = copy.copy(self)
+    transcoder._counts = None
+    transcoder.Reset()
+    transcoder._AppendAll(counter, s, True)
+    return counter.length
+
+  def _AppendAll(self, out, s, final):
+    prev_end = 0
+    for (start, end, symbol_id) in self._matcher.FindEmoji(s):
+      if prev_end < start: self._AppendText(out, s[prev_end:start])
+      self._AppendSymbol(out, symbol_id, s[start:end])
+      prev_end = end
+    if prev_end < len(s): self._AppendText(out, s[prev_end:])
+    if final: self._Finish(out)
+
+  def _Finish(self, out):
+    """Appends the output for the end of the input."""
+    pass
+
+
+def _Encode(text, codec, counts, no_symbol):
+  """Encodes the text with "?" for unmappable characters.
+
+  If counts is not None, then the unmappable characters are counted.
+  """
+  if counts:
+    try:
+      return text.encode(codec)
+    except UnicodeEncodeError:
+      for c in text:
+        try:
+          c.encode(codec)
+        except UnicodeEncodeError:
+          counts[transcode_stats.UNMAPPABLE][no_symbol] += 1
+  return text.encode(codec, "replace")
+
+
+class _CarrierEncoder(_UnicodeInputTranscoder):
+  """Base class for encoders to a carrier's Shift-JIS or JIS."""
+  def __init__(self, carrier, for_sjis, stats):
+    _UnicodeInputTranscoder.__init__(self)
+    self._carrier = carrier
+    self._tables = _GetTables(carrier, for_sjis)
+    self._matcher = _GetMatcher(("google", carrier))
+    self._SetStats(carrier, stats)
+    self._kinds = {}  # Cache from an Emoji string to its kind of conversion.
+
+  def _CountSymbol(self, symbol_id, s):
+    kind = self._kinds.get(s)
+    if kind is None: kind = self._kinds[s] = self._GetKind(symbol_id, s)
+    self._counts[kind][emoji4unicode.id_to_index[symbol_id]] += 1
+
+  def _GetKind(self, symbol_id, s):
+    """Returns the kind of conversion for the Emoji string s,
+    with the same precision as in the .ucm files."""
+    if symbol_id not in self._tables.ids_to_codes:
+      return transcode_stats.TEXT_FALLBACK
+    symbol = emoji4unicode.id_to_symbol[symbol_id]
+    if symbol.GetCarrierUnicode(self._carrier).startswith(">"):
+      return transcode_stats.FALLBACK
+    google_uni = symbol.GetCarrierUnicode("google")
+    if google_uni and s == utf.UTF.CodePointString(int(google_uni, 16)):
+      # Legacy fallback from a Google PUA code point.
+      return transcode_stats.FALLBACK
+    uni = symbol.GetUnicode()
+    if uni and "+" in uni and symbol.UnicodeHasVariationSequence():
+      cp_list = [int(code, 16) for code in uni.split("+")]
+      if (s == _CodePointsString(cp_list) or
+          s == _CodePointsString(cp_list[:1] + [0xfe0e] + cp_list[1:])):
+        return transcode_stats.ONE_WAY
+    return transcode_stats.ROUND_TRIP
+
+
+class ShiftJisEncoder(_CarrierEncoder):
+  """Converts Unicode to a carrier's Shift-JIS bytes.
+
+  Emoji symbols are recognized in standard Unicode, as Google PUA code points
+  and as the carrier's own PUA code points.
+  Emoji symbols without a carrier mapping are converted to their text
+  fallbacks, and other characters without a mapping are converted to "?".
+  """
+  def __init__(self, carrier, stats=None):
+    """Args:
+      carrier: "docomo", "kddi" or "softbank"
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    _CarrierEncoder.__init__(self, carrier, True, stats)
+    # Every symbol ID maps to either its carrier code or its text fallback.
+    self._ids_to_bytes = dict(self._tables.ids_to_text_fallbacks)
+    self._ids_to_bytes.update(self._tables.ids_to_codes)
+
+  def _AppendText(self, out, text):
+    out.append(_Encode(text, "cp932", self._counts, self._no_symbol))
+
+  def _AppendSymbol(self, out, symbol_id, s):
+    if self._counts: self._CountSymbol(symbol_id, s)
+    out.append(self._ids_to_bytes[symbol_id])
+
+
+class JisEncoder(_CarrierEncoder):
+  """Converts Unicode to a carrier's ISO-2022-JP bytes.
+
+  Emoji symbols are recognized in standard Unicode, as Google PUA code points
+  and as the carrier's own PUA code points.
+  Emoji symbols without a carrier mapping are converted to their text
+  fallbacks, and other characters without a mapping are converted to "?".
+  """
+  def __init__(self, carrier, stats=None):
+    """Args:
+      carrier: "docomo" or "kddi"
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    _CarrierEncoder.__init__(self, carrier, False, stats)
+    self._ids_to_codes = self._tables.ids_to_codes
+    self._ids_to_text_fallbacks = self._tables.ids_to_text_fallbacks
+    self._is_double_byte_mode = False
+
+  def Reset(self):
+    _CarrierEncoder.Reset(self)
+    self._is_double_byte_mode = False
+
+  def _AppendText(self, out, text):
+    self._AppendEncodedText(
+        out, _Encode(text, "iso2022_jp", self._counts, self._no_symbol))
+
+  def _AppendEncodedText(self, out, encoded):
+    # The iso2022_jp codec starts and ends in ASCII mode.
+    if self._is_double_byte_mode:
+      if encoded.startswith(_ESC_TO_JIS_X_0208):
+        encoded = encoded[len(_ESC_TO_JIS_X_0208):]
+      else:
+        out.append(_ESC_TO_ASCII)
+      self._is_double_byte_mode = False
+    out.append(encoded)
+
+  def _AppendSymbol(self, out, symbol_id, s):
+    if self._counts: self._CountSymbol(symbol_id, s)
+    code = self._ids_to_codes.get(symbol_id)
+    if code:
+      if not self._is_double_byte_mode:
+        out.append(_ESC_TO_JIS_X_0208)
+        self._is_double_byte_mode = True
+      out.append(code)
+    else:
+      self._AppendEncodedText(out, self._ids_to_text_fallbacks[symbol_id])
+
+  def _Finish(self, out):
+    if self._is_double_byte_mode:
+      out.append(_ESC_TO_ASCII)
+      self._is_double_byte_mode = False
+
+
+class GooglePUADecoder(_UnicodeInputTranscoder):
+  """Converts Google PUA code points to standard Unicode.
+
+  Google PUA code points for symbols that are not in Unicode,
+  and all other characters, are copied unchanged.
+  With a TranscodeStats object, the former are counted as unmappable.
+  """
+  output_type = unicode
+
+  def __init__(self, stats=None):
+    """Args:
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    _UnicodeInputTranscoder.__init__(self)
+    self._matcher = _GetMatcher(("google",), False)
+    self._SetStats("google", stats)
+
+  def _AppendText(self, out, text):
+    out.append(text)
+
+  def _AppendSymbol(self, out, symbol_id, s):
+    symbol = emoji4unicode.id_to_symbol[symbol_id]
+    uni = symbol.GetUnicode()
+    if not uni and symbol.in_proposal: uni = symbol.GetProposedUnicode()
+    if uni:
+      kind = transcode_stats.ROUND_TRIP
+      out.append(u"".join([utf.UTF.CodePointString(int(code, 16))
+                           for code in uni.split("+")]))
+    else:
+      kind = transcode_stats.UNMAPPABLE
+      out.append(s)
+    if self._counts:
+      self._counts[kind][emoji4unicode.id_to_index[symbol_id]] += 1
+
+
+class GooglePUAEncoder(_UnicodeInputTranscoder):
+  """Converts standard Unicode Emoji symbols to Google PUA code points.
+
+  Symbols without a round-trip Google PUA mapping,
+  and all other characters, are copied unchanged.
+  With a TranscodeStats object, the former are counted as unmappable.
+  """
+  output_type = unicode
+
+  def __init__(self, stats=None):
+    """Args:
+      stats: Optional transcode_stats.TranscodeStats object.
+    """
+    _UnicodeInputTranscoder.__init__(self)
+    self._matcher = _GetMatcher((), True)
+    self._SetStats("google", stats)
+
+  def _AppendText(self, out, text):
+    out.append(text)
+
+  def _AppendSymbol(self, out, symbol_id, s):
+    google_uni = emoji4unicode.id_to_symbol[symbol_id].GetCarrierUnicode(
+        "google")
+    if google_uni and not google_uni.startswith(">"):
+      kind = transcode_stats.ROUND_TRIP
+      out.append(utf.UTF.CodePointString(int(google_uni, 16)))
+    else:
+      kind = transcode_stats.UNMAPPABLE
+      out.append(s)
+    if self._counts:
+      self._counts[kind][emoji4unicode.id_to_index[symbol_id]] += 1
+
+
+def IterConvert(transcoder, chunks, max_chunk_size=_CHUNK_SIZE):
+  """Converts a sequence of input chunks step by step.
+
+  Input chunks are pulled only as output is consumed, and each step converts
+  at most max_chunk_size bytes or characters, so that a slow consumer is never
+  flooded and a single large chunk does not block a cooperative scheduler.
+
+  Args:
+    transcoder: A transcoder instance; it is Reset() first.
+    chunks: Iterable of input pieces.
+    max_chunk_size: Maximum number of input bytes or characters per step.
+
+  Yields:
+    Pieces of output. Some steps may yield empty strings.
+  """
+  transcoder.Reset()
+  for chunk in chunks:
+    for start in xrange(0, len(chunk), max_chunk_size):
+      yield transcoder.Convert(chunk[start:start + max_chunk_size])
+  yield transcoder.Convert(transcoder.input_type(), True)
+
+
+class Reader(object):
+  """File-like object which converts data read from another stream."""
+  def __init__(self, stream, transcoder, chunk_size=_CHUNK_SIZE):
+    """Args:
+      stream: File-like object with a read(size) method.
+      transcoder: A transcoder instance; it is Reset() first.
+      chunk_size: Number of input bytes or characters per read from the stream.
+    """
+    self.__stream = stream
+    self.__transcoder = transcoder
+    self.__chunk_size = chunk_size
+    self.__at_end = False
+    transcoder.Reset()
+
+  def read(self, size=-1):
+    """Reads and converts input.
+
+    Args:
+      size: If negative, then all of the remaining input is converted.
+        Otherwise pieces of this many bytes or characters are read from the
+        stream until there is some output.
+
+    Returns:
+      The output, which is empty only at the end of the input.
+    """
+    transcoder = self.__transcoder
+    if size == 0: return transcoder.output_type()
+    pieces = []
+    while not self.__at_end:
+      data = self.__stream.read(size if size > 0 else self.__chunk_size)
+      self.__at_end = not data
+      piece = transcoder.Convert(data, self.__at_end)
+      if piece: pieces.append(piece)
+      if size > 0 and pieces: break
+    return transcoder.output_type().join(pieces)
+
+  def __iter__(self):
+    while True:
+      piece = self.read(self.__chunk_size)
+      if not piece: return
+      yield piece
+
+  def close(self):
+    self.__stream.close()
+
+
+class Writer(object):
+  """File-like object which converts data before writing it to another stream.
+  """
+  def __init__(self, stream, transcoder):
+    """Args:
+      stream: File-like object with write() and close() methods.
+      transcoder: A transcoder instance; it is Reset() first.
+    """
+    self.__stream = stream
+    self.__transcoder = transcoder
+    transcoder.Reset()
+
+  def write(self, data):
+    output = self.__transcoder.Convert(data)
+    if output: self.__stream.write(output)
+
+  def close(self):
+    """Writes the output for the held-back end of the input,
+    and closes the stream."""
+    output = self.__transcoder.Convert(self.__transcoder.input_type(), True)
+    if output: self.__stream.write(output)
+    self.__stream.close()
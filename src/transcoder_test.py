@@ -0,0 +1,130 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import StringIO
+import unittest
+import transcoder
+import utf
+
+_GOOGLE_SUN = utf.UTF.CodePointString(0xFE000)
+
+def _ConvertBytewise(one_transcoder, data):
+  """Converts the data one byte or character at a time."""
+  return one_transcoder.output_type().join(
+      transcoder.IterConvert(one_transcoder, [data], 1))
+
+
+class ShiftJisTest(unittest.TestCase):
+  def testDecode(self):
+    decoder = transcoder.ShiftJisDecoder("docomo")
+    # "a", DoCoMo sun F89F, Hiragana A 82A0, DoCoMo hash key F985.
+    data = "a\xf8\x9f\x82\xa0\xf9\x85"
+    expected = u"a\u2600\u3042#\ufe0f\u20e3"
+    self.assertEqual(decoder.Convert(data, True), expected)
+    self.assertEqual(_ConvertBytewise(decoder, data), expected)
+    # Malformed and truncated input.
+    self.assertEqual(decoder.Convert("\x82\x20\xff\x82", True),
+                     u"\ufffd \ufffd\ufffd")
+
+  def testEncode(self):
+    encoder = transcoder.ShiftJisEncoder("docomo")
+    # Standard Unicode, Google PUA, DoCoMo PUA, a fallback (e-009 sunrise
+    # over mountains -> DoCoMo sun) and a non-Emoji character without
+    # a mapping.
+    s = (u"a\u2600" + _GOOGLE_SUN + u"\ue63e" +
+         utf.UTF.CodePointString(0x1F304) + u"\u0e01")
+    self.assertEqual(encoder.Convert(s, True),
+                     "a\xf8\x9f\xf8\x9f\xf8\x9f\xf8\x9f?")
+    # The keycap sequence is recognized across conversion steps.
+    s = u"#\u20e3#"
+    self.assertEqual(encoder.Convert(s, True), "\xf9\x85#")
+    self.assertEqual(_ConvertBytewise(encoder, s), "\xf9\x85#")
+
+  def testTextFallback(self):
+    encoder = transcoder.ShiftJisEncoder("docomo")
+    # e-00B cityscape at dusk has the text fallback [\u5915\u713c\u3051].
+    # e-B4C U+2003 em space has none; it becomes the geta mark U+3013.
+    s = utf.UTF.CodePointString(0x1F306) + u"\u2003"
+    self.assertEqual(encoder.Convert(s, True),
+                     "[\x97[\x8f\xc4\x82\xaf]\x81\xac")
+
+  def testEncodedLength(self):
+    encoder = transcoder.ShiftJisEncoder("docomo")
+    for s in (u"", u"a\u2600\u3042\u0e01", u"#\u20e3#",
+              utf.UTF.CodePointString(0x1F306) + u"\u2003"):
+      self.assertEqual(encoder.EncodedLength(s),
+                       len(encoder.Convert(s, True)))
+
+
+class JisTest(unittest.TestCase):
+  def testDecode(self):
+    decoder = transcoder.JisDecoder("docomo")
+    data = "\x1b$BuA$\"\x1b(Ba"
+    self.assertEqual(decoder.Convert(data, True), u"\u2600\u3042a")
+    self.assertEqual(_ConvertBytewise(decoder, data), u"\u2600\u3042a")
+
+  def testEncode(self):
+    encoder = transcoder.JisEncoder("docomo")
+    s = u"a\u2600\u3042b\u2600"
+    expected = "a\x1b$BuA$\"\x1b(Bb\x1b$BuA\x1b(B"
+    self.assertEqual(encoder.Convert(s, True), expected)
+    self.assertEqual(_ConvertBytewise(encoder, s), expected)
+    self.assertEqual(encoder.EncodedLength(s), len(expected))
+
+  def testTextFallback(self):
+    encoder = transcoder.JisEncoder("docomo")
+    # The text fallback continues in the double-byte mode after the sun.
+    s = u"\u2600" + utf.UTF.CodePointString(0x1F306)
+    expected = "\x1b$BuA\x1b(B[\x1b$BM<>F$1\x1b(B]"
+    self.assertEqual(encoder.Convert(s, True), expected)
+    self.assertEqual(encoder.EncodedLength(s), len(expected))
+
+  def testNoSoftbankJis(self):
+    self.assertRaises(ValueError, transcoder.JisDecoder, "softbank")
+
+
+class GooglePUATest(unittest.TestCase):
+  def testDecode(self):
+    decoder = transcoder.GooglePUADecoder()
+    self.assertEqual(decoder.Convert(u"x" + _GOOGLE_SUN, True), u"x\u2600")
+
+  def testEncode(self):
+    encoder = transcoder.GooglePUAEncoder()
+    self.assertEqual(encoder.Convert(u"x\u2600\ufe0f", True),
+                     u"x" + _GOOGLE_SUN)
+
+
+class StreamTest(unittest.TestCase):
+  def testReader(self):
+    stream = StringIO.StringIO("a\xf8\x9f" * 1000)
+    reader = transcoder.Reader(stream, transcoder.ShiftJisDecoder("docomo"),
+                               chunk_size=7)
+    self.assertEqual(u"".join(reader), u"a\u2600" * 1000)
+
+  def testWriter(self):
+    stream = StringIO.StringIO()
+    stream.close = lambda: None
+    writer = transcoder.Writer(stream, transcoder.ShiftJisEncoder("docomo"))
+    writer.write(u"a#")
+    writer.write(u"\u20e3")
+    writer.close()
+    self.assertEqual(stream.getvalue(), "a\xf9\x85")
+
+
+if __name__ == "__main__":
+  unittest.main()
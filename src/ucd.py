@@ -0,0 +1,177 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared parsing for Unicode Character Database (UCD) files.
+
+Each file is read in one go, and its data lines are found and split into
+fields without a per-line Python loop over comments and blank lines.
+Loaders compile the fields into compact data, which is cached in
+generated/.ucd_cache, keyed by the SHA-1 hash of the file contents,
+so that the next process loads the compiled data instead of parsing again.
+
+Property values are stored as RangeMap objects: sorted, non-overlapping
+code point ranges with values, searched with bisect.
+
+For example, a loader for the Emoji property in an emoji-data.txt file:
+  ranges = ucd.LoadCached(filename, "emoji-data", 1,
+                          lambda contents: ucd.ParseRanges(contents, 1))
+  emoji = ucd.RangeMap(ranges)
+"""
+
+__author__ = "Markus Scherer"
+
+import bisect
+import hashlib
+import marshal
+import os
+import os.path
+import re
+
+# TODO(mscherer): Add argument for root data folder path.
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), "..", "data", "unicode")
+
+_cache_folder = os.path.join(os.path.dirname(__file__),
+                             "..", "generated", ".ucd_cache")
+
+# Data lines: Not empty, not only a comment.
+_data_line_re = re.compile(r"^[ \t]*([^#\s][^#\r\n]*)", re.MULTILINE)
+
+def DataFilename(basename):
+  """Returns the path of a UCD file like "UnicodeData.txt" in the data folder."""
+  return os.path.join(DATA_FOLDER, basename)
+
+
+def ReadFile(filename):
+  """Returns the contents of the file as a byte str."""
+  with open(filename, "rb") as file:
+    return file.read()
+
+
+def ParseFields(contents):
+  """Splits the data lines of UCD file contents into fields.
+
+  Comments and empty lines are skipped, and the fields are stripped.
+
+  Returns:
+    List of field lists, one per data line.
+  """
+  return [[field.strip() for field in line.split(";")]
+          for line in _data_line_re.findall(contents)]
+
+
+def ParseRange(field):
+  """Turns "0041" or "3400..4DB5" into a (start, end) pair of integers."""
+  limits = field.split("..")
+  start = int(limits[0], 16)
+  if len(limits) == 1: return (start, start)
+  return (start, int(limits[1], 16))
+
+
+def ParseCodePoints(field):
+  """Turns a sequence like "2601 FE0F" into a list of integers."""
+  return [int(code, 16) for code in field.split()]
+
+
+def ParseRanges(contents, value_field=1):
+  """Returns the sorted (start, end, value) triples of a property file
+  with a code point or range in the first field, like DerivedAge.txt."""
+  ranges = [ParseRange(fields[0]) + (fields[value_field],)
+            for fields in ParseFields(contents)]
+  ranges.sort()
+  return ranges
+
+
+def LoadCached(filename, name, version, build):
+  """Returns the data compiled from a UCD file, from the cache if possible.
+
+  Args:
+    filename: The UCD file.
+    name: Unique name of the compiled data, used as the cache filename.
+    version: Version of the compiled data format. A cache entry with
+        another version is rebuilt.
+    build: Function that takes the file contents and returns the compiled
+        data. The data must be serializable with the marshal module:
+        Numbers, strings, and tuples, lists and dicts of these.
+
+  Returns:
+    The compiled data.
+  """
+  contents = ReadFile(filename)
+  key = (hashlib.sha1(contents).hexdigest(), version)
+  cache_filename = os.path.join(_cache_folder, name + ".marshal")
+  try:
+    with open(cache_filename, "rb") as file:
+      (cache_key, data) = marshal.load(file)
+    if cache_key == key: return data
+  except (IOError, EOFError, ValueError, TypeError):
+    pass  # No cache yet, or an unreadable one.
+  data = build(contents)
+  try:
+    if not os.path.isdir(_cache_folder): os.makedirs(_cache_folder)
+    # Write and rename so that a concurrent reader never sees a partial file.
+    temp_filename = "%s.%d" % (cache_filename, os.getpid())
+    with open(temp_filename, "wb") as file:
+      marshal.dump((key, data), file)
+    os.rename(temp_filename, cache_filename)
+  except (IOError, OSError):
+    pass  # The cache is optional.
+  return data
+
+
+class RangeMap(object):
+  """Maps code points to values via sorted, non-overlapping ranges.
+
+  Adjacent ranges with equal values are merged.
+  """
+  def __init__(self, ranges):
+    """Compresses the ranges.
+
+    Args:
+      ranges: Iterable of (start, end, value) triples, not overlapping.
+    """
+    self.__starts = []
+    self.__ends = []
+    self.__values = []
+    for (start, end, value) in sorted(ranges):
+      if (self.__ends and self.__ends[-1] + 1 == start and
+          self.__values[-1] == value):
+        self.__ends[-1] = end
+      else:
+        self.__starts.append(start)
+        self.__ends.append(end)
+        self.__values.append(value)
+
+  def Get(self, code_point, default=None):
+    """Returns the value for the code point integer, or the default."""
+    i = bisect.bisect_right(self.__starts, code_point) - 1
+    if i >= 0 and code_point <= self.__ends[i]: return self.__values[i]
+    return default
+
+  def __len__(self):
+    """Returns the number of ranges."""
+    return len(self.__starts)
+
+  def Ranges(self):
+    """Generator of the (start, end, value) triples, in code point order."""
+    for i in xrange(len(self.__starts)):
+      yield (self.__starts[i], self.__ends[i], self.__values[i])
+
+  def CodePoints(self, value):
+    """Generator of the code points with the value, in code point order.
+    The ranges are expanded only as the code points are consumed."""
+    for (start, end, range_value) in self.Ranges():
+      if range_value == value:
+        for code_point in xrange(start, end + 1): yield code_point
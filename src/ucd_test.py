@@ -0,0 +1,101 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for ucd.py."""
+
+__author__ = "Markus Scherer"
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+import ucd
+
+_CONTENTS = """# Sample.txt
+# A comment line.
+
+0041..005A    ; Upper # [26] LATIN CAPITAL LETTER A..Z
+0061;Lower#no spaces
+  # An indented comment line.
+00C0..00D6    ; Upper
+00D8..00DE    ; Upper
+2601 FE0F; emoji style; # CLOUD
+"""
+
+class UCDTest(unittest.TestCase):
+  def setUp(self):
+    self.folder = tempfile.mkdtemp()
+    self.filename = os.path.join(self.folder, "Sample.txt")
+    with open(self.filename, "wb") as file:
+      file.write(_CONTENTS)
+    self.saved_cache_folder = ucd._cache_folder
+    ucd._cache_folder = os.path.join(self.folder, "cache")
+
+  def tearDown(self):
+    ucd._cache_folder = self.saved_cache_folder
+    shutil.rmtree(self.folder)
+
+  def testParseFields(self):
+    self.assertEqual([["0041..005A", "Upper"], ["0061", "Lower"],
+                      ["00C0..00D6", "Upper"], ["00D8..00DE", "Upper"],
+                      ["2601 FE0F", "emoji style", ""]],
+                     ucd.ParseFields(_CONTENTS))
+
+  def testParsers(self):
+    self.assertEqual((0x41, 0x41), ucd.ParseRange("0041"))
+    self.assertEqual((0x3400, 0x4DB5), ucd.ParseRange("3400..4DB5"))
+    self.assertEqual([0x2601, 0xFE0F], ucd.ParseCodePoints("2601 FE0F"))
+    self.assertEqual([(0x41, 0x5A, "Upper"), (0x61, 0x61, "Lower"),
+                      (0xC0, 0xD6, "Upper"), (0xD8, 0xDE, "Upper")],
+                     ucd.ParseRanges(_CONTENTS.replace("2601 FE0F", "#")))
+
+  def testRangeMap(self):
+    ranges = ucd.RangeMap([(0xD8, 0xDE, "Upper"), (0x41, 0x5A, "Upper"),
+                           (0xC0, 0xD7, "Upper"), (0x61, 0x61, "Lower")])
+    self.assertEqual(3, len(ranges))  # C0..D7 and D8..DE are merged.
+    self.assertEqual("Upper", ranges.Get(0x41))
+    self.assertEqual("Upper", ranges.Get(0xD8))
+    self.assertEqual("Lower", ranges.Get(0x61))
+    self.assertEqual(None, ranges.Get(0x40))
+    self.assertEqual("?", ranges.Get(0x62, "?"))
+    self.assertEqual(None, ranges.Get(0x10FFFF))
+    self.assertEqual([(0x41, 0x5A, "Upper"), (0x61, 0x61, "Lower"),
+                      (0xC0, 0xDE, "Upper")], list(ranges.Ranges()))
+    code_points = ranges.CodePoints("Upper")
+    self.assertEqual([0x41, 0x42], [code_points.next(), code_points.next()])
+    self.assertEqual(26 + 31, len(list(ranges.CodePoints("Upper"))))
+
+  def testLoadCached(self):
+    calls = []
+    def Build(contents):
+      calls.append(contents)
+      return ucd.ParseRanges(contents.replace("2601 FE0F", "#"))
+    data = ucd.LoadCached(self.filename, "Sample", 1, Build)
+    self.assertEqual(1, len(calls))
+    self.assertEqual(data, ucd.LoadCached(self.filename, "Sample", 1, Build))
+    self.assertEqual(1, len(calls))  # From the cache.
+    ucd.LoadCached(self.filename, "Sample", 2, Build)
+    self.assertEqual(2, len(calls))  # Another version.
+    with open(self.filename, "ab") as file:
+      file.write("00E0..00F6    ; Lower\n")
+    data = ucd.LoadCached(self.filename, "Sample", 2, Build)
+    self.assertEqual(3, len(calls))  # Changed file.
+    self.assertEqual((0xE0, 0xF6, "Lower"), data[-1])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -21,10 +21,34 @@ http://icu-project.org/userguide/conversion-data.html
 
 This module performs simplified parsing, without much validity checking.
 It assumes well-formed .ucm files.
+The whole file is matched with compiled regular expressions rather than
+split and scanned line by line.
 """
 
 __author__ = "Markus Scherer"
 
+import re
+
+# Precision values of mappings.
+ROUND_TRIP = 0  # |0
+FALLBACK = 1  # |1 from Unicode only
+SUBCHAR1 = 2  # |2 from Unicode to the single-byte substitution character
+REVERSE_FALLBACK = 3  # |3 to Unicode only
+GOOD_ONE_WAY = 4  # |4 from Unicode only, always used
+
+_PRECISIONS = dict([(str(precision), precision) for precision in range(5)])
+_FROM_UNICODE_PRECISIONS = frozenset([ROUND_TRIP, FALLBACK, GOOD_ONE_WAY])
+
+# Header line like <mb_cur_max> 2 but not a mapping line like <U0041> \x41 |0
+_header_re = re.compile(r"^<(?!U[0-9A-Fa-f])([^>\s]+)>[ \t]+([^#\r\n]*?)[ \t]*"
+                        r"(?:#.*)?$", re.MULTILINE)
+
+# Mapping line: First code point, more code points, bytes and precision.
+_mapping_re = re.compile(r"^<U([0-9A-Fa-f]+)>(\S*)[ \t]+(\\\S+)[ \t]*\|([0-4])",
+                         re.MULTILINE)
+
+_code_point_re = re.compile(r"<U([0-9A-Fa-f]+)>")
+
 class UCMFile(object):
   """Parse and represent a .ucm Unicode conversion mapping file.
 
@@ -32,9 +56,23 @@ class UCMFile(object):
     round_trip_code_points: Code points with round-trip mappings.
          Stored as a frozenset of 4..6-hex-digit strings.
          Sequences like "0061+0308" are possible.
+    mappings: List of all (unicode, bytes, precision) mappings in file order.
+        unicode is a string as in the round-trip set, bytes is a str with
+        the charset bytes, and precision is an integer 0..4.
     from_unicode: Mapping (dictionary) from Unicode code points (or sequences)
-        to charset bytes. Maps from strings (as in the round-trip set)
-        to strings.
+        to charset bytes, for round-trip, fallback and good one-way
+        mappings. Maps from strings (as in the round-trip set) to byte strs.
+    to_unicode: Mapping (dictionary) from charset bytes to Unicode code points
+        (or sequences), for round-trip and reverse fallback mappings.
+        A round-trip mapping wins over a reverse fallback for the same bytes.
+    header: Dictionary with the header values, keyed by the names without
+        angle brackets, like "code_set_name" and "mb_cur_max".
+        Quotes are removed. For repeated names the last value is stored.
+    states: List of the <icu:state> header values.
+    code_set_name: The <code_set_name>, or None.
+    mb_cur_max: The integer <mb_cur_max>, or None.
+    mb_cur_min: The integer <mb_cur_min>, or None.
+    subchar: The <subchar> bytes, or None.
   """
   def __init__(self, filename):
     """Parse a .ucm file.
@@ -42,29 +80,69 @@ class UCMFile(object):
     Args:
       filename: Path/filename of the .ucm file.
     """
-    self.round_trip_code_points = set()
-    self.from_unicode = {}
     file = open(filename, "r")
-    for line in file:
-      line = line.strip()  # Remove trailing newlines etc.
-      index = line.find("#")  # Remove comments.
-      if index >= 0: line = line[:index].rstrip()
-      if not line: continue  # Skip empty lines.
-      if line.startswith("<U"):
-        uni, bytes, precision = line.split()
-        uni = _RemoveMappingSyntax(uni)
-        bytes = _RemoveMappingSyntax(bytes)
-        if precision == "|0":
-          self.round_trip_code_points.add(uni)
-        if precision == "|0" or precision == "|1":
-          self.from_unicode[uni] = bytes
-    self.round_trip_code_points = frozenset(self.round_trip_code_points)
-
-
-_MAPPING_CHARS = frozenset("0123456789ABCDEF+")
-
-def _RemoveMappingSyntax(s):
-  result = ""
-  for c in s:
-    if c in _MAPPING_CHARS: result += c
-  return result
+    try:
+      contents = file.read()
+    finally:
+      file.close()
+    charmap_index = contents.find("\nCHARMAP")
+    header_contents = contents[:charmap_index] if charmap_index >= 0 else ""
+    self.header = {}
+    self.states = []
+    for (name, value) in _header_re.findall(header_contents):
+      if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+      self.header[name] = value
+      if name == "icu:state": self.states.append(value)
+    self.code_set_name = self.header.get("code_set_name")
+    self.mb_cur_max = _IntOrNone(self.header.get("mb_cur_max"))
+    self.mb_cur_min = _IntOrNone(self.header.get("mb_cur_min"))
+    subchar = self.header.get("subchar")
+    self.subchar = _ParseBytes(subchar) if subchar else None
+    self.mappings = mappings = ParseMappings(contents, charmap_index + 1)
+    self.from_unicode = dict([(uni, bytes)
+                              for (uni, bytes, precision) in mappings
+                              if precision in _FROM_UNICODE_PRECISIONS])
+    # Add the round-trip mappings last so that they replace reverse fallbacks.
+    self.to_unicode = dict([(bytes, uni)
+                            for (uni, bytes, precision) in mappings
+                            if precision == REVERSE_FALLBACK])
+    self.to_unicode.update([(bytes, uni)
+                            for (uni, bytes, precision) in mappings
+                            if precision == ROUND_TRIP])
+    self.round_trip_code_points = frozenset(
+        [uni for (uni, bytes, precision) in mappings
+         if precision == ROUND_TRIP])
+
+
+def ParseMappings(contents, start=0):
+  """Parses the mapping lines in .ucm file contents.
+
+  Args:
+    contents: The .ucm file contents, or just mapping lines.
+    start: Index in contents where to start parsing.
+
+  Returns:
+    List of (unicode, bytes, precision) mappings as in UCMFile.mappings.
+  """
+  matches = _mapping_re.findall(contents, start)
+  # Fast path for the common single code points and byte sequences
+  # without "+"; the few others are fixed up below.
+  mappings = [(uni, bytes.decode("string_escape"), _PRECISIONS[precision])
+              for (uni, more_unis, bytes, precision) in matches]
+  for (i, (uni, more_unis, bytes, precision)) in enumerate(matches):
+    if more_unis or "+" in bytes:
+      if more_unis:
+        uni += "+" + "+".join(_code_point_re.findall(more_unis))
+      mappings[i] = (uni, _ParseBytes(bytes), _PRECISIONS[precision])
+  return mappings
+
+
+def _ParseBytes(s):
+  """Turns '\\xF9\\x85' or '\\xF9+\\x85' into the corresponding byte str."""
+  return s.replace("+", "").decode("string_escape")
+
+
+def _IntOrNone(s):
+  if s is None: return None
+  return int(s)
@@ -0,0 +1,113 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = "Markus Scherer"
+
+import os
+import os.path
+import tempfile
+import unittest
+import ucm
+
+_TEST_UCM = r"""# Test file
+<code_set_name>               "test-sjis"
+<mb_cur_max>                  2
+<mb_cur_min>                  1
+<subchar>                     \x3F
+<icu:state>                   0-80, 81-9f:1, a0-df, e0-fc:1, fd-ff
+<icu:state>                   40-7e, 80-fc  # trail bytes
+
+CHARMAP
+<U0041> \x41 |0
+<U00A5> \x5C |1
+<U005C> \x5C |0
+<U00A6> \x1A |2
+<U2225> \x81\x61 |3
+<U2016> \x81\x61 |0
+<U0023>+<U20E3> \xF9\x85 |0  # keycap
+<U0023><U20E3> \xF9\x85 |4
+<U1F306> \xF8\x9F+\xF8\xA0 |1
+<U1F532> \xF7\xBA |0
+<UFEB64> \xF7\xBA |3
+END CHARMAP
+"""
+
+class UCMFileTest(unittest.TestCase):
+  def setUp(self):
+    (fd, self.__filename) = tempfile.mkstemp(".ucm")
+    os.write(fd, _TEST_UCM)
+    os.close(fd)
+    self.__ucm = ucm.UCMFile(self.__filename)
+
+  def tearDown(self):
+    os.remove(self.__filename)
+
+  def testHeader(self):
+    self.assertEqual(self.__ucm.code_set_name, "test-sjis")
+    self.assertEqual(self.__ucm.mb_cur_max, 2)
+    self.assertEqual(self.__ucm.mb_cur_min, 1)
+    self.assertEqual(self.__ucm.subchar, "?")
+    self.assertEqual(self.__ucm.states,
+                     ["0-80, 81-9f:1, a0-df, e0-fc:1, fd-ff", "40-7e, 80-fc"])
+    self.assertEqual(self.__ucm.header["mb_cur_max"], "2")
+
+  def testMappings(self):
+    self.assertEqual(len(self.__ucm.mappings), 11)
+    self.assertEqual(self.__ucm.mappings[0], ("0041", "A", ucm.ROUND_TRIP))
+    self.assertEqual(self.__ucm.mappings[3], ("00A6", "\x1a", ucm.SUBCHAR1))
+    self.assertEqual(self.__ucm.mappings[8],
+                     ("1F306", "\xf8\x9f\xf8\xa0", ucm.FALLBACK))
+    self.assertEqual(self.__ucm.mappings[-1],
+                     ("FEB64", "\xf7\xba", ucm.REVERSE_FALLBACK))
+    self.assertEqual(self.__ucm.round_trip_code_points,
+                     frozenset(["0041", "005C", "2016", "0023+20E3", "1F532"]))
+
+  def testFromUnicode(self):
+    from_unicode = self.__ucm.from_unicode
+    self.assertEqual(from_unicode["00A5"], "\\")
+    self.assertEqual(from_unicode["0023+20E3"], "\xf9\x85")
+    self.assertEqual(from_unicode["1F306"], "\xf8\x9f\xf8\xa0")
+    self.failIf("00A6" in from_unicode)
+    self.failIf("2225" in from_unicode)
+
+  def testToUnicode(self):
+    to_unicode = self.__ucm.to_unicode
+    self.assertEqual(to_unicode["\\"], "005C")
+    self.assertEqual(to_unicode["\xf9\x85"], "0023+20E3")
+    self.failIf("\xf8\x9f\xf8\xa0" in to_unicode)
+    # The round-trip mapping wins over a reverse fallback,
+    # whether it comes before or after it in the file.
+    self.assertEqual(to_unicode["\x81\x61"], "2016")
+    self.assertEqual(to_unicode["\xf7\xba"], "1F532")
+    self.assertEqual(len(to_unicode), 5)
+
+  def testParseMappings(self):
+    mappings = ucm.ParseMappings(u"# Emoji\n<U2600> \\xF8\\x9F |0\n"
+                                 u"<U0023>+<U20E3> \\xF9\\x85 |4\n")
+    self.assertEqual(mappings, [("2600", "\xf8\x9f", ucm.ROUND_TRIP),
+                                ("0023+20E3", "\xf9\x85", ucm.GOOD_ONE_WAY)])
+
+  def testWindows932(self):
+    here = os.path.dirname(__file__)
+    filename = os.path.join(here, "..", "data", "icu", "windows-932-2000.ucm")
+    sjis_ucm = ucm.UCMFile(filename)
+    self.assertEqual(sjis_ucm.mb_cur_max, 2)
+    self.assertEqual(sjis_ucm.from_unicode["3042"], "\x82\xa0")
+    self.assertEqual(sjis_ucm.to_unicode["\x82\xa0"], "3042")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -14,51 +14,69 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Load and make available Unicode code point Age data."""
+"""Load and make available Unicode code point Age data.
+
+The ranges are stored in a ucd.RangeMap of age numbers. Planes 0 and 1,
+with nearly all of the Emoji-related characters, also have a dense table
+with one age number per code point. Ages of code point sequence strings
+are memoized.
+"""
 
 __author__ = "Markus Scherer"
 
-import os.path
+import array
+import ucd
+
+# Code points below this limit are looked up in the dense table.
+_DENSE_LIMIT = 0x20000
+
+_ages = None  # ucd.RangeMap with age numbers; see _age_names.
+_dense_ages = array.array("B")  # Age number per code point below _DENSE_LIMIT.
+# Age strings like "6.0" in version order, indexed by age number.
+# Age number 0 is for unassigned code points.
+_age_names = [u""]
+_memo = {}  # Code point sequence strings to age strings.
+
+def _VersionKey(age):
+  return tuple([int(part) for part in age.split(".")])
 
-_ranges_to_age = []
 
 def Load():
   """Loads Unicode character Age data."""
-  # TODO(mscherer): Add argument for root data folder path.
-  filename = os.path.join(os.path.dirname(__file__),
-                          "..", "data", "unicode", "DerivedAge.txt")
-  file = open(filename, "r")
-  for line in file:
-    line = line.strip()  # Remove trailing newlines etc.
-    index = line.find("#")  # Remove comments.
-    if index >= 0: line = line[:index].rstrip()
-    if not line: continue  # Skip empty lines.
-    fields = line.split(";")
-    range = fields[0].split("..")
-    start = int(range[0], 16)
-    if len(range) == 1:
-      end = start
-    else:
-      end = int(range[1], 16)
-    _ranges_to_age.append((start, end, fields[1].lstrip()))
-  _ranges_to_age.sort()
-
-
-def _FindAge(uni):
-  """Returns the age string of a single code point integer."""
-  # binary search
-  start = 0
-  limit = len(_ranges_to_age)
-  while start < limit:
-    i = (start + limit) / 2
-    tuple = _ranges_to_age[i]
-    if uni < tuple[0]:
-      limit = i
-    elif uni > tuple[1]:
-      start = i + 1
-    else:
-      return tuple[2]
-  return None
+  global _ages
+  if _ages: return  # Already loaded.
+  ranges = ucd.LoadCached(ucd.DataFilename("DerivedAge.txt"), "DerivedAge", 1,
+                          ucd.ParseRanges)
+  _age_names.extend(sorted(set([age for (start, end, age) in ranges]),
+                           key=_VersionKey))
+  age_numbers = dict([(age, i) for (i, age) in enumerate(_age_names)])
+  _ages = ucd.RangeMap([(start, end, age_numbers[age])
+                        for (start, end, age) in ranges])
+  dense_ages = array.array("B", [0]) * _DENSE_LIMIT
+  for (start, end, age_number) in _ages.Ranges():
+    if start < _DENSE_LIMIT:
+      limit = min(end + 1, _DENSE_LIMIT)
+      dense_ages[start:limit] = array.array("B", [age_number]) * (limit - start)
+  _dense_ages.extend(dense_ages)
+
+
+def _AgeNumber(code_point):
+  """Returns the age number of a single code point integer."""
+  if code_point < _DENSE_LIMIT: return _dense_ages[code_point]
+  return _ages.Get(code_point, 0)
+
+
+def GetAges(code_points):
+  """Returns the age strings for a sequence of code point integers.
+
+  Args:
+    code_points: Iterable of integers.
+
+  Returns:
+    List of age strings like "6.0", with an empty string for each
+    unassigned code point.
+  """
+  return [_age_names[_AgeNumber(code_point)] for code_point in code_points]
 
 
 def GetAge(uni):
@@ -66,9 +84,11 @@ def GetAge(uni):
   plus-separated input code point string,
   or empty string if all code points are unassigned.
   """
-  age = u""
-  for code_point in uni.split('+'):
-    if code_point:
-      cp_age = _FindAge(int(code_point, 16))
-      if cp_age and cp_age > age: age = cp_age
+  age = _memo.get(uni)
+  if age is None:
+    age_number = 0
+    for code_point in uni.split("+"):
+      if code_point:
+        age_number = max(age_number, _AgeNumber(int(code_point, 16)))
+    age = _memo[uni] = _age_names[age_number]
   return age
@@ -0,0 +1,59 @@
+#!/usr/bin/python2.6
+#
+# Copyright 2012 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for unicode_age.py."""
+
+__author__ = "Markus Scherer"
+
+import unittest
+import unicode_age
+
+class UnicodeAgeTest(unittest.TestCase):
+  def setUp(self):
+    unicode_age.Load()
+
+  def testGetAge(self):
+    self.assertEqual("1.1", unicode_age.GetAge("0041"))
+    self.assertEqual("1.1", unicode_age.GetAge("263A"))
+    self.assertEqual("6.0", unicode_age.GetAge("1F4A9"))
+    self.assertEqual("6.1", unicode_age.GetAge("1F600"))
+    self.assertEqual("3.1", unicode_age.GetAge("E0001"))  # Above planes 0..1.
+    self.assertEqual("", unicode_age.GetAge("0378"))  # Unassigned
+    self.assertEqual("", unicode_age.GetAge("E0080"))
+    # Memoized.
+    self.assertEqual("6.1", unicode_age.GetAge("1F600"))
+
+  def testSequences(self):
+    self.assertEqual("3.0", unicode_age.GetAge("0023+20E3"))
+    self.assertEqual("6.0", unicode_age.GetAge("1F1EF+1F1F5"))
+    self.assertEqual("1.1", unicode_age.GetAge("0041+0378"))
+
+  def testGetAges(self):
+    self.assertEqual(["1.1", "6.1", "", "3.1", "2.0"],
+                     unicode_age.GetAges([0x41, 0x1F600, 0x0378, 0xE0001,
+                                          0x10FFFF]))
+    self.assertEqual([], unicode_age.GetAges([]))
+
+  def testDenseTableMatchesRanges(self):
+    # The planes 0 and 1 table agrees with the ranges.
+    for code_point in xrange(0, unicode_age._DENSE_LIMIT, 17):
+      self.assertEqual(unicode_age._ages.Get(code_point, 0),
+                       unicode_age._dense_ages[code_point],
+                       "U+%04X" % code_point)
+
+
+if __name__ == "__main__":
+  unittest.main()
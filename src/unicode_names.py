@@ -16,8 +16,9 @@
 
 """Load and make available Unicode character names data.
 
-This module does not currently handle algorithmic names (for Han and Hangul
-characters) nor registered names of sequences.
+This module handles the algorithmic names of Han and Hangul characters
+(CJK UNIFIED IDEOGRAPH-4E00, HANGUL SYLLABLE GA) but not registered names
+of sequences.
 
 We do not use the Python unicodedata module because
 
@@ -38,32 +39,262 @@ function returns a "Unicode character". What does that mean for supplementary
 characters on a Python installation with default 16-bit Unicode strings, like
 on Windows and the Mac? Will it return a surrogate pair or throw an exception?
 
+The data is loaded on the first lookup. The names are stored compactly:
+The code points in a sorted integer array, the names in one string with
+an array of offsets, and the names' order in another array for binary search.
+After parsing UnicodeData.txt, these arrays are cached via ucd.LoadCached()
+for quick loading in the next process.
+
 Attributes:
   code_points_to_names: Map from code points to character names.
   names_to_code_points: Map from character names to code points.
+  Both are read-only dictionary-like objects with code points as
+  4..6-hex-digit strings like "263A", and they support [], get(), "in",
+  len() and iteration.
 """
 
 __author__ = "Markus Scherer"
 
-import os.path
+import array
+import bisect
+import ucd
 
-code_points_to_names = {}
-names_to_code_points = {}
+# The cached data depends on the array item size.
+_CACHE_VERSION = (1, array.array("I").itemsize)
 
-def Load():
-  """Load Unicode character names data."""
-  # TODO(mscherer): Add argument for root data folder path.
-  filename = os.path.join(os.path.dirname(__file__),
-                          "..", "data", "unicode", "UnicodeData.txt")
-  file = open(filename, "r")
-  for line in file:
-    line = line.strip()  # Remove trailing newlines etc.
-    index = line.find("#")  # Remove comments.
-    if index >= 0: line = line[:index].rstrip()
-    if not line: continue  # Skip empty lines.
-    fields = line.split(";")
-    code_point = fields[0]
+# Kinds of algorithmic names.
+_CJK = 0
+_HANGUL = 1
+
+_CJK_PREFIX = "CJK UNIFIED IDEOGRAPH-"
+_HANGUL_PREFIX = "HANGUL SYLLABLE "
+
+# Short names of the Hangul Jamo, for the Hangul syllable names.
+_JAMO_L = ("G", "GG", "N", "D", "DD", "R", "M", "B", "BB", "S", "SS", "",
+           "J", "JJ", "C", "K", "T", "P", "H")
+_JAMO_V = ("A", "AE", "YA", "YAE", "EO", "E", "YEO", "YE", "O", "WA", "WAE",
+           "OE", "YO", "U", "WEO", "WE", "WI", "YU", "EU", "YI", "I")
+_JAMO_T = ("", "G", "GG", "GS", "N", "NJ", "NH", "D", "L", "LG", "LM", "LB",
+           "LS", "LT", "LP", "LH", "M", "B", "BS", "S", "SS", "NG", "J", "C",
+           "K", "T", "P", "H")
+_HANGUL_BASE = 0xAC00
+
+class _Data(object):
+  """The compact names data.
+
+  Attributes:
+    code_points: Sorted array of the code points with explicit names.
+    offsets: Array with the start of each name in the names string,
+        and its end at the end.
+    names: All explicit names, concatenated.
+    name_order: Array of indexes into code_points, sorted by name.
+    ranges: List of (start, end, kind) for the algorithmic names.
+  """
+  def __init__(self, code_points, offsets, names, name_order, ranges):
+    self.code_points = code_points
+    self.offsets = offsets
+    self.names = names
+    self.name_order = name_order
+    self.ranges = ranges
+
+  def Name(self, i):
+    return self.names[self.offsets[i]:self.offsets[i + 1]]
+
+
+class _SortedNames(object):
+  """Sequence view of the names in sorted order, for bisect."""
+  def __init__(self, data):
+    self.__data = data
+
+  def __len__(self):
+    return len(self.__data.name_order)
+
+  def __getitem__(self, i):
+    return self.__data.Name(self.__data.name_order[i])
+
+
+_data = None
+_hangul_syllables = {}  # Hangul syllable name suffixes to code points.
+
+def _Parse(contents):
+  """Parses UnicodeData.txt contents into the data for a _Data object,
+  with the arrays as strs for the cache."""
+  entries = []
+  ranges = []
+  range_start = None
+  for fields in ucd.ParseFields(contents):
+    code_point = int(fields[0], 16)
     name = fields[1]
-    if name.startswith("<"): continue
-    code_points_to_names[code_point] = name
-    names_to_code_points[name] = code_point
+    if not name.startswith("<"):
+      entries.append((code_point, name))
+    elif name.endswith(", First>"):
+      range_start = code_point
+    elif name.endswith(", Last>"):
+      if name.startswith("<CJK Ideograph"):
+        ranges.append((range_start, code_point, _CJK))
+      elif name.startswith("<Hangul Syllable"):
+        ranges.append((range_start, code_point, _HANGUL))
+  entries.sort()
+  code_points = array.array("I", [code_point for (code_point, name) in entries])
+  offsets = array.array("I", [0])
+  for (code_point, name) in entries:
+    offsets.append(offsets[-1] + len(name))
+  names = "".join([name for (code_point, name) in entries])
+  name_order = array.array("I", sorted(range(len(entries)),
+                                       key=lambda i: entries[i][1]))
+  return (code_points.tostring(), offsets.tostring(), names,
+          name_order.tostring(), ranges)
+
+
+def _Array(s):
+  a = array.array("I")
+  a.fromstring(s)
+  return a
+
+
+def Load():
+  """Load Unicode character names data.
+
+  Called automatically on the first lookup.
+  """
+  global _data
+  if _data: return  # Already loaded.
+  (code_points, offsets, names, name_order, ranges) = ucd.LoadCached(
+      ucd.DataFilename("UnicodeData.txt"), "UnicodeData-names",
+      _CACHE_VERSION, _Parse)
+  _data = _Data(_Array(code_points), _Array(offsets), names,
+                _Array(name_order), [tuple(r) for r in ranges])
+
+
+def _AlgorithmicName(code_point, kind):
+  if kind == _CJK: return "%s%04X" % (_CJK_PREFIX, code_point)
+  s = code_point - _HANGUL_BASE
+  return (_HANGUL_PREFIX + _JAMO_L[s / 588] + _JAMO_V[(s % 588) / 28] +
+          _JAMO_T[s % 28])
+
+
+def GetName(code_point):
+  """Returns the name of the integer code point, or None if it has none."""
+  Load()
+  i = bisect.bisect_left(_data.code_points, code_point)
+  if i < len(_data.code_points) and _data.code_points[i] == code_point:
+    return _data.Name(i)
+  for (start, end, kind) in _data.ranges:
+    if start <= code_point <= end: return _AlgorithmicName(code_point, kind)
+  return None
+
+
+def _InRange(code_point, kind):
+  for (start, end, range_kind) in _data.ranges:
+    if range_kind == kind and start <= code_point <= end: return True
+  return False
+
+
+def GetCodePoint(name):
+  """Returns the integer code point with the name, or None if there is none."""
+  Load()
+  sorted_names = _SortedNames(_data)
+  i = bisect.bisect_left(sorted_names, name)
+  if i < len(sorted_names) and sorted_names[i] == name:
+    return _data.code_points[_data.name_order[i]]
+  if name.startswith(_CJK_PREFIX):
+    hex_digits = name[len(_CJK_PREFIX):]
+    try:
+      code_point = int(hex_digits, 16)
+    except ValueError:
+      return None
+    if "%04X" % code_point == hex_digits and _InRange(code_point, _CJK):
+      return code_point
+  elif name.startswith(_HANGUL_PREFIX) and _InRange(_HANGUL_BASE, _HANGUL):
+    if not _hangul_syllables:
+      for s in xrange(len(_JAMO_L) * 588):
+        _hangul_syllables[_AlgorithmicName(_HANGUL_BASE + s, _HANGUL)[
+            len(_HANGUL_PREFIX):]] = _HANGUL_BASE + s
+    return _hangul_syllables.get(name[len(_HANGUL_PREFIX):])
+  return None
+
+
+def GetExplicitNames():
+  """Generator of (integer code point, name) pairs, in code point order,
+  for the characters with names listed in UnicodeData.txt.
+  Omits the algorithmic CJK unified ideograph and Hangul syllable names."""
+  Load()
+  for i in xrange(len(_data.code_points)):
+    yield (_data.code_points[i], _data.Name(i))
+
+
+def _AllCodePoints():
+  """Generates all named code points, in order."""
+  Load()
+  explicit = iter(_data.code_points)
+  algorithmic = (code_point
+                 for (start, end, kind) in sorted(_data.ranges)
+                 for code_point in xrange(start, end + 1))
+  # Merge the two sorted sequences.
+  next_explicit = next(explicit, None)
+  for code_point in algorithmic:
+    while next_explicit is not None and next_explicit < code_point:
+      yield next_explicit
+      next_explicit = next(explicit, None)
+    yield code_point
+  while next_explicit is not None:
+    yield next_explicit
+    next_explicit = next(explicit, None)
+
+
+def _NumNames():
+  Load()
+  return len(_data.code_points) + sum([end - start + 1
+                                       for (start, end, kind) in _data.ranges])
+
+
+class _CodePointsToNames(object):
+  """Read-only map from code point hex strings to names."""
+  def __getitem__(self, code):
+    name = self.get(code)
+    if name is None: raise KeyError(code)
+    return name
+
+  def get(self, code, default=None):
+    try:
+      code_point = int(code, 16)
+    except ValueError:
+      return default  # Not a single code point, for example "0023+20E3".
+    name = GetName(code_point)
+    if name is None: return default
+    return name
+
+  def __contains__(self, code):
+    return self.get(code) is not None
+
+  def __len__(self):
+    return _NumNames()
+
+  def __iter__(self):
+    for code_point in _AllCodePoints(): yield "%04X" % code_point
+
+
+class _NamesToCodePoints(object):
+  """Read-only map from names to code point hex strings."""
+  def __getitem__(self, name):
+    code = self.get(name)
+    if code is None: raise KeyError(name)
+    return code
+
+  def get(self, name, default=None):
+    code_point = GetCodePoint(name)
+    if code_point is None: return default
+    return "%04X" % code_point
+
+  def __contains__(self, name):
+    return GetCodePoint(name) is not None
+
+  def __len__(self):
+    return _NumNames()
+
+  def __iter__(self):
+    for code_point in _AllCodePoints(): yield GetName(code_point)
+
+
+code_points_to_names = _CodePointsToNames()
+names_to_code_points = _NamesToCodePoints()
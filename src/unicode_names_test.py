@@ -24,9 +24,13 @@ Verify that
 
 __author__ = "Markus Scherer"
 
+import os
 import re
+import shutil
+import tempfile
 import unittest
 import emoji4unicode
+import ucd
 import unicode_age
 import unicode_names
 
@@ -42,6 +46,57 @@ class UnicodeNamesTest(unittest.TestCase):
     n2cp = unicode_names.names_to_code_points
     self.assertEqual("263A", n2cp["WHITE SMILING FACE"])
     self.assertEqual("WHITE SMILING FACE", cp2n["263A"])
+    self.assertEqual("WHITE SMILING FACE", cp2n.get("263A"))
+    self.assertTrue("263A" in cp2n)
+    self.assertFalse("0023+20E3" in cp2n)
+    self.assertEqual(None, cp2n.get("E000"))  # Private Use
+    self.assertRaises(KeyError, lambda: cp2n["0000"])  # <control>
+    self.assertEqual("1F600", n2cp["GRINNING FACE"])
+    self.assertFalse("GRINNING FACES" in n2cp)
+    self.assertEqual(0x263A, unicode_names.GetCodePoint("WHITE SMILING FACE"))
+    self.assertEqual("GRINNING FACE", unicode_names.GetName(0x1F600))
+    self.assertEqual(None, unicode_names.GetName(0x110000))
+
+  def testAlgorithmicNames(self):
+    cp2n = unicode_names.code_points_to_names
+    n2cp = unicode_names.names_to_code_points
+    for (code, name) in (("4E00", "CJK UNIFIED IDEOGRAPH-4E00"),
+                         ("3400", "CJK UNIFIED IDEOGRAPH-3400"),
+                         ("2A6D6", "CJK UNIFIED IDEOGRAPH-2A6D6"),
+                         ("AC00", "HANGUL SYLLABLE GA"),
+                         ("AC01", "HANGUL SYLLABLE GAG"),
+                         ("C544", "HANGUL SYLLABLE A"),
+                         ("D7A3", "HANGUL SYLLABLE HIH")):
+      self.assertEqual(name, cp2n[code])
+      self.assertEqual(code, n2cp[name])
+    # Compatibility ideographs have explicit names.
+    self.assertEqual("F900", n2cp["CJK COMPATIBILITY IDEOGRAPH-F900"])
+    for name in ("CJK UNIFIED IDEOGRAPH-4e00", "CJK UNIFIED IDEOGRAPH-04E00",
+                 "CJK UNIFIED IDEOGRAPH-E000", "HANGUL SYLLABLE XYZ"):
+      self.assertFalse(name in n2cp, name)
+    self.assertFalse("D7A4" in cp2n)
+
+  def testCache(self):
+    cache_folder = tempfile.mkdtemp()
+    saved = (ucd._cache_folder, unicode_names._data)
+    try:
+      ucd._cache_folder = cache_folder
+      unicode_names._data = None
+      unicode_names.Load()  # Parses and writes the cache.
+      parsed = unicode_names._data
+      self.assertTrue(os.listdir(cache_folder))
+      unicode_names._data = None
+      unicode_names.Load()  # Reads the cache.
+      cached = unicode_names._data
+      self.assertFalse(cached is parsed)
+      self.assertEqual(parsed.code_points, cached.code_points)
+      self.assertEqual(parsed.offsets, cached.offsets)
+      self.assertEqual(parsed.names, cached.names)
+      self.assertEqual(parsed.name_order, cached.name_order)
+      self.assertEqual(parsed.ranges, cached.ranges)
+    finally:
+      (ucd._cache_folder, unicode_names._data) = saved
+      shutil.rmtree(cache_folder)
 
   def testSymbolNames(self):
     cp2n = unicode_names.code_points_to_names
@@ -21,23 +21,20 @@ Emoji symbols may change code points, names, and annotations.
 This script reads emoji4unicode.xml and a NamesList.txt file,
 updates the XML data according to the NamesList,
 and writes a modified XML file to ../generated/emoji4unicode.xml.
+Only the <e> elements of the symbols in the NamesList are parsed and
+rewritten; the rest of the file is copied unchanged.
 """
 
 __author__ = "Markus Scherer"
 
 import os.path
-import xml.dom.minidom
-import emoji4unicode
+import e4u_edit
 import nameslist
 
 def main():
   here = os.path.dirname(__file__)
   e4u_filename = os.path.join(here, "..", "data", "emoji4unicode.xml")
-  doc = xml.dom.minidom.parse(e4u_filename)
-  root = doc.documentElement
-  id_to_symbol = {}
-  for symbol in root.getElementsByTagName("e"):
-    id_to_symbol[symbol.getAttribute("id")] = symbol
+  editor = e4u_edit.Editor(e4u_filename)
   nameslist_filename = os.path.join(here, "..", "data",
                                     "unicode", "uc60-a-FDAM8-SanJose.lst")
   for record in nameslist.Read(nameslist_filename):
@@ -47,7 +44,7 @@ def main():
     if not id:
       continue
     # Extract the old data from the emoji4unicode.xml <e> symbol element.
-    symbol = id_to_symbol[id]
+    symbol = editor.GetElement(id)
     old_uni = symbol.getAttribute("unicode")
     old_name = symbol.getAttribute("name")
     old_annotations = []
@@ -75,12 +72,12 @@ def main():
     for ann in new_annotations:
       # Skip the Emoji symbol ID alias, and annotations that are not new.
       if not ann.startswith(u"= e-") and ann not in old_annotations:
+        doc = symbol.ownerDocument
         ann_element = doc.createElement("ann")
         ann_element.appendChild(doc.createTextNode(ann))
         symbol.appendChild(ann_element)
   out_filename = os.path.join(here, "..", "generated", "emoji4unicode.xml")
-  emoji4unicode.Write(doc, out_filename)
-  doc.unlink()
+  editor.Write(out_filename)
 
 
 if __name__ == "__main__":
@@ -20,26 +20,26 @@ Intended for cleanup before using update_e4u_from_nameslist.py
 so that the diffs for that are smaller.
 This script reads emoji4unicode.xml, removes the oldname attributes,
 and writes a modified XML file to ../generated/emoji4unicode.xml.
+Only the <e> elements with oldname attributes are parsed and rewritten.
 """
 
 __author__ = "Markus Scherer"
 
 import os.path
-import xml.dom.minidom
-import emoji4unicode
-import nameslist
+import e4u_edit
 
 def main():
   here = os.path.dirname(__file__)
   e4u_filename = os.path.join(here, "..", "data", "emoji4unicode.xml")
-  doc = xml.dom.minidom.parse(e4u_filename)
-  root = doc.documentElement
-  for symbol in root.getElementsByTagName("e"):
-    if symbol.getAttribute("oldname"):
-      symbol.removeAttribute("oldname")
+  editor = e4u_edit.Editor(e4u_filename)
+  for id in editor.ids:
+    # Look at the element text first, to parse only the elements to be edited.
+    if ' oldname="' in editor.GetXML(id):
+      symbol = editor.GetElement(id)
+      if symbol.getAttribute("oldname"):
+        symbol.removeAttribute("oldname")
   out_filename = os.path.join(here, "..", "generated", "emoji4unicode.xml")
-  emoji4unicode.Write(doc, out_filename)
-  doc.unlink()
+  editor.Write(out_filename)
 
 
 if __name__ == "__main__":